@@ -0,0 +1,151 @@
+"""
+Compare `build_table` using `column_from_variable` (rows grouped by variable name, indexed once per note)
+    against the original implementation (every row and variable scanned by each builder), on notes dense
+    with DR and AMD findings.
+
+Also time building only some columns (`build_table(..., columns=..., column_groups=...)`) and check that they
+    match those columns of the full table.
+"""
+import csv
+import datetime
+import enum
+import filecmp
+import json
+import pathlib
+import sys
+import tempfile
+import timeit
+from enum import Enum
+
+import click
+
+from eye_extractor.build_table import BUILD_PLAN, METADATA_COLUMNS, build_table
+from eye_extractor.extract import extract_variables
+from eye_extractor.output import variable
+from eye_extractor.output.variable import _get_updated_priority, _has_greater_re_or_le_priority, \
+    _has_higher_priority, _has_lower_priority, has_valid_date
+from notes import generate_notes
+
+DENSE_FRAGMENTS = [
+    'MACULA: OD: intermediate drusen, no fluid, RPE changes OS: subretinal fluid, heavy drusen, PED\n',
+    'ASSESSMENT: 1. Dry AMD OD with geographic atrophy, wet AMD OS with CNV s/p aflibercept\n',
+    '2. Moderate NPDR OU with CSME OD. Dot blot hemorrhages, hard exudates and cotton wool spots OD\n',
+    '3. No venous beading, IRMA or neovascularization OS; PRP laser scars OD\n',
+    'OCT MACULA: 2022-02-22 OD: intraretinal fluid, CMT 310 OS: SRF, subretinal hemorrhage\n',
+    'PLAN: Continue AREDS, intravitreal injection OS today, focal laser OD, RTC 4 weeks with OCT OU.\n',
+]
+
+PROJECTIONS = [
+    ('va, iop', None, ('va', 'iop')),
+    ('dr', None, ('dr',)),
+    ('amd severity', ('dryamd_severity_re', 'dryamd_severity_le', 'wetamd_severity_re', 'wetamd_severity_le'), None),
+]
+
+
+def read_csv(path):
+    with open(path, encoding='utf8', newline='') as fh:
+        return list(csv.DictReader(fh))
+
+
+def original_column_from_variable(results, data, *, compare_func=None, transformer_func=None,
+                                  result_func=None, convert_func=None, filter_func=None,
+                                  rename_func=None, sideeffect_func=None, renamevar_func=None,
+                                  enum_to_str=False, restrict_date: datetime.date = None):
+    if compare_func is None:
+        compare_func = lambda n, c: n > c
+    if result_func is None:
+        result_func = lambda n, c: n
+    if transformer_func is None:
+        transformer_func = lambda n: n['value'] if isinstance(n, dict) else n
+    elif isinstance(transformer_func, enum.EnumMeta):
+        enumclass = transformer_func
+        transformer_func = lambda n: enumclass(n['value'] if isinstance(n, dict) else n)
+    if filter_func is None:
+        filter_func = lambda n: True
+    if convert_func is None:
+        convert_func = lambda n: n
+    if sideeffect_func is None:
+        sideeffect_func = lambda r, v, n: None
+    if rename_func is None:
+        if enum_to_str:
+            rename_func = lambda n: n.name.replace('_', ' ') if isinstance(n, Enum) else n
+        else:
+            rename_func = lambda n: n.value if isinstance(n, Enum) else n
+    if renamevar_func is None:
+        renamevar_func = lambda n: n
+    priorities = {convert_func(varname): -1 for varname in results}
+    for row in data or []:
+        for varname, curr_value in list(results.items()):
+            target_varname = convert_func(varname)
+            if target_varname not in row:
+                continue
+            if not filter_func(row[target_varname]):
+                continue
+            if not has_valid_date(restrict_date, row[target_varname]):
+                continue
+            if _has_lower_priority(priorities, row, target_varname):
+                continue
+            if target_varname.endswith('_unk') and _has_greater_re_or_le_priority(priorities, row, target_varname):
+                continue
+            new_value = transformer_func(row[target_varname])
+            if _has_higher_priority(priorities, row, target_varname) or compare_func(new_value, curr_value):
+                priorities[target_varname] = _get_updated_priority(row, target_varname)
+                results[varname] = result_func(new_value, curr_value)
+                sideeffect_func(results, varname, new_value)
+    return {renamevar_func(varname): rename_func(value) for varname, value in results.items()}
+
+
+def set_column_from_variable(func):
+    """Replace `column_from_variable` in `variable` and every output module which imported it"""
+    for name, module in list(sys.modules.items()):
+        if name.startswith('eye_extractor.output') and hasattr(module, 'column_from_variable'):
+            module.column_from_variable = func
+
+
+@click.command()
+@click.option('--count', type=int, default=200, help='Number of notes.')
+@click.option('--length', type=int, default=3_000, help='Approximate number of characters per note.')
+@click.option('--repeat', type=int, default=3)
+def main(count, length, repeat):
+    notes = generate_notes(count, length // 2)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        corpus = pathlib.Path(tmpdir) / 'notes'
+        corpus.mkdir()
+        for i, note in enumerate(notes):
+            dense = ''.join(DENSE_FRAGMENTS[(i + j) % len(DENSE_FRAGMENTS)]
+                            for j in range(length // 2 // 80))
+            (corpus / f'{i}.txt').write_text(dense + note, encoding='utf8')
+            (corpus / f'{i}.meta').write_text(json.dumps({
+                'note_id': i, 'note_date': '2022-02-22 00:00:00', 'studyid': i, 'enc_id': i, 'train': 0,
+            }), encoding='utf8')
+        jsonl_dir = pathlib.Path(tmpdir) / 'jsonl'
+        extract_variables((corpus,), jsonl_dir)
+        current = variable.column_from_variable
+        outputs = {}
+        for label, func in [
+            ('original', original_column_from_variable),
+            ('grouped rows', current),
+        ]:
+            set_column_from_variable(func)
+            outdir = pathlib.Path(tmpdir) / label
+            outputs[label] = build_table(jsonl_dir, outdir)
+            duration = min(timeit.repeat(lambda: build_table(jsonl_dir, outdir), number=1, repeat=repeat))
+            print(f'{label:>14}: {count / duration:,.0f} notes/s')
+        set_column_from_variable(current)
+        assert filecmp.cmp(outputs['original'], outputs['grouped rows'], shallow=False)
+        print(f'Identical tables for {count:,} notes.')
+        full = read_csv(outputs['grouped rows'])
+        for label, columns, column_groups in PROJECTIONS:
+            outdir = pathlib.Path(tmpdir) / label
+            result = build_table(jsonl_dir, outdir, columns=columns, column_groups=column_groups)
+            selected = METADATA_COLUMNS + tuple(BUILD_PLAN.get_columns(columns, column_groups))
+            assert read_csv(result) == [{column: row[column] for column in selected} for row in full]
+            duration = min(timeit.repeat(
+                lambda: build_table(jsonl_dir, outdir, columns=columns, column_groups=column_groups),
+                number=1, repeat=repeat))
+            print(f'{label:>14}: {count / duration:,.0f} notes/s ({len(selected) - len(METADATA_COLUMNS)} columns)')
+        print(f'Identical projected columns for {count:,} notes.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare reading notes from the directory layout (a `*.txt` file, with optional `.meta` and `.sect` files,
+    per note) against reading them from a packed corpus (see `corpuspack`), and with/without prefetching.
+
+On local disks, the directory layout is cached after the first read, so the difference is modest;
+    on network filesystems, each open (and `exists` probe) is a round trip: use `--latency` to simulate this.
+"""
+import json
+import pathlib
+import tempfile
+import time
+import timeit
+
+import click
+
+from eye_extractor import corpusio
+from eye_extractor.corpusio import read_from_params
+from eye_extractor.corpuspack import iter_note_files, write_packed_corpus
+from eye_extractor.tools.pack_corpus import iter_files
+from notes import generate_notes
+
+
+def read_all(*directories, **kwargs):
+    return [(file, text, data) for file, text, data, _ in read_from_params(*directories, **kwargs)]
+
+
+@click.command()
+@click.option('--count', type=int, default=2_000, help='Number of notes.')
+@click.option('--length', type=int, default=2_000, help='Approximate number of characters per note.')
+@click.option('--repeat', type=int, default=3)
+@click.option('--latency', type=float, default=0.0, help='Seconds to add to reading each file (directory layout).')
+@click.option('--prefetch', type=int, default=16, help='Number of notes to read ahead when prefetching.')
+def main(count, length, repeat, latency, prefetch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directory = pathlib.Path(tmpdir) / 'notes'
+        directory.mkdir()
+        for i, note in enumerate(generate_notes(count, length)):
+            (directory / f'{i}.txt').write_text(note, encoding='utf8')
+            (directory / f'{i}.meta').write_text(json.dumps({'note_id': i}), encoding='utf8')
+        packed = pathlib.Path(tmpdir) / 'notes.eyepack'
+        write_packed_corpus(packed, iter_note_files(iter_files(directory)))
+        assert read_all(directory) == read_all(packed=packed)
+        print(f'Identical records for {count:,} notes.')
+        if latency:
+            read_file = corpusio.read_file
+
+            def slow_read_file(*args, **kwargs):
+                time.sleep(latency)
+                return read_file(*args, **kwargs)
+
+            corpusio.read_file = slow_read_file
+        for label, func in [
+            ('directory', lambda: read_all(directory)),
+            ('directory (prefetch)', lambda: read_all(directory, prefetch=prefetch)),
+            ('packed', lambda: read_all(packed=packed)),
+            ('packed (prefetch)', lambda: read_all(packed=packed, prefetch=prefetch)),
+        ]:
+            duration = min(timeit.repeat(func, number=1, repeat=repeat))
+            print(f'{label:>20}: {count / duration:,.0f} notes/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare extraction with and without skipping extractors whose trigger terms do not appear in a note
+    (see `nlp.keywords`).
+
+Synthetic notes are built either from all fragments or only from fragments which do not mention
+    any trigger terms of the skippable extractors (e.g., cataract-only notes).
+"""
+import random
+import timeit
+
+import click
+
+from eye_extractor.extract import extract_all
+from eye_extractor.nlp.keywords import KeywordIndex, TRIGGER_TERMS
+from eye_extractor.sections.document import Document
+from notes import FRAGMENTS, generate_notes
+
+
+def generate_untriggered_notes(count, length):
+    fragments = [fragment for fragment in FRAGMENTS if not KeywordIndex(fragment).has_any(TRIGGER_TERMS)]
+    notes = []
+    for i in range(count):
+        rng = random.Random(i)
+        note = ''
+        while len(note) < length:
+            note += rng.choice(fragments)
+        notes.append(note)
+    return notes
+
+
+def run(notes):
+    return [extract_all(note) for note in notes]
+
+
+def unskipped(notes):
+    """Run all extractors"""
+    has_any_term = Document.has_any_term
+    Document.has_any_term = lambda self, terms: True
+    try:
+        return run(notes)
+    finally:
+        Document.has_any_term = has_any_term
+
+
+@click.command()
+@click.option('--count', type=int, default=5, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+@click.option('--repeat', type=int, default=3)
+def main(count, length, repeat):
+    for label, notes in [
+        ('all fragments', generate_notes(count, length)),
+        ('untriggered fragments', generate_untriggered_notes(count, length)),
+    ]:
+        assert run(notes) == unskipped(notes)
+        print(f'{label}: identical output for {len(notes):,} notes.')
+        for name, func in [
+            ('unskipped', lambda: unskipped(notes)),
+            ('skipped', lambda: run(notes)),
+        ]:
+            duration = min(timeit.repeat(func, number=1, repeat=repeat))
+            print(f'{name:>10}: {duration / len(notes) * 1000:.1f} ms/note')
+
+
+if __name__ == '__main__':
+    main()
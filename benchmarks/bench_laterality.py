@@ -0,0 +1,52 @@
+"""
+Compare building laterality tables for all views of a document (full text, text without history, text without
+    OCT macula, sections, and split snippets) by rescanning each view vs using the document's `LateralityIndex`.
+"""
+import timeit
+
+import click
+
+from eye_extractor.laterality import build_laterality_table
+from eye_extractor.sections.document import Document
+from notes import generate_notes
+
+
+def _views(doc: Document):
+    """Yield (text, spans) of each view for which a laterality table is built"""
+    yield doc.text, [(0, 0, len(doc.text))]
+    yield doc.text_no_hx, doc.spans_no_hx
+    yield doc.text_no_oct_macula, doc.spans_no_oct_macula
+    for section in doc.sections:
+        yield section.text, section.spans
+    start = 0
+    for snippet in doc.text.split('.'):
+        yield snippet, [(0, start, len(snippet))]
+        start += len(snippet) + 1
+
+
+def rescan(doc, views):
+    return [build_laterality_table(text) for text, _ in views]
+
+
+def indexed(doc, views):
+    return [doc.laterality_index(text, spans=spans) for text, spans in views]
+
+
+@click.command()
+@click.option('--count', type=int, default=20, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+@click.option('--repeat', type=int, default=5)
+def main(count, length, repeat):
+    docs = [Document(note) for note in generate_notes(count, length)]
+    views = [list(_views(doc)) for doc in docs]
+    for doc, doc_views in zip(docs, views):
+        assert [list(t) for t in rescan(doc, doc_views)] == [list(t) for t in indexed(doc, doc_views)]
+    for name, func in [('rescan', rescan), ('indexed', indexed)]:
+        duration = min(timeit.repeat(
+            lambda: [func(doc, doc_views) for doc, doc_views in zip(docs, views)], number=1, repeat=repeat
+        ))
+        print(f'{name:>10}: {duration / count * 1000:.2f} ms/note')
+
+
+if __name__ == '__main__':
+    main()
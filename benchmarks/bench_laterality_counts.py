@@ -0,0 +1,44 @@
+"""
+Compare counting punctuation between a match and nearby lateralities by slicing the text (`count_all`)
+    against the cumulative counts used by `count_between`.
+"""
+import re
+import timeit
+
+import click
+
+from eye_extractor.laterality import build_laterality_table, LateralityLocator
+from notes import generate_notes
+
+
+@click.command()
+@click.option('--count', type=int, default=10, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+@click.option('--max-distance', type=int, default=100, help='Max distance between word and laterality.')
+@click.option('--repeat', type=int, default=5)
+def main(count, length, max_distance, repeat):
+    value = LateralityLocator.DEFAULT_COUNT_LETTERS
+    notes = generate_notes(count, length)
+    tables = [build_laterality_table(note) for note in notes]
+    pairs = [
+        [(lat.start, m.start()) for m in re.finditer(r'\w+', note) for lat in table
+         if abs(m.start() - lat.start) < max_distance]
+        for note, table in zip(notes, tables)
+    ]
+    for note, table, note_pairs in zip(notes, tables, pairs):
+        for start, end in note_pairs:
+            assert table.count_all(note[start:end], value) == table.count_between(start, end, note, value)
+    print(f'{sum(len(p) for p in pairs) / count:,.0f} counts/note')
+    for name, func in [
+        ('slice', lambda t, n, s, e: t.count_all(n[s:e], value)),
+        ('cumulative', lambda t, n, s, e: t.count_between(s, e, n, value)),
+    ]:
+        duration = min(timeit.repeat(
+            lambda: [func(table, note, s, e) for note, table, p in zip(notes, tables, pairs) for s, e in p],
+            number=1, repeat=repeat,
+        ))
+        print(f'{name:>10}: {duration / count * 1000:.2f} ms/note')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare `LateralityLocator` lookups using bisection against the original linear scans,
+    checking that the laterality assigned to every word in the notes is identical.
+
+Both the notes from the test suite and long synthetic notes are compared and timed.
+"""
+import re
+import timeit
+
+import click
+
+from eye_extractor.laterality import build_laterality_table, LateralityLocator
+from notes import collect_test_notes, generate_notes
+
+
+class LinearLateralityLocator(LateralityLocator):
+    """Original implementation: scan all lateralities from the start for each lookup"""
+
+    def __init__(self, lateralities):
+        super().__init__(lateralities)
+        self._lat_list = list(lateralities)
+
+    def get_previous_section(self, match_start, text, *, exclude_intervening_headers=True):
+        prev_lat_section = None
+        for i, lat in enumerate(self._lat_list):
+            if lat.is_section_start:
+                if lat.start > match_start:
+                    if prev_lat_section:
+                        if exclude_intervening_headers:
+                            if text[lat.start: match_start].count(':') > 1:
+                                return None
+                        return prev_lat_section
+                    return None
+                else:
+                    prev_lat_section = lat
+        return prev_lat_section
+
+    def get_previous_next_non_section(self, match_start, text):
+        last_found_lat = None
+        for i, lat in enumerate(self._lat_list):
+            if lat.is_section_start:
+                if lat.start == match_start:
+                    return lat, None
+                elif lat.start < match_start:
+                    last_found_lat = lat
+                elif (lat.start > match_start) and ('-' in text[lat.start - 3: lat.start]):
+                    return last_found_lat, lat
+                else:
+                    return last_found_lat, None
+            else:
+                if lat.start == match_start:
+                    return lat, None
+                elif lat.start < match_start:
+                    last_found_lat = lat
+                else:
+                    return last_found_lat, lat
+        return last_found_lat, None
+
+
+def assign(table, text, spans):
+    return [table.get_by_index(span, text) for span in spans]
+
+
+def compare(label, notes, repeat):
+    tables = [build_laterality_table(note) for note in notes]
+    linear = [LinearLateralityLocator(list(table)) for table in tables]
+    spans = [[m.span() for m in re.finditer(r'\w+', note)] for note in notes]
+    for note, table, linear_table, note_spans in zip(notes, tables, linear, spans):
+        assert assign(table, note, note_spans) == assign(linear_table, note, note_spans)
+    print(f'{label}: identical lateralities assigned to {sum(len(s) for s in spans):,} words'
+          f' in {len(notes):,} notes.')
+    for name, lst in [('linear', linear), ('bisect', tables)]:
+        duration = min(timeit.repeat(
+            lambda: [assign(table, note, s) for note, table, s in zip(notes, lst, spans)], number=1, repeat=repeat
+        ))
+        print(f'{name:>10}: {duration / len(notes) * 1000:.3f} ms/note')
+
+
+@click.command()
+@click.option('--count', type=int, default=10, help='Number of synthetic notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per synthetic note.')
+@click.option('--repeat', type=int, default=3)
+def main(count, length, repeat):
+    compare('Test suite notes', collect_test_notes(), repeat)
+    compare('Synthetic notes', generate_notes(count, length), repeat)
+
+if __name__ == '__main__':
+    main()
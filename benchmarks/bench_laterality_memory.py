@@ -0,0 +1,58 @@
+"""
+Compare per-note memory of laterality tables (for all views of a document) stored as `LatLocation` objects
+    in a `SortedList` (original) against the array-backed `LateralityLocator`.
+"""
+import tracemalloc
+
+import click
+from sortedcontainers import SortedList
+
+from eye_extractor.sections.document import Document
+from bench_laterality import _views
+from notes import generate_notes
+
+
+class LegacyLatLocation:
+    """Original `LatLocation`: no `__slots__`"""
+
+    def __init__(self, laterality, start, end, is_section_start):
+        self.laterality = laterality
+        self.start = start
+        self.end = end
+        self.is_section_start = is_section_start
+
+    def __getitem__(self, item):
+        return (self.laterality, self.start, self.end, self.is_section_start)[item]
+
+
+def legacy_table(table):
+    return SortedList([LegacyLatLocation(*lat) for lat in table], key=lambda x: x[1])
+
+
+def measure(func):
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+@click.command()
+@click.option('--count', type=int, default=20, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+def main(count, length):
+    docs = [Document(note) for note in generate_notes(count, length)]
+    views = [list(_views(doc)) for doc in docs]
+    tables = [[doc.laterality_index(text, spans=spans) for text, spans in doc_views]
+              for doc, doc_views in zip(docs, views)]
+    n_lats = sum(len(table) for doc_tables in tables for table in doc_tables)
+    print(f'{n_lats / count:,.0f} lateralities/note across {sum(len(v) for v in views) / count:,.0f} views/note')
+    legacy_size, _ = measure(lambda: [[legacy_table(table) for table in doc_tables] for doc_tables in tables])
+    array_size, _ = measure(lambda: [[doc.laterality_index(text, spans=spans) for text, spans in doc_views]
+                                     for doc, doc_views in zip(docs, views)])
+    print(f'{"legacy":>10}: {legacy_size / count / 1024:,.1f} KiB/note')
+    print(f'{"array":>10}: {array_size / count / 1024:,.1f} KiB/note')
+
+
+if __name__ == '__main__':
+    main()
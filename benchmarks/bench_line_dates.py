@@ -0,0 +1,48 @@
+"""
+Compare finding the most recent date in the current line for every word in a note by parsing the preceding
+    text of the line (original) against the cached `LineDateIndex`.
+"""
+import re
+import timeit
+
+import click
+from loguru import logger
+
+from eye_extractor.common.date import parse_all_dates, LineDateIndex
+from notes import generate_notes
+
+
+def parse_nearest_date_to_line_start(start, text):
+    """Original implementation"""
+    line = re.compile(r'[\n\r¶]').split(text[:start])[-1]
+    dates = parse_all_dates(line)
+    if dates:
+        return dates[-1][1]
+    return None
+
+
+@click.command()
+@click.option('--count', type=int, default=10, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+@click.option('--repeat', type=int, default=3)
+def main(count, length, repeat):
+    logger.remove()  # failed year-only parses are logged
+    notes = generate_notes(count, length)
+    starts = [[m.start() for m in re.finditer(r'\w+', note)] for note in notes]
+    for note, note_starts in zip(notes, starts):
+        index = LineDateIndex(note)
+        assert [index.get_date(i) for i in note_starts] == [parse_nearest_date_to_line_start(i, note)
+                                                             for i in note_starts]
+    print(f'Identical dates for {sum(len(s) for s in starts):,} words.')
+    for name, func in [
+        ('parse', lambda note, note_starts: [parse_nearest_date_to_line_start(i, note) for i in note_starts]),
+        ('index', lambda note, note_starts: list(map(LineDateIndex(note).get_date, note_starts))),
+    ]:
+        duration = min(timeit.repeat(
+            lambda: [func(note, note_starts) for note, note_starts in zip(notes, starts)], number=1, repeat=repeat,
+        ))
+        print(f'{name:>10}: {duration / count * 1000:.2f} ms/note')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare negation context normalisation per call (original) against `NegationTokens` built once per note
+    (as while extracting from a `Document`, see `nlp.text_index`).
+
+As in the extractors, each word is checked for both negation and history.
+"""
+import re
+import timeit
+
+import click
+
+from eye_extractor.nlp.negate.negation import (
+    _handle_negation_with_punctuation,
+    _prep_negation_tree,
+    DEFAULT_BOUNDARY_REGEX,
+    is_negated,
+    is_post_negated,
+    NEGWORDS,
+    NEGWORDS_POST,
+)
+from eye_extractor.common.string import replace_punctuation
+from eye_extractor.nlp.negate.historical import HISTORY_WORDS
+from eye_extractor.nlp.text_index import text_index_scope
+from notes import generate_notes
+
+
+def _get_context(context, boundary_chars, boundary_regex, skip_regex, lowercase_text, hack_punctuation, pieces):
+    if boundary_chars:
+        if skip_regex is not None:
+            context = skip_regex.sub(' ', context)
+        boundary_pattern = f'[{re.escape(boundary_chars)}]'
+        if boundary_regex:
+            boundary_pattern = f'(?:{boundary_regex.pattern}|{boundary_pattern})'
+        context_list = re.split(boundary_pattern, context)
+        context = ' '.join(context_list[pieces])
+    if lowercase_text:
+        context = context.lower()
+    if hack_punctuation:
+        context = _handle_negation_with_punctuation(context)
+    return replace_punctuation(context).split()
+
+
+def has_before(end_idx, text, terms, *, word_window=2, char_window=0, skip_regex=None, boundary_regex=None,
+               boundary_chars=':¶', skip_n_boundary_chars=0, lowercase_text=True, hack_punctuation=False,
+               return_unknown=False):
+    """Original implementation"""
+    if not char_window:
+        char_window = word_window * 10
+    words = _get_context(text[max(0, end_idx - char_window): end_idx], boundary_chars, boundary_regex, skip_regex,
+                         lowercase_text, hack_punctuation, slice(-1 - skip_n_boundary_chars, None))
+    return _prep_negation_tree(words[-word_window:], terms, return_unknown=return_unknown)
+
+
+def has_after(start_idx, text, terms, *, word_window=2, char_window=0, boundary_regex=None,
+              skip_n_boundary_chars=1, skip_regex=None, boundary_chars=':¶', lowercase_text=True,
+              hack_punctuation=False, return_unknown=False):
+    """Original implementation"""
+    if not char_window:
+        char_window = word_window * 10
+    words = _get_context(text[start_idx: start_idx + char_window], boundary_chars, boundary_regex, skip_regex,
+                         lowercase_text, hack_punctuation, slice(None, 1 + skip_n_boundary_chars))
+    return _prep_negation_tree(words[:word_window], terms, return_unknown=return_unknown)
+
+
+def original(note, spans, word_window):
+    return [
+        (has_before(start, note, NEGWORDS, word_window=word_window, boundary_regex=DEFAULT_BOUNDARY_REGEX,
+                    hack_punctuation=True),
+         has_before(start, note, HISTORY_WORDS, word_window=word_window, boundary_regex=DEFAULT_BOUNDARY_REGEX,
+                    hack_punctuation=True),
+         has_after(end, note, NEGWORDS_POST, word_window=word_window, boundary_regex=DEFAULT_BOUNDARY_REGEX,
+                   hack_punctuation=True))
+        for start, end in spans
+    ]
+
+
+def tokens(note, spans, word_window):
+    with text_index_scope({}):
+        return [
+            (is_negated(start, note, word_window=word_window),
+             is_negated(start, note, HISTORY_WORDS, word_window=word_window),
+             is_post_negated(end, note, word_window=word_window))
+            for start, end in spans
+        ]
+
+
+@click.command()
+@click.option('--count', type=int, default=10, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+@click.option('--word-window', type=int, default=4)
+@click.option('--repeat', type=int, default=5)
+def main(count, length, word_window, repeat):
+    notes = generate_notes(count, length)
+    spans = [[m.span() for m in re.finditer(r'\w+', note)] for note in notes]
+    for note, note_spans in zip(notes, spans):
+        assert original(note, note_spans, word_window) == tokens(note, note_spans, word_window)
+    print(f'Identical negation for {sum(len(s) for s in spans):,} words.')
+
+    for name, func in [
+        ('original', lambda: [original(note, note_spans, word_window) for note, note_spans in zip(notes, spans)]),
+        ('tokens', lambda: [tokens(note, note_spans, word_window) for note, note_spans in zip(notes, spans)]),
+    ]:
+        duration = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f'{name:>10}: {duration / count * 1000:.2f} ms/note')
+
+
+if __name__ == '__main__':
+    main()
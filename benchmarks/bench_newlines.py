@@ -0,0 +1,76 @@
+"""
+Compare line boundary helpers scanning/splitting the text (original) against `LineIndex` bisection.
+"""
+import re
+import timeit
+
+import click
+
+from eye_extractor.nlp.character_groups import LineIndex, LINE_START_CHARS, LINE_START_CHARS_RX
+from notes import generate_notes
+
+
+def get_previous_text_to_newline(index, text, line_start_chars=LINE_START_CHARS_RX):
+    pat = re.compile(f'[{line_start_chars}]')
+    line = pat.split(text[:index])[-1]
+    return line
+
+
+def get_next_text_to_newline(index, text, line_end_chars=LINE_START_CHARS_RX):
+    pat = re.compile(f'[{line_end_chars}]')
+    line = pat.split(text[index:])[0]
+    return line
+
+
+def get_next_index_of_newline(index, text, line_end_chars=LINE_START_CHARS):
+    i = index
+    for i, letter in enumerate(text[index:], start=index):
+        if letter in line_end_chars:
+            return i
+    return i
+
+
+def get_previous_index_of_newline(index, text, line_end_chars=LINE_START_CHARS):
+    i = index
+    for i, letter in enumerate(text[:index][::-1]):
+        if letter in line_end_chars:
+            return index - i
+    return i
+
+
+FUNCTIONS = [
+    (get_previous_text_to_newline, LineIndex.get_previous_text_to_newline),
+    (get_next_text_to_newline, LineIndex.get_next_text_to_newline),
+    (get_next_index_of_newline, LineIndex.get_next_index_of_newline),
+    (get_previous_index_of_newline, LineIndex.get_previous_index_of_newline),
+]
+
+
+@click.command()
+@click.option('--count', type=int, default=10, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+@click.option('--repeat', type=int, default=3)
+def main(count, length, repeat):
+    notes = generate_notes(count, length)
+    starts = [[m.start() for m in re.finditer(r'\w+', note)] for note in notes]
+    indexes = [LineIndex(note) for note in notes]
+    for original, method in FUNCTIONS:
+        for note, index in zip(notes, indexes):
+            assert [original(i, note) for i in range(-5, len(note) + 5)] == [
+                method(index, i) for i in range(-5, len(note) + 5)
+            ]
+        original_duration = min(timeit.repeat(
+            lambda: [original(i, note) for note, note_starts in zip(notes, starts) for i in note_starts],
+            number=1, repeat=repeat,
+        ))
+        index_duration = min(timeit.repeat(
+            lambda: [[method(index, i) for i in note_starts] for index, note_starts in
+                     zip([LineIndex(note) for note in notes], starts)],
+            number=1, repeat=repeat,
+        ))
+        print(f'{original.__name__:>30}: {original_duration / count * 1000:8.2f} ms/note'
+              f' -> {index_duration / count * 1000:6.2f} ms/note')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare searching pattern batteries with a separate scan per pattern (`PatternBattery`) against
+    a single fused scanner (an alternation of lookaheads, one for each pattern, after which
+    the patterns which can match at each candidate position are matched).
+
+Also compare finding and then removing `VA_LINE_*` matches (original, two scans per pattern)
+    against `PatternBattery.sub` (one scan per pattern).
+"""
+import re
+import timeit
+
+import click
+
+from eye_extractor.amd.drusen import DRUSEN_BATTERY
+from eye_extractor.dr.binary_vars import DIABETIC_RETINOPATHY_PATS
+from eye_extractor.nlp.pattern_battery import PatternBattery
+from eye_extractor.sections.sections import ITEM_BATTERY
+from eye_extractor.va.extractor2 import VA_LINE_BATTERY
+from notes import generate_notes
+
+_SCOPED_FLAGS = {re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's', re.VERBOSE: 'x', re.ASCII: 'a'}
+
+
+class FusedScanner:
+    """Single scanner for a battery of patterns without named groups or backreferences"""
+
+    def __init__(self, battery: PatternBattery):
+        self.patterns = [pattern for _, pattern in battery]
+        alternatives = []
+        self.pattern_indices = {}  # scanner group -> pattern index
+        group = 1
+        for i, pattern in enumerate(self.patterns):
+            flags = ''.join(letter for flag, letter in _SCOPED_FLAGS.items() if pattern.flags & flag)
+            alternatives.append(f'(?=((?{flags}:{pattern.pattern})))' if flags else f'(?=({pattern.pattern}))')
+            self.pattern_indices[group] = i
+            group += pattern.groups + 1
+        self.scanner = re.compile('|'.join(alternatives))
+
+    def iter_by_pattern(self, text):
+        matches = [[] for _ in self.patterns]
+        next_starts = [0] * len(self.patterns)
+        pos = 0
+        while (m := self.scanner.search(text, pos)) is not None:
+            pos = m.start()
+            for i in range(self.pattern_indices[m.lastindex], len(self.patterns)):  # earlier alternatives failed
+                if next_starts[i] <= pos and (match := self.patterns[i].match(text, pos)) is not None:
+                    next_starts[i] = match.end()
+                    matches[i].append(match)
+            pos += 1
+        for i, pattern_matches in enumerate(matches):
+            for m in pattern_matches:
+                yield i, m
+
+
+def separate(battery, texts):
+    return [[(m.start(), m.end()) for _, m in battery.iter_by_pattern(text)] for text in texts]
+
+
+def fused(scanner, texts):
+    return [[(m.start(), m.end()) for _, m in scanner.iter_by_pattern(text)] for text in texts]
+
+
+def va_original(texts):
+    result = []
+    for text in texts:
+        spans = []
+        for _, pattern in VA_LINE_BATTERY:
+            spans += [(m.start(), m.end()) for m in pattern.finditer(text)]
+            text = pattern.sub(' ', text)
+        result.append((spans, text))
+    return result
+
+
+def va_battery(texts):
+    result = []
+    for text in texts:
+        matches, text = VA_LINE_BATTERY.sub(' ', text)
+        result.append(([(m.start(), m.end()) for _, m in matches], text))
+    return result
+
+
+@click.command()
+@click.option('--count', type=int, default=10, help='Number of notes.')
+@click.option('--length', type=int, default=10_000, help='Approximate number of characters per note.')
+@click.option('--repeat', type=int, default=5)
+def main(count, length, repeat):
+    notes = generate_notes(count, length)
+    snippets = [snippet for note in notes for snippet in re.split(r'[\W]\d+[).-]|\n', note)]
+    for name, battery, texts in [
+        ('DIABETIC_RETINOPATHY_PATS', DIABETIC_RETINOPATHY_PATS, notes),
+        ('DRUSEN_BATTERY', DRUSEN_BATTERY, notes),
+        ('ITEM_BATTERY (snippets)', ITEM_BATTERY, snippets),
+    ]:
+        scanner = FusedScanner(battery)
+        assert separate(battery, texts) == fused(scanner, texts)
+        print(f'{name}: identical matches in {len(texts):,} texts.')
+        for label, func in [
+            ('separate', lambda: separate(battery, texts)),
+            ('fused', lambda: fused(scanner, texts)),
+        ]:
+            duration = min(timeit.repeat(func, number=1, repeat=repeat))
+            print(f'{label:>10}: {len(texts) / duration:,.0f} texts/s')
+
+    assert va_original(notes) == va_battery(notes)
+    print(f'VA_LINE_BATTERY: identical matches and text in {len(notes):,} notes.')
+    for label, func in [
+        ('original', lambda: va_original(notes)),
+        ('battery', lambda: va_battery(notes)),
+    ]:
+        duration = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f'{label:>10}: {len(notes) / duration:,.0f} notes/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Audit compiled patterns for super-linear (backtracking) behaviour on long, adversarial notes.
+
+* Every compiled pattern defined at module level in `eye_extractor` (including those in module-level
+    lists, tuples, dicts and pattern batteries) is searched (`findall`) in generated inputs of growing size.
+* Inputs repeat small units likely to cause backtracking when no match can complete: the pattern's
+    own literal words (without the punctuation which usually ends a match), comma lists, runs of
+    letters, spaces and punctuation. Each is prefixed by the pattern's literal words so that
+    the pattern starts to match.
+* Growth is estimated from the two largest sizes: time doubles for linear patterns (exponent 1),
+    quadruples for quadratic (exponent 2). Patterns exceeding `--budget` seconds on a single input
+    are interrupted and reported as timeouts.
+
+Patterns compiled within functions (or bound as default arguments) are not audited.
+"""
+import csv
+import importlib
+import inspect
+import math
+import pkgutil
+import re
+import signal
+import sys
+import time
+
+import click
+
+import eye_extractor
+from eye_extractor.nlp.pattern_battery import PatternBattery
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # python 3.10
+    import sre_constants
+    import sre_parse
+
+FAMILIES = {
+    'literals': lambda words: ' '.join(words) + ' ',
+    'commas': lambda words: 'a,',
+    'words': lambda words: 'word ',
+    'letters': lambda words: 'a',
+    'spaces': lambda words: ' ',
+    'punctuation': lambda words: '-/',
+    'lines': lambda words: f'{words[0]}\n',
+}
+COLUMNS = ['pattern', 'family', 'exponent', 'timeout']
+
+
+class PatternTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise PatternTimeout
+
+
+def iter_patterns():
+    """Generate (name, pattern) for module-level compiled patterns, named where they are defined"""
+    for module_info in pkgutil.walk_packages(eye_extractor.__path__, f'{eye_extractor.__name__}.'):
+        importlib.import_module(module_info.name)
+    names = {}  # pattern -> (defined in module, name)
+    for module_name, module in sorted(sys.modules.items()):
+        if not module_name.startswith(f'{eye_extractor.__name__}.'):
+            continue
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            source = ''
+        for key, value in vars(module).items():
+            is_defined = bool(re.search(rf'^{re.escape(key)}\s*=', source, re.MULTILINE))
+            for name, pattern in _iter_patterns(value, f'{module_name}.{key}'):
+                if pattern not in names or (is_defined and not names[pattern][0]):
+                    names[pattern] = (is_defined, name)
+    for pattern, (_, name) in sorted(names.items(), key=lambda x: x[1][1]):
+        yield name, pattern
+
+
+def _iter_patterns(obj, name, depth=3):
+    if isinstance(obj, re.Pattern):
+        yield name, obj
+    elif depth == 0:
+        return
+    elif isinstance(obj, PatternBattery):
+        yield from _iter_patterns(obj.patterns, name, depth)
+    elif isinstance(obj, (list, tuple)):
+        for i, item in enumerate(obj):
+            yield from _iter_patterns(item, f'{name}[{i}]', depth - 1)
+    elif isinstance(obj, dict):
+        for key, item in obj.items():
+            yield from _iter_patterns(item, f'{name}[{key!r}]', depth - 1)
+
+
+def literal_words(pattern: re.Pattern, limit=6) -> list[str]:
+    """Words (runs of literal letters) in `pattern`, in order of appearance"""
+    words = []
+
+    def walk(items):
+        word = ''
+        for op, av in items:
+            if op is sre_constants.LITERAL and chr(av).isalpha():
+                word += chr(av)
+                continue
+            if len(word) > 1:
+                words.append(word.lower())
+            word = ''
+            for arg in av if isinstance(av, (tuple, list)) else ():
+                if isinstance(arg, sre_parse.SubPattern):
+                    walk(arg)
+                elif isinstance(arg, list):
+                    for sub in arg:
+                        if isinstance(sub, sre_parse.SubPattern):
+                            walk(sub)
+        if len(word) > 1:
+            words.append(word.lower())
+
+    walk(sre_parse.parse(pattern.pattern, pattern.flags))
+    return list(dict.fromkeys(words))[:limit] or ['word']
+
+
+def build_input(words, unit, size):
+    prefix = ' '.join(words) + ' '
+    return prefix + unit * max(1, (size - len(prefix)) // len(unit))
+
+
+def time_pattern(pattern, text, budget, repeat):
+    """Fastest of `repeat` runs of `findall`; raises `PatternTimeout` if a run exceeds `budget` seconds"""
+    best = math.inf
+    for _ in range(repeat):
+        signal.setitimer(signal.ITIMER_REAL, budget)
+        try:
+            start = time.perf_counter()
+            pattern.findall(text)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return best
+
+
+def audit_pattern(name, pattern, sizes, budget, repeat):
+    """Generate result row for each input family"""
+    words = literal_words(pattern)
+    for family, get_unit in FAMILIES.items():
+        unit = get_unit(words)
+        seconds = []
+        timeout = False
+        for size in sizes:
+            try:
+                seconds.append(time_pattern(pattern, build_input(words, unit, size), budget, repeat))
+            except PatternTimeout:
+                timeout = True
+                break
+        exponent = None
+        if len(seconds) > 1 and seconds[-2] > 0:
+            exponent = math.log(seconds[-1] / seconds[-2], sizes[len(seconds) - 1] / sizes[len(seconds) - 2])
+        yield {
+            'pattern': name,
+            'family': family,
+            'exponent': exponent,
+            'timeout': timeout,
+            **{f'seconds_{i}': s for i, s in enumerate(seconds)},
+        }
+
+
+def is_flagged(row, threshold, min_seconds):
+    if row['timeout']:
+        return True
+    last = max((v for k, v in row.items() if k.startswith('seconds_')), default=0)
+    return row['exponent'] is not None and row['exponent'] >= threshold and last >= min_seconds
+
+
+@click.command()
+@click.option('--pattern', 'name_pattern', default=None, help='Only audit patterns whose name matches this regex.')
+@click.option('--min-size', type=int, default=1_000, help='Smallest input, in characters.')
+@click.option('--max-size', type=int, default=8_000, help='Largest input, in characters.')
+@click.option('--budget', type=float, default=1.0, help='Maximum seconds for a single search.')
+@click.option('--threshold', type=float, default=1.5, help='Flag growth exponents at least this large.')
+@click.option('--min-seconds', type=float, default=0.001,
+              help='Ignore growth when the largest input is searched faster than this.')
+@click.option('--repeat', type=int, default=3)
+@click.option('--csv', 'csv_path', type=click.Path(dir_okay=False), default=None,
+              help='Write results for all patterns and inputs to this file.')
+@click.option('--fail/--no-fail', default=False, help='Exit with non-zero status if any pattern is flagged.')
+def main(name_pattern, min_size, max_size, budget, threshold, min_seconds, repeat, csv_path, fail):
+    sizes = [min_size]
+    while sizes[-1] * 2 <= max_size:
+        sizes.append(sizes[-1] * 2)
+    signal.signal(signal.SIGALRM, _raise_timeout)
+    rows = []
+    flagged = []
+    patterns = [(name, pattern) for name, pattern in iter_patterns()
+                if not name_pattern or re.search(name_pattern, name)]
+    print(f'Auditing {len(patterns):,} patterns on inputs of {", ".join(f"{s:,}" for s in sizes)} characters.')
+    start = time.perf_counter()
+    for name, pattern in patterns:
+        for row in audit_pattern(name, pattern, sizes, budget, repeat):
+            rows.append(row)
+            if is_flagged(row, threshold, min_seconds):
+                flagged.append(row)
+    print(f'Completed in {time.perf_counter() - start:.1f}s; flagged {len(flagged):,} pattern inputs:')
+    for row in sorted(flagged, key=lambda r: (not r['timeout'], -(r['exponent'] or 0))):
+        seconds = ', '.join(f'{v * 1000:.1f}' for k, v in row.items() if k.startswith('seconds_'))
+        growth = 'timeout' if row['timeout'] else f'exponent {row["exponent"]:.2f}'
+        print(f'  {row["pattern"]} ({row["family"]}): {growth}; ms: {seconds}')
+    if csv_path:
+        with open(csv_path, 'w', newline='', encoding='utf8') as out:
+            writer = csv.DictWriter(out, fieldnames=[*COLUMNS, *(f'seconds_{i}' for i in range(len(sizes)))])
+            writer.writeheader()
+            writer.writerows(rows)
+    if fail and flagged:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare building and searching the `JsonlSearcher` index against the original implementation
+    (one formatted insert per decoded line; lookups scan the jsonl file to the indexed line number).
+"""
+import json
+import pathlib
+import random
+import shutil
+import sqlite3
+import tempfile
+import timeit
+
+import click
+
+from eye_extractor.tools.search_jsonl import JsonlSearcher, load_date_hook
+from notes import generate_notes
+
+
+def original_populate(path):
+    conn = sqlite3.connect(path / 'original.idx')
+    cur = conn.cursor()
+    cur.execute('create table if not exists LOOKUP (docid TEXT, jsonl_file TEXT, line_number INT, kind INT);')
+    for file in path.glob('*.jsonl'):
+        with open(file, encoding='utf8') as fh:
+            for i, line in enumerate(fh):
+                data = json.loads(line, object_hook=load_date_hook)
+                cur.execute(
+                    f'insert into LOOKUP (docid, jsonl_file, line_number, kind)'
+                    f' values ("{data["note_id"]}", "{file.stem}.jsonl", {i}, 0)'
+                )
+    conn.commit()
+    return conn
+
+
+def original_lookup(conn, path, docid):
+    for jsonl_file, line_num in conn.execute(
+            f'select jsonl_file, line_number from LOOKUP where docid = "{docid}"'
+    ):
+        with open(path / jsonl_file, encoding='utf8') as fh:
+            for i, line in enumerate(fh):
+                if i == line_num:
+                    return json.dumps(json.loads(line, object_hook=load_date_hook), default=str, indent=2)
+
+
+@click.command()
+@click.option('--count', type=int, default=20_000, help='Number of jsonl lines.')
+@click.option('--length', type=int, default=2_000, help='Approximate number of characters per line.')
+@click.option('--files', type=int, default=4, help='Number of jsonl files.')
+@click.option('--lookups', type=int, default=100)
+def main(count, length, files, lookups):
+    notes = generate_notes(100, length)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir)
+        for i in range(files):
+            with open(path / f'eye_extractor_{i}.jsonl', 'w', encoding='utf8') as out:
+                for j in range(i, count, files):
+                    out.write(json.dumps({'note_id': j, 'note_date': '2022-02-22 00:00:00',
+                                          'text': notes[j % len(notes)]}) + '\n')
+        docids = random.Random(0).sample(range(count), lookups)
+
+        conn = None
+
+        def build_original():
+            nonlocal conn
+            conn = original_populate(path)
+
+        def build_indexed():
+            shutil.rmtree(path / '.index', ignore_errors=True)
+            JsonlSearcher(path).close()
+
+        for label, func in [('original', build_original), ('offsets', build_indexed)]:
+            duration = timeit.timeit(func, number=1)
+            print(f'Build {label:>10}: {count / duration:,.0f} lines/s')
+
+        with JsonlSearcher(path) as searcher:
+            assert all(original_lookup(conn, path, d) == searcher.lookup(d) for d in docids)
+            print(f'Identical results for {lookups:,} lookups.')
+            for label, func in [
+                ('original', lambda: [original_lookup(conn, path, d) for d in docids]),
+                ('offsets', lambda: [searcher.lookup(d) for d in docids]),
+            ]:
+                duration = timeit.timeit(func, number=1)
+                print(f'Lookup {label:>9}: {duration * 1000 / lookups:,.2f} ms/lookup')
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
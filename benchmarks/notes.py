@@ -0,0 +1,57 @@
+"""
+Generate long, synthetic eye exam notes for benchmarking.
+
+As with the tests, no clinical text is included: fragments are made up, though intended to resemble actual notes.
+"""
+import ast
+import pathlib
+import random
+
+FRAGMENTS = [
+    'PAST OCULAR HISTORY: cataract surgery OD 2015, AMD OS.\n',
+    'FAMILY HISTORY: glaucoma (mother), macular degeneration (father).\n',
+    'HPI: Pt reports blurry vision OU, worse OS than OD. No flashes or floaters.\n',
+    'VA sc: 20/40 OD 20/30 OS\nIOP: 15/17\n',
+    'LIDS: normal OU\nCONJUNCTIVA: white and quiet OU\nCORNEA: clear OD, trace spk OS\n',
+    'LENS: OD: 2+ NS, 1+ cortical OS: PCIOL, trace PCO\n',
+    'MACULA: OD: intermediate drusen, no fluid OS: subretinal fluid, heavy drusen\n',
+    'OPTIC NERVE: C/D 0.4 OD, 0.5 OS; no disc hemorrhage or notch\n',
+    'VESSELS: mild attenuation OU, no venous beading, no IRMA\n',
+    'PERIPHERY: flat 360 OU, no holes, tears or detachment\n',
+    'OCT MACULA: 2022-02-22 OD: no fluid, CMT 250 OS: SRF, CMT 310\n',
+    'ASSESSMENT: 1. Dry AMD OD, wet AMD OS s/p aflibercept\n2. Glaucoma suspect OU\n',
+    '3. Nuclear sclerosis cataract OD > OS, not visually significant\n',
+    '4. No diabetic retinopathy OU; no dot blot hemorrhages, cotton wool spots or exudates\n',
+    'PLAN: Continue AREDS, intravitreal injection OS today, RTC 4 weeks with OCT both eyes.\n',
+]
+
+
+def generate_note(length=10_000, *, seed=0):
+    """Build a note of (roughly) `length` characters from randomly selected fragments."""
+    rng = random.Random(seed)
+    result = []
+    size = 0
+    while size < length:
+        fragment = rng.choice(FRAGMENTS)
+        result.append(fragment)
+        size += len(fragment)
+    return ''.join(result)
+
+
+def generate_notes(count=20, length=10_000):
+    return [generate_note(length, seed=i) for i in range(count)]
+
+
+def collect_test_notes(test_dir=None, *, min_length=20):
+    """
+    Collect note text used in the test suite: every string literal in `test/**/*.py` of at least
+        `min_length` characters containing a space (i.e., excluding identifiers, paths and patterns).
+    """
+    test_dir = pathlib.Path(test_dir) if test_dir else pathlib.Path(__file__).parent.parent / 'test'
+    notes = []
+    for path in sorted(test_dir.rglob('*.py')):
+        for node in ast.walk(ast.parse(path.read_text(encoding='utf8'))):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                if len(node.value) >= min_length and ' ' in node.value:
+                    notes.append(node.value)
+    return notes
@@ -1,6 +1,7 @@
 import enum
 import re
 
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated
 from eye_extractor.laterality import create_new_variable
 from eye_extractor.sections.document import Document
@@ -21,6 +22,7 @@ CNV_PAT = re.compile(
 )
 
 
+@requires_terms('cnv', 'neovas', patterns=[CNV_PAT])
 def extract_choroidalneovasc(doc: Document):
     data = []
     if doc.sections:
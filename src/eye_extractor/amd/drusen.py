@@ -1,7 +1,9 @@
 import enum
 import re
 
+from eye_extractor.nlp.keywords import requires_terms
 from eye_extractor.nlp.negate.negation import NEGWORD_SET, is_negated
+from eye_extractor.nlp.pattern_battery import PatternBattery
 from eye_extractor.laterality import create_new_variable
 from eye_extractor.sections.document import Document
 from eye_extractor.sections.patterns import PatternGroup
@@ -65,6 +67,20 @@ BOTH_DRUSEN_PAT = re.compile(rf'({soft}(\s*(and|,|/)\s*hard)?|hard(\s*(and|,|/)\
 NO_DRUSEN_PAT = re.compile(rf'(?:(?:{"|".join(NEGWORD_SET)}) drusen)', re.I)
 
 
+# (label, value, priority, targets) -> pattern: later variables overwrite earlier ones (see `find_drusen`)
+DRUSEN_BATTERY = PatternBattery([
+    (('yes', Drusen.YES, 0, ('drusen_size', 'drusen_type')), DRUSEN_PAT),
+    (('no', Drusen.NO, 1, ('drusen_size', 'drusen_type')), NO_DRUSEN_PAT),
+    (('both', DrusenType.BOTH, 2, ('drusen_type',)), BOTH_DRUSEN_PAT),
+    (('hard', DrusenType.HARD, 3, ('drusen_type',)), HARD_DRUSEN_PAT),
+    (('soft', DrusenType.SOFT, 4, ('drusen_type',)), SOFT_DRUSEN_PAT),
+    (('small', DrusenSize.SMALL, 2, ('drusen_size',)), SMALL_DRUSEN_PAT),
+    (('intermediate', DrusenSize.INTERMEDIATE, 3, ('drusen_size',)), INTERMEDIATE_DRUSEN_PAT),
+    (('large', DrusenSize.LARGE, 2, ('drusen_size',)), LARGE_DRUSEN_PAT),
+])
+
+
+@requires_terms('druse', patterns=[pattern for _, pattern in DRUSEN_BATTERY])
 def extract_drusen(doc: Document):
     data = []
     if doc.sections:
@@ -84,27 +100,17 @@ def find_drusen(text, lateralities):
     :return:
     """
     data = []
-    for pattern, label, value, priority, targets in [
-        (DRUSEN_PAT, 'yes', Drusen.YES, 0, ('drusen_size', 'drusen_type')),
-        (NO_DRUSEN_PAT, 'no', Drusen.NO, 1, ('drusen_size', 'drusen_type')),
-        (BOTH_DRUSEN_PAT, 'both', DrusenType.BOTH, 2, ('drusen_type',)),
-        (HARD_DRUSEN_PAT, 'hard', DrusenType.HARD, 3, ('drusen_type',)),
-        (SOFT_DRUSEN_PAT, 'soft', DrusenType.SOFT, 4, ('drusen_type',)),
-        (SMALL_DRUSEN_PAT, 'small', DrusenSize.SMALL, 2, ('drusen_size',)),
-        (INTERMEDIATE_DRUSEN_PAT, 'intermediate', DrusenSize.INTERMEDIATE, 3, ('drusen_size',)),
-        (LARGE_DRUSEN_PAT, 'large', DrusenSize.LARGE, 2, ('drusen_size',)),
-    ]:
-        for m in pattern.finditer(text):
-            negword = is_negated(m, text, word_window=1)
-            for target in targets:
-                data.append(
-                    create_new_variable(text, m, lateralities, target, {
-                        'value': Drusen.NO if negword else value,
-                        'term': m.group(),
-                        'label': f'negated {label}' if negword else label,
-                        'negated': negword,
-                        'source': 'MACULA',
-                        'priority': priority,
-                    })
-                )
+    for (label, value, priority, targets), m in DRUSEN_BATTERY.iter_by_pattern(text):
+        negword = is_negated(m, text, word_window=1)
+        for target in targets:
+            data.append(
+                create_new_variable(text, m, lateralities, target, {
+                    'value': Drusen.NO if negword else value,
+                    'term': m.group(),
+                    'label': f'negated {label}' if negword else label,
+                    'negated': negword,
+                    'source': 'MACULA',
+                    'priority': priority,
+                })
+            )
     return data
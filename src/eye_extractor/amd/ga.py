@@ -2,6 +2,7 @@ import enum
 import re
 
 from eye_extractor.amd.utils import run_on_macula
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated
 from eye_extractor.laterality import create_new_variable
 from eye_extractor.sections.document import Document
@@ -22,6 +23,7 @@ GA_PAT = re.compile(
 )
 
 
+@requires_terms(word('ga'), 'geo', patterns=[GA_PAT])
 def extract_geoatrophy(doc: Document):
     return run_on_macula(
         macula_func=_extract_ga_macula,
@@ -2,6 +2,7 @@ import enum
 import re
 
 from eye_extractor.amd.utils import run_on_macula
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated
 from eye_extractor.laterality import create_new_variable
 from eye_extractor.sections.document import Document
@@ -26,6 +27,7 @@ PED_PAT = re.compile(
 )
 
 
+@requires_terms(word('ped'), word('peds'), word('rped'), word('rpeds'), 'pig', patterns=[PED_PAT])
 def extract_ped(doc: Document):
     return run_on_macula(
         macula_func=_extract_ped,
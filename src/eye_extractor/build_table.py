@@ -3,31 +3,33 @@ Build table from jsonl output.
 """
 import csv
 import datetime
+import functools
+import io
 import pathlib
 
 import click
 from loguru import logger
 
-from eye_extractor.builders.build_history import build_history
 from eye_extractor.clickargs import table_output_opts
-from eye_extractor.common.json import loads_json
+from eye_extractor.common.json import loads_json, loads_json_keys
 from eye_extractor.laterality import Laterality
-from eye_extractor.output.amd import build_amd_variables
-from eye_extractor.output.cataract import build_cataract_variables
-from eye_extractor.output.cataract_surgery import build_cataract_surgery_variables
 from eye_extractor.output.columns import OUTPUT_COLUMNS
-from eye_extractor.output.dr import build_dr_variables
-from eye_extractor.output.exam import build_exam
-from eye_extractor.output.glaucoma import build_glaucoma
-from eye_extractor.output.iop import build_iop
-from eye_extractor.output.ro import build_ro_variables
-from eye_extractor.output.shared import build_shared_variables
-from eye_extractor.output.uveitis import build_uveitis_variables
-from eye_extractor.output.va import build_va, get_manifest
+from eye_extractor.output.plan import BuildPlan
 from eye_extractor.output.validators import validate_columns_in_row
+from eye_extractor.output.variable import row_index_scope
+from eye_extractor.parallel import imap_ordered
 
+CHUNK_SIZE = 16 * 1024 * 1024  # bytes of jsonl per task when building with multiple workers
+BUILD_PLAN = BuildPlan()
+METADATA_COLUMNS = ('docid', 'studyid', 'date', 'encid', 'is_training')
 
-def process_data(data, *, add_columns=None, date_column='note_date'):
+
+def process_data(data, *, add_columns=None, date_column='note_date', plan: BuildPlan = None):
+    """
+    Build output columns from extracted variables
+
+    :param plan: build plan to use rather than `BUILD_PLAN` (e.g., to only build selected columns)
+    """
     result = {
         'docid': data['note_id'],
         'studyid': data.get('studyid', None),
@@ -41,63 +43,160 @@ def process_data(data, *, add_columns=None, date_column='note_date'):
     for col in add_columns or []:
         result[col] = data[col]
 
-    result.update(build_shared_variables(data))
-    result.update(build_va(data.get('va', [])))
-    result.update(build_iop(data.get('iop', [])))
-    result.update(get_manifest(data.get('manifestrx', [])))
-    result.update(build_amd_variables(data))
-    result.update(build_glaucoma(data))
-    result.update(build_uveitis_variables(data))
-    result.update(build_ro_variables(data))
-    result.update(build_cataract_variables(data))
-    result.update(build_cataract_surgery_variables(data))
-    result.update(build_history(data))
-    result.update(build_exam(data))
-    result.update(build_dr_variables(data))
+    with row_index_scope():  # index each list of rows once for all builders
+        result.update((BUILD_PLAN if plan is None else plan).run(data))
     return result
 
 
 @click.command()
 @click.argument('jsonl_file', type=click.Path(exists=True, path_type=pathlib.Path))
 @table_output_opts(True)
-def _build_table(jsonl_file: pathlib.Path, outdir: pathlib.Path, date_column='note_date', add_columns=None):
-    build_table(jsonl_file, outdir, date_column, add_columns)
+@click.option('--workers', type=int, default=1,
+              help='Number of processes to build rows in; row order is preserved.')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=CHUNK_SIZE,
+              help='With multiple workers, split jsonl files into chunks of about this many bytes.')
+@click.option('--columns', multiple=True,
+              help='Only build these output columns (comma-separated; may be repeated).')
+@click.option('--column-group', 'column_groups', multiple=True,
+              type=click.Choice(list(BUILD_PLAN.groups)),
+              help='Only build the columns of this group of variables (may be repeated).')
+def _build_table(jsonl_file: pathlib.Path, outdir: pathlib.Path, date_column='note_date', add_columns=None,
+                 workers=1, chunk_size=CHUNK_SIZE, columns=None, column_groups=None):
+    columns = [column.strip() for value in columns or () for column in value.split(',') if column.strip()]
+    build_table(jsonl_file, outdir, date_column, add_columns, workers=workers, chunk_size=chunk_size,
+                columns=columns, column_groups=column_groups)
 
 
-def build_table(jsonl_file: pathlib.Path, outdir: pathlib.Path, date_column='note_date', add_columns=None):
+def build_table(jsonl_file: pathlib.Path, outdir: pathlib.Path, date_column='note_date', add_columns=None,
+                *, workers=1, chunk_size=CHUNK_SIZE, columns=None, column_groups=None):
     """
 
     :param date_column: name of date column to use (defaults to 'note_date')
     :param add_columns:
     :param jsonl_file: if file, read that file; if directory, run all
     :param outdir:
+    :param workers: number of processes to build rows in; if > 1, jsonl files are split into chunks
+        (of about `chunk_size` bytes, at line boundaries) and the csv rows built for each chunk
+        are written in the order of the input
+    :param chunk_size: approximate size of chunks (in bytes) when using multiple workers
+    :param columns: only build these output columns (with metadata and `add_columns`); only the builders
+        for these columns are run, and only the parts of the jsonl they need are kept
+    :param column_groups: only build the columns of these groups of variables (see `BuildPlan.groups`)
     :return:
     """
     start_time = datetime.datetime.now()
     outdir.mkdir(parents=True, exist_ok=True)
-    logger.add(outdir / f'build_table_{start_time:%Y%m%d_%H%M%S}.log', level='INFO')
+    # enqueue: sink must be multiprocess-safe when workers also log
+    logger.add(outdir / f'build_table_{start_time:%Y%m%d_%H%M%S}.log', level='INFO', enqueue=workers > 1)
     outpath = outdir / f'variables_{jsonl_file.stem}_{start_time:%Y%m%d_%H%M%S}.csv'
     for col in add_columns or []:
         OUTPUT_COLUMNS[col] = []
+    if columns or column_groups:
+        columns = tuple(BUILD_PLAN.get_columns(columns, column_groups))
+    else:
+        columns = None
+    fieldnames = get_fieldnames(columns, add_columns)
     if jsonl_file.is_dir():
-        jsonl_files = jsonl_file.glob('*.jsonl')
+        jsonl_files = list(jsonl_file.glob('*.jsonl'))
     else:
         jsonl_files = [jsonl_file]
     with open(outpath, 'w', encoding='utf8', newline='') as out:
-        for i, jsonl_file in enumerate(jsonl_files):
-            with open(jsonl_file, encoding='utf8') as fh:
-                writer = csv.DictWriter(out, fieldnames=OUTPUT_COLUMNS.keys())
-                if i == 0:
-                    writer.writeheader()
-                for line in fh:
-                    data = loads_json(line.strip())
-                    result = process_data(data, add_columns=add_columns, date_column=date_column)
-                    validate_columns_in_row(OUTPUT_COLUMNS, result, id_col='studyid')
-                    writer.writerow(result)
+        if workers > 1:
+            if jsonl_files:
+                csv.DictWriter(out, fieldnames=fieldnames).writeheader()
+            chunks = (chunk for file in jsonl_files for chunk in iter_chunks(file, chunk_size))
+            for part in imap_ordered(functools.partial(_build_csv_part, date_column=date_column,
+                                                       add_columns=add_columns, columns=columns),
+                                     chunks, workers=workers):
+                out.write(part)
+        else:
+            for i, jsonl_file in enumerate(jsonl_files):
+                with open(jsonl_file, encoding='utf8') as fh:
+                    writer = _get_writer(out, columns, add_columns)
+                    if i == 0:
+                        writer.writeheader()
+                    for line in fh:
+                        writer.writerow(build_row(line, date_column=date_column, add_columns=add_columns,
+                                                  columns=columns))
     duration = datetime.datetime.now() - start_time
     logger.info(f'Total run time: {duration}')
     return outpath
 
 
+def get_fieldnames(columns=None, add_columns=None):
+    """Csv columns: all output columns, or (if `columns` are selected) metadata, `add_columns` and `columns`"""
+    if columns is None:
+        return list(OUTPUT_COLUMNS)
+    selected = {*METADATA_COLUMNS, *(add_columns or ()), *columns}
+    return [column for column in OUTPUT_COLUMNS if column in selected]
+
+
+def _get_writer(out, columns=None, add_columns=None):
+    # if columns are selected, builders may also return columns which were not selected
+    return csv.DictWriter(out, fieldnames=get_fieldnames(columns, add_columns),
+                          extrasaction='raise' if columns is None else 'ignore')
+
+
+@functools.cache
+def get_projection(columns: tuple, date_column='note_date', add_columns: tuple = ()):
+    """
+    Build plan for selected `columns`, and the top-level keys to keep from each jsonl line;
+        cached (e.g., once for each worker process)
+    """
+    plan = BUILD_PLAN.select(columns)
+    keys = plan.keys | {'note_id', 'studyid', date_column, 'enc_id', 'train', *add_columns}
+    return plan, keys
+
+
+def build_row(line, *, date_column='note_date', add_columns=None, columns=None):
+    """
+    Build (validated) csv row from a jsonl line
+
+    :param columns: if not None, only build these columns (other columns may be included, but not all)
+    """
+    if columns is None:
+        return build_row_from_data(loads_json(line.strip()), date_column=date_column, add_columns=add_columns)
+    plan, keys = get_projection(tuple(columns), date_column, tuple(add_columns or ()))
+    return build_row_from_data(loads_json_keys(line.strip(), keys), date_column=date_column,
+                               add_columns=add_columns, plan=plan)
+
+
+def build_row_from_data(data, *, date_column='note_date', add_columns=None, plan=None):
+    """Build (validated) csv row from extracted data, as loaded from jsonl (see `common.json.json_round_trip`)"""
+    result = process_data(data, add_columns=add_columns, date_column=date_column, plan=plan)
+    validate_columns_in_row(OUTPUT_COLUMNS, result, id_col='studyid')
+    return result
+
+
+def iter_chunks(path: pathlib.Path, chunk_size=CHUNK_SIZE):
+    """Split file at `path` into (path, start, end) byte ranges of about `chunk_size` bytes, ending at line ends"""
+    if chunk_size < 1:
+        raise ValueError(f'`chunk_size` must be at least 1 byte: {chunk_size}.')
+    size = path.stat().st_size
+    start = 0
+    with open(path, 'rb') as fh:
+        while start < size:
+            fh.seek(min(start + chunk_size, size) - 1)
+            fh.readline()  # continue to end of line
+            end = fh.tell()
+            yield path, start, end
+            start = end
+
+
+def _build_csv_part(chunk, *, date_column='note_date', add_columns=None, columns=None):
+    """Build csv rows (without header) for the lines in a (path, start, end) chunk; module-level for workers"""
+    path, start, end = chunk
+    for col in add_columns or []:  # if worker process did not inherit these
+        OUTPUT_COLUMNS[col] = []
+    out = io.StringIO()
+    writer = _get_writer(out, columns, add_columns)
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        for line in io.BytesIO(fh.read(end - start)):
+            writer.writerow(build_row(line.decode('utf8'), date_column=date_column, add_columns=add_columns,
+                                      columns=columns))
+    return out.getvalue()
+
+
 if __name__ == '__main__':
     _build_table()
@@ -4,7 +4,7 @@ import re
 from eye_extractor.amd.utils import run_on_macula
 from eye_extractor.nlp.negate.negation import is_negated, is_post_negated
 from eye_extractor.laterality import create_new_variable
-from eye_extractor.sections.document import Document, TextView
+from eye_extractor.sections.document import cache_on_document, Document, TextView
 
 
 class Fluid(enum.IntEnum):
@@ -136,6 +136,7 @@ SUB_AND_INTRARETINAL_FLUID_PAT = re.compile(
 )
 
 
+@cache_on_document
 def extract_fluid(doc: Document):
     data = []
     # prioritize OCT results
@@ -1,3 +1,4 @@
+import bisect
 import datetime
 import re
 from typing import Match
@@ -5,7 +6,8 @@ from typing import Match
 from dateutil.parser import parse, ParserError
 from loguru import logger
 
-from eye_extractor.nlp.character_groups import LINE_START_CHARS_RX, get_previous_text_to_newline
+from eye_extractor.nlp.character_groups import LINE_START_CHARS_RX, LineIndex
+from eye_extractor.nlp.text_index import get_text_index
 
 month_name = r'(?:\b(?P<month_name>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\b)'
 month = r'(?P<month>\d{1,2})'
@@ -149,11 +151,48 @@ def parse_date_after(m: Match, text, *, characters=20, as_string=False, allow_fu
 
 def parse_nearest_date_to_line_start(start, text, *, line_start_chars=LINE_START_CHARS_RX):
     """Get most recent date in current line."""
-    if line_start_chars:
-        line = get_previous_text_to_newline(start, text, line_start_chars=line_start_chars)
-    else:
-        line = text
-    dates = parse_all_dates(line)
-    if dates:
-        return dates[-1][1]  # return most recent date
-    return None
+    return get_text_index(LineDateIndex, text, line_start_chars).get_date(start)
+
+
+DIGIT_PAT = re.compile(r'\d')
+
+
+class LineDateIndex:
+    """
+    Find the most recent date in the current line (i.e., before an index) of a text.
+
+    * Line starts (see `LineIndex`) and digits are located once per text; while extracting from a document,
+        the index of each text is re-used (see `nlp.text_index`).
+    * Since every date pattern ends with a digit, lines are only parsed up to just after the last digit
+        before the index, and these results are cached, so that each line is usually only parsed once.
+    """
+
+    def __init__(self, text, line_start_chars=LINE_START_CHARS_RX):
+        self.text = text
+        self.line_start_chars = line_start_chars
+        # if no line start chars, treat entire text as a single line
+        self.lines = get_text_index(LineIndex, text, line_start_chars) if line_start_chars else None
+        self.digits = [m.start() for m in DIGIT_PAT.finditer(text)]
+        self._dates = {}
+
+    def get_date(self, start):
+        """Equivalent to parsing all dates in text from the start of the line to `start`, returning the last"""
+        if self.lines is None:
+            return self._parse_dates(0, len(self.text))
+        line_start = self.lines.get_line_start(start)
+        start = slice(start).indices(len(self.text))[1]  # as with `text[:start]`
+        j = bisect.bisect_left(self.digits, start)
+        if j == 0 or self.digits[j - 1] < line_start:
+            return None  # no digits, so no dates
+        # include character after last digit for word boundary; short strings must be parsed exactly
+        #   since year-only dates are parsed with a preceding context of 20 characters
+        end = min(start, self.digits[j - 1] + 2)
+        if end - line_start <= 20:
+            end = start
+        return self._parse_dates(line_start, end)
+
+    def _parse_dates(self, start, end):
+        if (start, end) not in self._dates:
+            dates = parse_all_dates(self.text[start: end])
+            self._dates[(start, end)] = dates[-1][1] if dates else None  # most recent date
+        return self._dates[(start, end)]
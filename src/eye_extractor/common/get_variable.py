@@ -1,10 +1,11 @@
 from typing import Callable
 
-from eye_extractor.laterality import build_laterality_table
+from eye_extractor.laterality import build_laterality_table, LateralityIndex
 from eye_extractor.sections.document import Document
 
 
-def _split_and_get_variable(text: str, get_helper: Callable, split_char: str, search_negated_list: bool = False):
+def _split_and_get_variable(text: str, get_helper: Callable, split_char: str, search_negated_list: bool = False,
+                            laterality_index: LateralityIndex = None):
     """Helper function to split text on a given character and process chunks independently.
 
     Given `text`, split on `split_char` and search for variables using `get_helper` on each chunk independently.
@@ -12,13 +13,20 @@ def _split_and_get_variable(text: str, get_helper: Callable, split_char: str, se
     :param text: Text to split into chunks.
     :param get_helper: Helper function used to specify extraction behavior.
     :param split_char: Single character to split `text` on.
+    :param laterality_index: if `text` is the document's text, its laterality index
     :return: List of all matches extracted from text chunks.
     """
     data = []
     if len(split_char) != 1:
         raise ValueError('`split_char` must be one character long.')
+    snippet_start = 0
     for snippet in text.split(split_char):
-        lateralities = build_laterality_table(snippet, search_negated_list=search_negated_list)
+        if laterality_index is None:
+            lateralities = build_laterality_table(snippet, search_negated_list=search_negated_list)
+        else:
+            lateralities = laterality_index(snippet, spans=[(0, snippet_start, len(snippet))],
+                                            search_negated_list=search_negated_list)
+        snippet_start += len(snippet) + 1
         for new_var in get_helper(snippet, lateralities, 'ALL'):
             data.append(new_var)
 
@@ -46,7 +54,8 @@ def get_variable(doc: Document, get_helper: Callable, *,
     if target_headers:
         for section in doc.iter_sections(*target_headers):
             if search_negated_list:
-                section_lateralities = build_laterality_table(section.text, search_negated_list=search_negated_list)
+                section_lateralities = doc.laterality_index(section.text, spans=section.spans,
+                                                            search_negated_list=search_negated_list)
             else:
                 section_lateralities = section.lateralities
             for new_var in get_helper(section.text, section_lateralities, section.name):
@@ -54,7 +63,9 @@ def get_variable(doc: Document, get_helper: Callable, *,
     # Extract matches from full text.
     if search_full_text:
         if split_char:
-            data += _split_and_get_variable(text or doc.text, get_helper, split_char, search_negated_list=search_negated_list)
+            data += _split_and_get_variable(text or doc.text, get_helper, split_char,
+                                            search_negated_list=search_negated_list,
+                                            laterality_index=None if text else doc.laterality_index)
         else:
             # get text and lateralities
             if text and lateralities:
@@ -64,7 +75,8 @@ def get_variable(doc: Document, get_helper: Callable, *,
             else:
                 text = doc.get_text()
                 if search_negated_list:
-                    lateralities = build_laterality_table(text, search_negated_list=search_negated_list)
+                    lateralities = doc.laterality_index(text, spans=doc.get_text_spans(),
+                                                        search_negated_list=search_negated_list)
                 else:
                     lateralities = doc.get_lateralities()
 
@@ -1,5 +1,6 @@
 import datetime
 import json
+from json.decoder import WHITESPACE, scanstring
 
 
 def load_json(fh):
@@ -24,6 +25,46 @@ def dumps_and_loads_json(data):
     return loads_json(dumps_json(data))
 
 
+_JSON_KEYWORDS = {True: 'true', False: 'false', None: 'null'}
+
+
+def json_round_trip(data):
+    """
+    Same result as `dumps_and_loads_json` (i.e., as writing to and reading from jsonl), without serialising:
+        tuples become lists, enums their values, other non-json types strings, dict keys strings,
+        and 'date' values in dicts are parsed by `load_date_hook`.
+    """
+    cls = type(data)
+    if cls is str or cls is int or cls is bool or data is None:
+        return data
+    elif isinstance(data, dict):
+        result = {}
+        for key, value in data.items():
+            result[key if type(key) is str else _json_key(key)] = json_round_trip(value)
+        return load_date_hook(result) if 'date' in result else result
+    elif isinstance(data, (list, tuple)):
+        return [json_round_trip(value) for value in data]
+    elif isinstance(data, str):  # e.g., StrEnum
+        return str.__str__(data)
+    elif isinstance(data, int):  # e.g., IntEnum
+        return int(data)
+    elif isinstance(data, float):
+        return float(data)
+    return str(data)  # as `default=str` in `dumps_json`
+
+
+def _json_key(key):
+    if isinstance(key, str):
+        return str.__str__(key)
+    elif key is True or key is False or key is None:
+        return _JSON_KEYWORDS[key]
+    elif isinstance(key, int):
+        return int.__repr__(key)
+    elif isinstance(key, float):
+        return float.__repr__(key)
+    raise TypeError(f'Keys must be str, int, float, bool or None, not {type(key).__name__}')
+
+
 def load_date_hook(d):
     if 'date' in d:
         try:
@@ -33,6 +74,45 @@ def load_date_hook(d):
     return d
 
 
+_DECODER = json.JSONDecoder()
+_DATE_DECODER = json.JSONDecoder(object_hook=load_date_hook)
+
+
+def loads_json_keys(data: str, keys):
+    """
+    Same result as `loads_json` for a json object, restricted to top-level `keys`: the values of other keys
+        are still decoded (to find where they end) but without `load_date_hook`, and are discarded.
+    """
+    idx = WHITESPACE.match(data, 0).end()
+    if data[idx:idx + 1] != '{':
+        raise json.JSONDecodeError('Expecting object', data, idx)
+    result = {}
+    idx = WHITESPACE.match(data, idx + 1).end()
+    empty = data[idx:idx + 1] == '}'
+    while not empty:
+        if data[idx:idx + 1] != '"':
+            raise json.JSONDecodeError('Expecting property name enclosed in double quotes', data, idx)
+        key, idx = scanstring(data, idx + 1)
+        idx = WHITESPACE.match(data, idx).end()
+        if data[idx:idx + 1] != ':':
+            raise json.JSONDecodeError("Expecting ':' delimiter", data, idx)
+        idx = WHITESPACE.match(data, idx + 1).end()
+        if key in keys:
+            result[key], idx = _DATE_DECODER.raw_decode(data, idx)
+        else:
+            _, idx = _DECODER.raw_decode(data, idx)
+        idx = WHITESPACE.match(data, idx).end()
+        if data[idx:idx + 1] == '}':
+            break
+        if data[idx:idx + 1] != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", data, idx)
+        idx = WHITESPACE.match(data, idx + 1).end()
+    end = WHITESPACE.match(data, idx + 1).end()
+    if end != len(data):
+        raise json.JSONDecodeError('Extra data', data, end)
+    return load_date_hook(result)
+
+
 def dump_date_hook(obj):
     if isinstance(obj, (datetime.datetime, datetime.date)):
         return '%Y-%m-%d'
@@ -1,10 +1,16 @@
+import functools
+import itertools
 import json
 import pathlib
 
 from loguru import logger
 
+from eye_extractor.corpuspack import PackedCorpus, PackedNote
+from eye_extractor.parallel import imap_threaded
 from eye_extractor.sections.headers import Headers, extract_headers_and_text
 
+PREFETCH_WORKERS = 4  # threads reading notes ahead (if prefetching)
+
 
 def _read_json_file(path, *, encoding='utf8'):
     if path.exists():
@@ -15,39 +21,137 @@ def _read_json_file(path, *, encoding='utf8'):
 def read_file(file, directory, *, search_missing_headers=False):
     with open(file, encoding='utf8') as fh:
         text = fh.read()
-    # read metadata file (if exists)
-    if not (data := _read_json_file(directory / f'{file.stem}.meta')):
+    # read metadata and section data files (if exist)
+    return _build_record(file, text, _read_json_file(directory / f'{file.stem}.meta'),
+                         _read_json_file(directory / f'{file.stem}.sect'),
+                         search_missing_headers=search_missing_headers)
+
+
+def _build_record(file, text, data, section_data, *, search_missing_headers=False):
+    if not data:
         data = {'filename': str(file)}
-    # read section data file (if exists)
-    sections = Headers(_read_json_file(directory / f'{file.stem}.sect'))
+    sections = Headers(section_data)
     sections.add(extract_headers_and_text(text))
     if search_missing_headers:
         sections.set_text(text)
     return file, text, data, sections
 
 
-def read_directories(*directories: pathlib.Path, search_missing_headers=False):
+def source_key(file: pathlib.Path, source: pathlib.Path = None):
+    """
+    Name of the input source (directory, filelist or packed corpus) a file was read from; used for checkpointing.
+
+    :param source: filelist or packed corpus the file was read from; if None, the file's directory
+    """
+    return str(source if source is not None else file.parent)
+
+
+def _read_records(read, items, *, start=1, prefetch=0, prefetch_workers=PREFETCH_WORKERS):
+    """
+    Apply `read` to each item, yielding records in order; log progress.
+
+    :param prefetch: if > 0, read up to this many records ahead in a pool of `prefetch_workers` threads
+    """
+    if prefetch > 0:
+        records = imap_threaded(read, items, workers=prefetch_workers, max_pending=prefetch)
+    else:
+        records = map(read, items)
+    for i, record in enumerate(records, start=start):
+        yield record
+        if i % 10000 == 0:
+            logger.info(f'Processed {i:,} records.')
+
+
+def read_directories(*directories: pathlib.Path, search_missing_headers=False, skip: dict[str, int] = None,
+                     prefetch=0, prefetch_workers=PREFETCH_WORKERS):
+    """
+    Read '*.txt' files in each directory, sorted by path (so that the order, and files skipped on resume,
+        do not depend on the filesystem).
+
+    :param skip: number of leading files to skip (without reading) for each directory, keyed by `source_key`
+    :param prefetch: if > 0, read up to this many files ahead (in `prefetch_workers` threads)
+    """
     for directory in directories:
         if not directory:
             continue
         logger.info(f'Reading Directory: {directory}')
-        for i, file in enumerate(directory.glob('*.txt'), start=1):
-            yield read_file(file, directory, search_missing_headers=search_missing_headers)
-            if i % 10000 == 0:
-                logger.info(f'Processed {i:,} records.')
+        n_skip = (skip or {}).get(str(directory), 0)
+        if n_skip:
+            logger.info(f'Skipping first {n_skip:,} records in {directory}.')
+        yield from _read_records(
+            functools.partial(read_file, directory=directory, search_missing_headers=search_missing_headers),
+            itertools.islice(sorted(directory.glob('*.txt')), n_skip, None),
+            start=n_skip + 1, prefetch=prefetch, prefetch_workers=prefetch_workers,
+        )
+
+
+def _read_listed_file(file, *, search_missing_headers=False):
+    return read_file(file, file.parent, search_missing_headers=search_missing_headers)
 
 
-def read_filelist(filelist, search_missing_headers=False):
+def read_filelist(filelist, search_missing_headers=False, skip: dict[str, int] = None,
+                  prefetch=0, prefetch_workers=PREFETCH_WORKERS):
+    """
+    :param skip: number of leading lines to skip for the filelist, keyed by `source_key`
+    :param prefetch: if > 0, read up to this many files ahead (in `prefetch_workers` threads)
+    """
+    n_skip = (skip or {}).get(str(filelist), 0)
+    if n_skip:
+        logger.info(f'Skipping first {n_skip:,} records in {filelist}.')
     with open(filelist) as fh:
-        for i, line in enumerate(fh, start=1):
-            file = pathlib.Path(line.strip())
-            yield read_file(file, file.parent, search_missing_headers=search_missing_headers)
-            if i % 10000 == 0:
-                logger.info(f'Processed {i:,} records.')
+        yield from _read_records(
+            functools.partial(_read_listed_file, search_missing_headers=search_missing_headers),
+            (pathlib.Path(line.strip()) for line in itertools.islice(fh, n_skip, None)),
+            start=n_skip + 1, prefetch=prefetch, prefetch_workers=prefetch_workers,
+        )
+
+
+def _build_packed_record(note: PackedNote, *, search_missing_headers=False):
+    return _build_record(note.file, note.text, json.loads(note.meta) if note.meta else None,
+                         json.loads(note.sect) if note.sect else None,
+                         search_missing_headers=search_missing_headers)
+
+
+def read_packed(path: pathlib.Path, *, docids=None, search_missing_headers=False, skip: dict[str, int] = None,
+                prefetch=0, prefetch_workers=PREFETCH_WORKERS):
+    """
+    Read notes from packed corpus (see `corpuspack`).
+
+    :param docids: if specified, read only these notes (in this order) by docid; otherwise, read all notes sequentially
+    :param skip: number of leading notes (or docids) to skip (without reading) for the packed corpus,
+        keyed by `source_key`
+    :param prefetch: if > 0, parse up to this many notes ahead (in `prefetch_workers` threads);
+        notes are read from the packed corpus sequentially
+    """
+    logger.info(f'Reading Packed Corpus: {path}')
+    n_skip = (skip or {}).get(str(path), 0)
+    if n_skip:
+        logger.info(f'Skipping first {n_skip:,} records in {path}.')
+    with PackedCorpus(path) as corpus:
+        if docids is not None:
+            notes = (corpus[docid] for docid in itertools.islice(docids, n_skip, None))
+        else:
+            notes = corpus.iter_notes(skip=n_skip)
+        yield from _read_records(
+            functools.partial(_build_packed_record, search_missing_headers=search_missing_headers),
+            notes, start=n_skip + 1, prefetch=prefetch, prefetch_workers=prefetch_workers,
+        )
+
 
+def read_from_params(*directories, filelist=None, packed=None, docids=None, search_missing_headers=False,
+                     skip: dict[str, int] = None, prefetch=0, prefetch_workers=PREFETCH_WORKERS):
+    """
+    Read notes from packed corpus (if specified), filelist (if specified) or directories.
 
-def read_from_params(*directories, filelist=None, search_missing_headers=False):
-    if filelist is not None:
-        yield from read_filelist(filelist, search_missing_headers=search_missing_headers)
+    :param docids: with `packed`, read only these notes by docid
+    :param prefetch: if > 0, read (and parse metadata and headers of) up to this many notes ahead
+        in a pool of `prefetch_workers` threads, overlapping reading with extraction; order is preserved
+    """
+    kwargs = {'search_missing_headers': search_missing_headers, 'skip': skip,
+              'prefetch': prefetch, 'prefetch_workers': prefetch_workers}
+    if packed is not None:
+        yield from read_packed(packed, docids=docids, **kwargs)
+    elif filelist is not None:
+        yield from read_filelist(filelist, **kwargs)
     else:
-        yield from read_directories(*directories, search_missing_headers=search_missing_headers)
+        yield from read_directories(*directories, **kwargs)
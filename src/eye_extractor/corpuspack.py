@@ -0,0 +1,177 @@
+"""
+Packed corpus: the text, metadata (`.meta`) and section data (`.sect`) of every note in a single file,
+    avoiding the opening (and probing for) millions of small files on, e.g., network filesystems.
+
+Layout:
+* `MAGIC`
+* for each note: a header (`RECORD_HEADER`: lengths, in bytes, of filename, text, metadata and section data),
+    followed by the utf8-encoded filename, text, metadata and section data (metadata and section data are
+    json, as in the original files; empty if the file did not exist)
+* index: json list of [docid, offset, length] for each note, in order
+* footer (`FOOTER`): offset of the index, followed by `MAGIC`
+
+Notes are read sequentially with large buffered reads, or by docid (one seek and one read per note).
+    The docid is the `note_id` from the metadata, or (if there is none) the stem of the filename.
+"""
+import json
+import pathlib
+import struct
+from typing import Iterable, NamedTuple
+
+from loguru import logger
+
+MAGIC = b'EYEPACK1'
+RECORD_HEADER = struct.Struct('<HIII')
+FOOTER = struct.Struct(f'<Q{len(MAGIC)}s')
+BUFFER_SIZE = 8 * 1024 * 1024
+
+
+class PackedNote(NamedTuple):
+    file: pathlib.Path
+    text: str
+    meta: str  # json; empty if no metadata
+    sect: str  # json; empty if no section data
+
+
+def _read_optional(path):
+    if path.exists():
+        with open(path, encoding='utf8') as fh:
+            return fh.read()
+    return ''
+
+
+def _get_docid(file: pathlib.Path, meta: str):
+    if meta and (data := json.loads(meta)) and data.get('note_id') is not None:
+        return str(data['note_id'])
+    return file.stem
+
+
+def iter_note_files(files: Iterable[pathlib.Path]) -> Iterable[PackedNote]:
+    """Read notes (and their `.meta` and `.sect` files, if present) from the original directory layout"""
+    for file in files:
+        with open(file, encoding='utf8') as fh:
+            text = fh.read()
+        yield PackedNote(
+            file,
+            text,
+            _read_optional(file.parent / f'{file.stem}.meta'),
+            _read_optional(file.parent / f'{file.stem}.sect'),
+        )
+
+
+def write_packed_corpus(path: pathlib.Path, notes: Iterable[PackedNote]):
+    """
+    Write `notes` to packed corpus at `path`.
+
+    :return: number of notes written
+    """
+    index = []
+    with open(path, 'wb', buffering=BUFFER_SIZE) as out:
+        out.write(MAGIC)
+        offset = len(MAGIC)
+        for i, note in enumerate(notes, start=1):
+            parts = [str(note.file).encode('utf8'), note.text.encode('utf8'),
+                     note.meta.encode('utf8'), note.sect.encode('utf8')]
+            header = RECORD_HEADER.pack(*(len(part) for part in parts))
+            length = len(header) + sum(len(part) for part in parts)
+            out.write(header)
+            for part in parts:
+                out.write(part)
+            index.append([_get_docid(note.file, note.meta), offset, length])
+            offset += length
+            if i % 10000 == 0:
+                logger.info(f'Packed {i:,} records.')
+        out.write(json.dumps(index).encode('utf8'))
+        out.write(FOOTER.pack(offset, MAGIC))
+    return len(index)
+
+
+class PackedCorpus:
+    """Read notes from a packed corpus; use as a context manager (or call `close`)"""
+
+    def __init__(self, path: pathlib.Path, buffer_size=BUFFER_SIZE):
+        self.path = path
+        self._fh = open(path, 'rb', buffering=buffer_size)
+        if self._fh.read(len(MAGIC)) != MAGIC:
+            self.close()
+            raise ValueError(f'Not a packed corpus: {path}')
+        self._index_end = self._fh.seek(-FOOTER.size, 2)
+        self.index_offset, magic = FOOTER.unpack(self._fh.read(FOOTER.size))
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f'Packed corpus is incomplete (no footer): {path}')
+        self._index = None
+        self._offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._fh.close()
+
+    def _load_index(self):
+        if self._index is None:
+            self._fh.seek(self.index_offset)
+            self._index = json.loads(self._fh.read(self._index_end - self.index_offset))
+            self._offsets = {}
+            for docid, offset, length in self._index:
+                if docid in self._offsets:
+                    logger.warning(f'Duplicate docid {docid} in {self.path}: only the first can be looked up.')
+                    continue
+                self._offsets[docid] = (offset, length)
+        return self._index
+
+    def __len__(self):
+        return len(self._load_index())
+
+    @property
+    def docids(self) -> list[str]:
+        return [docid for docid, _, _ in self._load_index()]
+
+    def __contains__(self, docid):
+        self._load_index()
+        return str(docid) in self._offsets
+
+    def __getitem__(self, docid) -> PackedNote:
+        """Read note by docid"""
+        self._load_index()
+        offset, length = self._offsets[str(docid)]
+        self._fh.seek(offset)
+        return self._parse(memoryview(self._fh.read(length)))
+
+    def __iter__(self):
+        return self.iter_notes()
+
+    def iter_notes(self, skip=0) -> Iterable[PackedNote]:
+        """Read notes sequentially, optionally skipping the first `skip` notes"""
+        if skip:
+            index = self._load_index()
+            if skip >= len(index):
+                return
+            offset = index[skip][1]
+        else:
+            offset = len(MAGIC)
+        fh = self._fh
+        fh.seek(offset)
+        while offset < self.index_offset:
+            header = fh.read(RECORD_HEADER.size)
+            lengths = RECORD_HEADER.unpack(header)
+            body = fh.read(sum(lengths))
+            offset += len(header) + len(body)
+            yield self._parse(memoryview(body), lengths)
+            fh.seek(offset)  # in case of lookups between notes
+
+    @staticmethod
+    def _parse(body: memoryview, lengths=None) -> PackedNote:
+        if lengths is None:
+            lengths = RECORD_HEADER.unpack(body[:RECORD_HEADER.size])
+            body = body[RECORD_HEADER.size:]
+        parts = []
+        start = 0
+        for length in lengths:
+            parts.append(str(body[start:start + length], 'utf8'))
+            start += length
+        return PackedNote(pathlib.Path(parts[0]), *parts[1:])
@@ -1,11 +1,13 @@
 import re
 
 from eye_extractor.dr.hemorrhage_type import HEME_NOS_PAT
+from eye_extractor.nlp.keywords import requires_terms, word
+from eye_extractor.nlp.pattern_battery import PatternBattery
 from eye_extractor.nlp.negate.negation import has_before, is_negated, is_post_negated, NEGWORD_UNKNOWN_PHRASES
 from eye_extractor.laterality import build_laterality_table, create_new_variable
 from eye_extractor.sections.document import Document
 
-DIABETIC_RETINOPATHY_PATS = [
+DIABETIC_RETINOPATHY_PATS = PatternBattery([
     ('disc_edema_DR', re.compile(
         r'\b('
         r'disc edema'
@@ -43,35 +45,37 @@ DIABETIC_RETINOPATHY_PATS = [
         r')\b',
         re.I
     )),
-]
+])
 
 
+@requires_terms('edema', 'hemorrhage', 'hemorhage', word('hem'), word('hems'), word('heme'), word('hemes'),
+                'laser', word('prp'), 'coagulation', 'vitrectomy', word('csme'), word('cmt'), 'thickness',
+                patterns=[pattern for _, pattern in DIABETIC_RETINOPATHY_PATS])
 def get_dr_binary(doc: Document):
     data = []
-    for variable, PAT in DIABETIC_RETINOPATHY_PATS:
-        for m in PAT.finditer(doc.get_text()):
-            if variable == 'hemorrhage_dr':
-                negated = is_negated(m, doc.get_text(), word_window=3, return_unknown=True)
-                if negated in NEGWORD_UNKNOWN_PHRASES:  # e.g., 'no new' -> UNKNOWN
-                    continue
-                if has_before(m if isinstance(m, int) else m.start(),
-                              doc.get_text(),
-                              terms={'hx', 'h/o', 'resolved'},
-                              boundary_chars='',
-                              word_window=6):
-                    continue
-            else:
-                negated = is_negated(m, doc.get_text(), word_window=4)
-                if not negated:
-                    negated = is_post_negated(m, doc.get_text(), {'or'}, word_window=2)
-            data.append(
-                create_new_variable(doc.get_text(), m, doc.get_lateralities(), variable, {
-                    'value': 0 if negated else 1,
-                    'term': m.group(),
-                    'label': 'no' if negated else 'yes',
-                    'negated': negated,
-                    'regex': f'{variable}_PAT',
-                    'source': 'ALL'
-                })
-            )
+    for variable, m in DIABETIC_RETINOPATHY_PATS.iter_by_pattern(doc.get_text()):
+        if variable == 'hemorrhage_dr':
+            negated = is_negated(m, doc.get_text(), word_window=3, return_unknown=True)
+            if negated in NEGWORD_UNKNOWN_PHRASES:  # e.g., 'no new' -> UNKNOWN
+                continue
+            if has_before(m if isinstance(m, int) else m.start(),
+                          doc.get_text(),
+                          terms={'hx', 'h/o', 'resolved'},
+                          boundary_chars='',
+                          word_window=6):
+                continue
+        else:
+            negated = is_negated(m, doc.get_text(), word_window=4)
+            if not negated:
+                negated = is_post_negated(m, doc.get_text(), {'or'}, word_window=2)
+        data.append(
+            create_new_variable(doc.get_text(), m, doc.get_lateralities(), variable, {
+                'value': 0 if negated else 1,
+                'term': m.group(),
+                'label': 'no' if negated else 'yes',
+                'negated': negated,
+                'regex': f'{variable}_PAT',
+                'source': 'ALL'
+            })
+        )
     return data
@@ -1,5 +1,6 @@
 import re
 
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated, is_post_negated, has_after
 from eye_extractor.laterality import build_laterality_table, create_new_variable
 from eye_extractor.sections.document import Document
@@ -13,6 +14,7 @@ CWS_PAT = re.compile(
 )
 
 
+@requires_terms('cotton', word('cw'), word('cws'), 'exud', patterns=[CWS_PAT])
 def get_cottonwspot(doc: Document) -> list:
     data = []
     # Extract matches from sections / headers.
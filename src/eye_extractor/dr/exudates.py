@@ -1,5 +1,6 @@
 import re
 
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated, is_post_negated, has_after
 from eye_extractor.laterality import build_laterality_table, create_new_variable, OtherLateralityName
 from eye_extractor.sections.document import Document
@@ -22,6 +23,8 @@ HARD_EXUDATES_ABBR_PAT = re.compile(
 )
 
 
+@requires_terms('exud', word('HE', cased=True),
+                patterns=[EXUDATES_PAT, HARD_EXUDATES_PAT, HARD_EXUDATES_ABBR_PAT])
 def get_exudates(doc: Document) -> list:
     data = []
     # Extract matches from full text.
@@ -2,6 +2,7 @@ import enum
 import re
 
 from eye_extractor.common.shared_patterns import retinal
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated, has_before, NEGWORD_UNKNOWN_PHRASES
 from eye_extractor.common.severity import extract_severity, Severity
 from eye_extractor.laterality import build_laterality_table, create_new_variable
@@ -71,6 +72,9 @@ HEME_NOS_PAT = re.compile(
 )
 
 
+@requires_terms('hem', word('irh'), word('dbh'), word('prh'), word('vh'), word('srh'), patterns=[
+    INTRARETINAL_PAT, DOT_BLOT_PAT, PRERETINAL_PAT, VITREOUS_PAT, SUBRETINAL_PAT, HEME_NOS_PAT,
+])
 def get_hemorrhage_type(doc: Document) -> list:
     data = []
     for new_var in _get_hemorrhage_type(doc.get_text(), doc.get_lateralities(), 'ALL'):
@@ -1,6 +1,7 @@
 import re
 
 from eye_extractor.common.shared_patterns import retinal, abnormality, microvascular
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated, is_post_negated
 from eye_extractor.common.severity import extract_severity, Severity
 from eye_extractor.laterality import build_laterality_table, create_new_variable, OtherLateralityName
@@ -16,6 +17,7 @@ IRMA_PAT = re.compile(
 )
 
 
+@requires_terms(word('irma'), 'microvascular', 'mv', patterns=[IRMA_PAT])
 def get_irma(doc: Document) -> list:
     data = []
     # Extract matches from sections / headers.
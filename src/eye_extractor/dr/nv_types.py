@@ -1,6 +1,7 @@
 import re
 
 from eye_extractor.common.get_variable import get_variable
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import has_after, has_before, is_negated, is_post_negated
 from eye_extractor.laterality import create_new_variable
 from eye_extractor.sections.document import Document
@@ -135,6 +136,8 @@ NVI_POST_IGNORE = {
 }
 
 
+@requires_terms(word('nva'), word('nvi'), word('nvd'), word('nvzd'), word('nve'), word('nvze'),
+                'neovascularization', 'rubeosis', patterns=[NV_PAT, NVA_PAT, NVI_PAT, NVD_PAT, NVE_PAT])
 def get_nv_types(doc: Document) -> list:
     return get_variable(doc, _get_nv_types)
 
@@ -2,6 +2,7 @@ import re
 
 from eye_extractor.common.get_variable import get_variable
 from eye_extractor.common.severity import extract_severity, Severity
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated
 from eye_extractor.laterality import create_new_variable
 from eye_extractor.sections.document import Document
@@ -15,6 +16,7 @@ RET_MICRO_PAT = re.compile(
 )
 
 
+@requires_terms(word('ma'), word('mas'), 'aneurysm', patterns=[RET_MICRO_PAT])
 def get_ret_micro(doc: Document) -> list:
     return get_variable(doc, _get_ret_micro)
 
@@ -1,5 +1,6 @@
 import re
 
+from eye_extractor.nlp.keywords import requires_terms, word
 from eye_extractor.nlp.negate.negation import is_negated
 from eye_extractor.common.severity import extract_severity, Severity
 from eye_extractor.laterality import build_laterality_table, create_new_variable
@@ -14,6 +15,7 @@ VEN_BEADING_PAT = re.compile(
 )
 
 
+@requires_terms('beading', word('vb'), patterns=[VEN_BEADING_PAT])
 def get_ven_beading(doc: Document) -> list:
     data = []
     # Extract matches from sections / headers.
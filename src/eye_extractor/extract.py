@@ -6,7 +6,9 @@ The `extract` function will take text notes as input (supplied by filelists, dir
 
 Once completing this step, use the `build_table` to compile this information to a CSV file.
 """
+import collections
 import datetime
+import functools
 import json
 import pathlib
 import sys
@@ -20,7 +22,7 @@ from eye_extractor.cataract.cataract_surgery import get_cataract_surgery
 from eye_extractor.clickargs import outdir_opt
 from eye_extractor.common.algo.extract import extract_common_algorithms
 from eye_extractor.common.noteinfo import extract_note_level_info
-from eye_extractor.corpusio import read_from_params
+from eye_extractor.corpusio import read_from_params, source_key
 from eye_extractor.ro.algorithm import extract_ro_variables
 from eye_extractor.sections.document import Document
 from eye_extractor.dr.diabetic_retinopathy import extract_dr_variables
@@ -30,6 +32,10 @@ from eye_extractor.history.famhx import create_family_history
 from eye_extractor.history.perhx import create_personal_history
 from eye_extractor.iop import get_iop
 from eye_extractor.nlp.negate.boilerplate import remove_boilerplate
+from eye_extractor.parallel import imap_ordered
+from eye_extractor.profiling import ExtractionProfile, install as install_profiling, measure
+from eye_extractor.quarantine import NoteTimeout, QuarantineWriter, can_budget, note_budget, quarantine_record
+from eye_extractor.shards import ShardedJsonlWriter, get_skip_counts, load_checkpoint
 from eye_extractor.uveitis.algorithm import extract_uveitis
 from eye_extractor.va.extractor2 import extract_va
 from eye_extractor.va.rx import get_manifest_rx
@@ -49,7 +55,8 @@ ALGORITHMS = [
 ]
 
 
-def extract_all(text: str, *, data: dict = None, sections: dict = None, targets: list[str] = None):
+def extract_all(text: str, *, data: dict = None, sections: dict = None, targets: list[str] = None,
+                cache_hits: collections.Counter = None, profile: ExtractionProfile = None):
     """
 
     Args:
@@ -57,49 +64,69 @@ def extract_all(text: str, *, data: dict = None, sections: dict = None, targets:
         data:
         sections:
         targets (list[str]): list of algorithms to run; defaults to None := all
+        cache_hits (Counter): if specified, add the number of reused extractor results (by extractor)
+        profile (ExtractionProfile): if specified, record time, regex matches, etc. by algorithm and extractor;
+            see `profiling.install`
 
     Returns:
 
     """
-    doc = Document(text, newline_chars='¶')
-    # TODO: for treatment-related, may need to look at non-boilerplate removed text
-    # text = remove_boilerplate(text)
-    if data is None:
-        data = {}
-    data['note'] = extract_note_level_info(doc)
-    doc.lateralities.default_laterality = data['note']['default_lat']
-    data['common'] = extract_common_algorithms(doc)
-
-    # main algorithms
-    if not targets:
-        targets = ALGORITHMS
-    if 'va' in targets:
-        data['va'] = list(extract_va(doc.get_text()))
-        data['manifestrx'] = list(get_manifest_rx(doc.get_text()))
-    if 'iop' in targets:
-        data['iop'] = list(get_iop(doc.get_text()))
-    if 'amd' in targets:
-        data['amd'] = extract_amd_variables(doc)
-    if 'cataractsurg' in targets:
-        data['cataractsurg'] = get_cataract_surgery(doc)
-    if 'cataract' in targets:
-        data['cataract'] = extract_cataract_variables(doc)
-    if 'glaucoma' in targets:
-        data['glaucoma'] = extract_glaucoma(doc)
-    if 'ro' in targets:
-        data['ro'] = extract_ro_variables(doc)
-    if 'uveitis' in targets:
-        data['uveitis'] = extract_uveitis(doc)
-    if 'history' in targets:
-        data['history'] = {
-            'family': create_family_history(doc),
-            'personal': create_personal_history(doc),
-        }
-    if 'exam' in targets:
-        data['exam'] = get_exam(doc)
-    if 'dr' in targets:
-        data['dr'] = extract_dr_variables(doc)
+    with measure(profile, 'document'):
+        doc = Document(text, newline_chars='¶')
+    with doc.text_indexes():
+        # TODO: for treatment-related, may need to look at non-boilerplate removed text
+        # text = remove_boilerplate(text)
+        if data is None:
+            data = {}
+        with measure(profile, 'note', data):
+            data['note'] = extract_note_level_info(doc)
+        doc.lateralities.default_laterality = data['note']['default_lat']
+        with measure(profile, 'common', data):
+            data['common'] = extract_common_algorithms(doc)
 
+        # main algorithms
+        if not targets:
+            targets = ALGORITHMS
+        if 'va' in targets:
+            with measure(profile, 'va', data):
+                data['va'] = list(extract_va(doc.get_text()))
+                data['manifestrx'] = list(get_manifest_rx(doc.get_text()))
+        if 'iop' in targets:
+            with measure(profile, 'iop', data):
+                data['iop'] = list(get_iop(doc.get_text()))
+        if 'amd' in targets:
+            with measure(profile, 'amd', data):
+                data['amd'] = extract_amd_variables(doc)
+        if 'cataractsurg' in targets:
+            with measure(profile, 'cataractsurg', data):
+                data['cataractsurg'] = get_cataract_surgery(doc)
+        if 'cataract' in targets:
+            with measure(profile, 'cataract', data):
+                data['cataract'] = extract_cataract_variables(doc)
+        if 'glaucoma' in targets:
+            with measure(profile, 'glaucoma', data):
+                data['glaucoma'] = extract_glaucoma(doc)
+        if 'ro' in targets:
+            with measure(profile, 'ro', data):
+                data['ro'] = extract_ro_variables(doc)
+        if 'uveitis' in targets:
+            with measure(profile, 'uveitis', data):
+                data['uveitis'] = extract_uveitis(doc)
+        if 'history' in targets:
+            with measure(profile, 'history', data):
+                data['history'] = {
+                    'family': create_family_history(doc),
+                    'personal': create_personal_history(doc),
+                }
+        if 'exam' in targets:
+            with measure(profile, 'exam', data):
+                data['exam'] = get_exam(doc)
+        if 'dr' in targets:
+            with measure(profile, 'dr', data):
+                data['dr'] = extract_dr_variables(doc)
+
+    if cache_hits is not None:
+        cache_hits.update(doc.extractor_cache_hits)
     return data
 
 
@@ -107,46 +134,154 @@ def extract_all(text: str, *, data: dict = None, sections: dict = None, targets:
 @click.argument('directories', nargs=-1, type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path))
 @outdir_opt
 @click.option('--filelist', type=click.Path(dir_okay=False, path_type=pathlib.Path), default=None)
+@click.option('--packed', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), default=None,
+              help='Read notes from a packed corpus (see `eyex-pack-corpus`) rather than directories/filelist.')
+@click.option('--prefetch', type=int, default=0,
+              help='Read up to N notes ahead of extraction in background threads (e.g., for slow storage).')
 @click.option('--search-missing-headers', is_flag=True, default=False,
               help='If a requested header is not found, attempt to find it in the text.')
 @click.option('--targets', multiple=True, default=None,
               help='Target algorithms to run')
+@click.option('--workers', type=int, default=1,
+              help='Number of processes to use for extraction; output order is preserved.')
+@click.option('--shard-size', type=int, default=None,
+              help='Start a new jsonl file every N notes and record progress in a checkpoint manifest.')
+@click.option('--resume', is_flag=True, default=False,
+              help='Resume from the checkpoint manifest in `outdir`, skipping notes already extracted.')
+@click.option('--profile', is_flag=True, default=False,
+              help='Record time, calls, regex matches and variables by algorithm/extractor to a csv report.')
+@click.option('--timeout', type=float, default=None,
+              help='Quarantine notes taking longer than this many seconds to extract, and continue with the rest.')
 def _extract_variables(directories: tuple[pathlib.Path], outdir: pathlib.Path = None, filelist: pathlib.Path = None,
-                       *, search_missing_headers=False, targets=None):
-    extract_variables(directories, outdir, filelist, search_missing_headers=search_missing_headers, targets=targets)
+                       *, search_missing_headers=False, targets=None, workers=1, shard_size=None, resume=False,
+                       profile=False, timeout=None, packed=None, prefetch=0):
+    extract_variables(directories, outdir, filelist, search_missing_headers=search_missing_headers, targets=targets,
+                      workers=workers, shard_size=shard_size, resume=resume, profile=profile, timeout=timeout,
+                      packed=packed, prefetch=prefetch)
 
 
 def extract_variables(directories: tuple[pathlib.Path] = None, outdir: pathlib.Path = None,
                       filelist: pathlib.Path = None,
                       *,
                       search_missing_headers=False,
-                      targets=None):
+                      targets=None,
+                      workers=1,
+                      shard_size=None,
+                      resume=False,
+                      profile=False,
+                      timeout=None,
+                      packed=None,
+                      prefetch=0):
     """
     Iterate through all '*.txt' files in directory for processing by eye extractor.
         Optionally, will include relevant metadata from associated *.meta json files
-    :return:
+    :param packed: read notes from this packed corpus (see `corpuspack`) rather than directories/filelist
+    :param prefetch: if > 0, read (and parse headers of) up to this many notes ahead of extraction
+        in background threads, overlapping file I/O with extraction
+    :param workers: number of processes to run extraction in; if > 1, notes are distributed
+        to a process pool and written in the order in which they were read
+    :param shard_size: if specified, rotate output to a new jsonl shard every `shard_size` notes,
+        and write a checkpoint manifest as each shard is completed
+    :param resume: continue a sharded run from the checkpoint manifest in `outdir`
+    :param profile: record time, calls, regex matches and variables by algorithm and extractor
+        across the corpus, and write these (slowest first) to `eye_extractor_{timestamp}_profile.csv` in `outdir`
+    :param timeout: wall-clock budget (in seconds) for extracting each note; notes which exceed it (or raise
+        an exception) are written to `eye_extractor_{timestamp}_quarantine.jsonl` in `outdir` rather than
+        the output, and the rest of the corpus is processed
+    :return: path to output jsonl file; if sharded, path to the checkpoint manifest
     """
     if outdir is None:
         outdir = pathlib.Path('out')
     outdir.mkdir(parents=True, exist_ok=True)
     start_time = datetime.datetime.now()
     logger.remove()
-    logger.add(outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}.log', level='DEBUG')
-    logger.add(sys.stderr, level='INFO')
-    outfile = outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}.jsonl'
-    with open(outfile, 'w', encoding='utf8') as out:
-        for file, text, data, sections in read_from_params(*directories or tuple(), filelist=filelist,
-                                                           search_missing_headers=search_missing_headers):
-            line = extract_variable_from_text(text, data, sections, targets)
-            out.write(json.dumps(line, default=str) + '\n')
+    # enqueue: sinks must be multiprocess-safe when workers also log
+    logger.add(outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}.log', level='DEBUG', enqueue=workers > 1)
+    logger.add(sys.stderr, level='INFO', enqueue=workers > 1)
+    if resume and shard_size is None:
+        raise ValueError('Resuming requires `shard_size` to be specified.')
+    if timeout and not can_budget():
+        logger.warning('Per-note timeouts are not supported on this platform: extracting without a budget.')
+    checkpoint = load_checkpoint(outdir) if resume else None
+    if resume and checkpoint is None:
+        logger.warning(f'No checkpoint found in {outdir}: starting from the beginning.')
+    source = packed if packed is not None else filelist
+    records = read_from_params(*directories or tuple(), filelist=filelist, packed=packed,
+                               search_missing_headers=search_missing_headers, skip=get_skip_counts(checkpoint),
+                               prefetch=prefetch)
+    lines = imap_ordered(functools.partial(_extract_jsonl_line, targets=targets, profile=profile, timeout=timeout),
+                         records, workers=workers)
+    cache_hits = collections.Counter()
+    corpus_profile = ExtractionProfile()
+    quarantine = QuarantineWriter(outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}_quarantine.jsonl')
+    if shard_size:
+        with ShardedJsonlWriter(outdir, f'eye_extractor_{start_time:%Y%m%d_%H%M%S}', shard_size,
+                                checkpoint=checkpoint) as writer, quarantine:
+            for file, line, note_cache_hits, note_profile, quarantined in lines:
+                if quarantined is None:
+                    writer.write(line, source_key(file, source), file)
+                else:
+                    quarantine.write(quarantined)
+                    writer.skip(source_key(file, source), file)  # do not retry on resume
+                cache_hits.update(note_cache_hits)
+                if note_profile is not None:
+                    corpus_profile.update(note_profile)
+        outfile = writer.checkpoint_path
+    else:
+        outfile = outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}.jsonl'
+        with open(outfile, 'w', encoding='utf8') as out, quarantine:
+            for file, line, note_cache_hits, note_profile, quarantined in lines:
+                if quarantined is None:
+                    out.write(line)
+                else:
+                    quarantine.write(quarantined)
+                cache_hits.update(note_cache_hits)
+                if note_profile is not None:
+                    corpus_profile.update(note_profile)
+    if quarantine.count:
+        logger.warning(f'Quarantined {quarantine.count:,} notes: see {quarantine.path}.')
+    for name, count in cache_hits.most_common():
+        logger.info(f'Reused cached results of {name}: {count:,} times.')
+    if profile:
+        profile_path = outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}_profile.csv'
+        corpus_profile.write_csv(profile_path)
+        logger.info(f'Wrote extraction profile to {profile_path}.')
     duration = datetime.datetime.now() - start_time
     logger.info(f'Total run time: {duration}')
     return outfile
 
 
-def extract_variable_from_text(text, data, sections, targets):
+def _extract_jsonl_line(record, targets=None, profile=False, timeout=None):
+    """
+    Extract a (file, text, data, sections) record into
+        (file, jsonl line, extractor cache hits, profile, quarantine record);
+        module-level for use by worker processes
+
+    If the note exceeds `timeout` seconds or raises an exception, the jsonl line is None and
+        the quarantine record describes the failure; otherwise, the quarantine record is None.
+    """
+    file, text, data, sections = record
+    cache_hits = collections.Counter()
+    if profile:
+        install_profiling()  # once per process
+    # algorithm-level timings are always recorded to report the slowest extractors of quarantined notes
+    note_profile = ExtractionProfile()
+    try:
+        with note_budget(timeout):
+            line = extract_variable_from_text(text, data, sections, targets,
+                                              cache_hits=cache_hits, profile=note_profile)
+            line = json.dumps(line, default=str) + '\n'
+    except (Exception, NoteTimeout) as e:
+        logger.opt(exception=not isinstance(e, NoteTimeout)).debug(f'Failed to extract {file}.')
+        return file, None, cache_hits, note_profile if profile else None, quarantine_record(
+            file, data, e, note_profile, timeout=timeout
+        )
+    return file, line, cache_hits, note_profile if profile else None, None
+
+
+def extract_variable_from_text(text, data, sections, targets, *, cache_hits=None, profile=None):
     """extract eye info from text, data, and section info"""
-    data = extract_all(text, data=data, sections=sections, targets=targets)
+    data = extract_all(text, data=data, sections=sections, targets=targets, cache_hits=cache_hits, profile=profile)
     return data
 
 
@@ -1,9 +1,10 @@
+import array
+import bisect
 import enum
+import itertools
 import re
 from typing import Match, Optional
 
-from sortedcontainers import SortedList
-
 from eye_extractor.common.date import parse_nearest_date_to_line_start
 from eye_extractor.nlp.character_groups import LINE_START_CHARS
 from eye_extractor.nlp.negate.negation import find_unspecified_negated_list_items
@@ -17,6 +18,9 @@ class Laterality(enum.IntEnum):
     UNKNOWN = 0  # keep 0 so that it will test 'False'
 
 
+_LATERALITY_BY_VALUE = {lat.value: lat for lat in Laterality}
+
+
 class LateralityLocatorStrategy(enum.Enum):
     DEFAULT = 1
     LINE_BREAK = 2
@@ -130,6 +134,17 @@ def lat_lookup(m, *, group=0):
     ]
 
 
+def _laterality_match(m: Match):
+    """Convert `LATERALITY_PATTERN` match into a (laterality, start, end, is_section_start) tuple"""
+    return lat_lookup(m), m.start(), m.end(), m.group().endswith(':')
+
+
+def _add_negated_list_items(latloc, text):
+    if list_items := find_unspecified_negated_list_items(text, LATERALITY_PATTERN):
+        for start_index, end_index in list_items:
+            latloc.add(Laterality.OU, start_index, end_index, False)
+
+
 def build_laterality_table(text: str, search_negated_list: bool = False):
     """Build table for all lateralities found in text.
 
@@ -142,19 +157,120 @@ def build_laterality_table(text: str, search_negated_list: bool = False):
     # Above caused by '.)\b' - period (non-alphanumeric) followed by word boundary.
     # Word boundary, '\b', requires alphanumeric next to non-alphanumeric. So '.' followed by whitespace does not match.
     for m in LATERALITY_PATTERN.finditer(text):
-        is_section_start = m.group().endswith(':')
-        latloc.add(lat_lookup(m), m.start(), m.end(), is_section_start)
+        latloc.add(*_laterality_match(m))
     if search_negated_list:
-        if list_items := find_unspecified_negated_list_items(text, LATERALITY_PATTERN):
-            for start_index, end_index in list_items:
-                latloc.add(Laterality.OU, start_index, end_index, False)
+        _add_negated_list_items(latloc, text)
 
     return latloc
 
 
+class LateralityIndex:
+    """
+    Find all lateralities in a document once, and build `LateralityLocator` tables for views of
+        that document (e.g., sections, text with history blanked, split snippets) by offset translation.
+
+    A view is described by `spans`: (view_start, doc_start, length) triples over which the view's
+        text is identical to the document's text. Only text outside of these spans (and near their
+        edges) is rescanned, so tables are identical to those from `build_laterality_table`.
+    """
+    # a `LATERALITY_PATTERN` match cannot see further than this many non-whitespace characters
+    #   (longest term without spaces + optional colon + word boundary)
+    MAX_CONTEXT = max(len(''.join(term.split())) for term in LATERALITY) + 2
+
+    def __init__(self, text: str):
+        self.text = text
+        self.matches = [_laterality_match(m) for m in LATERALITY_PATTERN.finditer(text)]
+        self.starts = [start for _, start, _, _ in self.matches]
+
+    def __call__(self, text: str = None, *, spans: list[tuple[int, int, int]] = None,
+                 search_negated_list: bool = False):
+        """
+        Build laterality table for `text`; drop-in replacement for `build_laterality_table`.
+
+        :param text: view of document; if None, use entire document
+        :param spans: list of (view_start, doc_start, length) over which `text` matches the document;
+            spans which do not match are ignored; if None, `text` is scanned as in `build_laterality_table`
+        :param search_negated_list: If True, search for negated list in text. If found, add to table.
+        """
+        if text is None:
+            text = self.text
+            matches = self.matches
+        elif spans is None:
+            return build_laterality_table(text, search_negated_list=search_negated_list)
+        else:
+            matches = self.find(text, [
+                (view_start, doc_start, length) for view_start, doc_start, length in spans
+                if text[view_start: view_start + length] == self.text[doc_start: doc_start + length]
+            ])
+        latloc = LateralityLocator(matches)
+        if search_negated_list:
+            _add_negated_list_items(latloc, text)
+        return latloc
+
+    def find(self, text: str, spans: list[tuple[int, int, int]]) -> list[tuple]:
+        """Find all laterality matches in view `text` as (laterality, start, end, is_section_start)"""
+        candidates, last_reusable = self._get_candidates(text, spans)
+        candidate_starts = [start for _, start, _, _ in candidates]
+        result = []
+        pos = 0
+        while True:
+            for m in LATERALITY_PATTERN.finditer(text, pos):
+                match = _laterality_match(m)
+                result.append(match)
+                i = bisect.bisect_left(candidate_starts, match[1])
+                if i < len(candidates) and candidates[i] == match and last_reusable[i] > i:
+                    # view scan and document scan are now at same position: re-use document matches
+                    j = last_reusable[i]
+                    result += candidates[i + 1: j + 1]
+                    pos = candidates[j][2]
+                    break
+            else:
+                break
+        return result
+
+    def _get_candidates(self, text, spans):
+        """
+        Translate document matches into view offsets.
+
+        :return: (candidates, last_reusable): for each candidate, the index of the final candidate in
+            the same span which cannot be affected by text beyond the end of the span
+        """
+        candidates = []
+        last_reusable = []
+        for view_start, doc_start, length in spans:
+            doc_end = doc_start + length
+            view_end = view_start + length
+            if view_end == len(text) and doc_end == len(self.text):
+                limit = view_end  # end of both texts
+            else:
+                limit = self._get_safe_end(text, view_start, view_end)
+            offset = view_start - doc_start
+            first = len(candidates)
+            last = first - 1
+            for i in range(bisect.bisect_left(self.starts, doc_start), len(self.matches)):
+                lat, start, end, is_section_start = self.matches[i]
+                if end > doc_end:
+                    break
+                candidates.append((lat, start + offset, end + offset, is_section_start))
+                if end + offset <= limit:
+                    last = len(candidates) - 1
+            last_reusable += [last] * (len(candidates) - first)
+        return candidates, last_reusable
+
+    def _get_safe_end(self, text, view_start, view_end):
+        """Find offset before which matches cannot be affected by text after `view_end`"""
+        end = view_end
+        required = self.MAX_CONTEXT  # number of non-whitespace characters
+        while required > 0 and end > view_start:
+            chunk = text[max(view_start, end - required): end]
+            required -= len(''.join(chunk.split()))
+            end -= len(chunk)
+        return end if required <= 0 else view_start
+
+
 def get_previous_laterality_from_table(table, index):
-    for name, start, end, is_lat in reversed(table.lateralities):
-        if is_lat and end < index:
+    for name, start, end, is_lat in table.iter_sections_before(index):
+        if end < index:
             return name, start, end
     return Laterality.UNKNOWN, None, None
 
@@ -168,14 +284,13 @@ def get_immediate_next_laterality_from_table(table, index, max_skips=1):
     :return:
     """
     found_skips = 0
-    for name, start, end, is_lat in table:
-        if start > index:  # after our target word
-            if is_lat:
-                return name, start, end
-            else:
-                found_skips += 1
-                if found_skips > max_skips:
-                    return Laterality.UNKNOWN, None, None
+    for name, start, end, is_lat in table.iter_after(index):  # after our target word
+        if is_lat:
+            return name, start, end
+        else:
+            found_skips += 1
+            if found_skips > max_skips:
+                return Laterality.UNKNOWN, None, None
     return Laterality.UNKNOWN, None, None
 
 
@@ -235,6 +350,7 @@ def get_laterality_for_term(lateralities, match: Match, text, *, strategy=Latera
 
 
 class LatLocation:
+    __slots__ = ('laterality', 'start', 'end', 'is_section_start')
 
     def __init__(self, laterality: Laterality, start: int, end: int, is_section_start: bool):
         self.laterality = laterality
@@ -261,6 +377,9 @@ class LatLocation:
         return repr(self)
 
     def __eq__(self, other):
+        if isinstance(other, LatLocation):
+            return (self.laterality == other.laterality and self.start == other.start and self.end == other.end
+                    and bool(self.is_section_start) == bool(other.is_section_start))
         return str(self) == str(other)
 
     def __iter__(self):
@@ -271,6 +390,12 @@ class LatLocation:
 
 
 class LateralityLocator:
+    """
+    Lateralities found in a text, sorted by start offset.
+
+    Stored as parallel arrays (laterality, start, end, is_section_start) rather than as `LatLocation` objects,
+        which are only created when retrieved.
+    """
     # '-', ';', and '¶' cause tests to fail in DR (DME & hemorrhage type).
     DEFAULT_COUNT_LETTERS = {
                                 ',': 1,
@@ -280,65 +405,110 @@ class LateralityLocator:
                                 # '¶': 3,
                             } | {x: 3 for x in LINE_START_CHARS}
 
-    def __init__(self, lateralities: list[LatLocation] = None, *, default_laterality=Laterality.UNKNOWN):
-        if lateralities:
-            self.lateralities = SortedList(lateralities, key=lambda x: x[1])
-        else:
-            self.lateralities = SortedList([], key=lambda x: x[1])
+    def __init__(self, lateralities: list[LatLocation | tuple] = None, *, default_laterality=Laterality.UNKNOWN):
+        self._lats = array.array('b')
+        self._starts = array.array('q')
+        self._ends = array.array('q')
+        self._is_section_starts = array.array('b')
+        for laterality, start, end, is_section_start in sorted(lateralities or [], key=lambda x: x[1]):
+            self._lats.append(laterality)
+            self._starts.append(start)
+            self._ends.append(end)
+            self._is_section_starts.append(is_section_start)
         self.default_laterality = default_laterality
         self.char_max = 3
+        # indices and start offsets of section starts only; built on demand
+        self._sections = None
+        self._section_starts = None
+        # id(value) -> (value, text, cumulative weights of letters in value); see `count_between`
+        self._cumulative_counts = {}
+
+    @property
+    def lateralities(self) -> list[LatLocation]:
+        return list(self)
 
     def add_laterality(self, laterality: LatLocation):
-        self.lateralities.add(laterality)
+        self.add(*laterality)
 
     def add(self, laterality: Laterality, start: int, end: int, is_section_start: bool):
-        self.lateralities.add(LatLocation(laterality, start, end, is_section_start))
+        i = bisect.bisect_right(self._starts, start)  # after any lateralities with same start
+        self._lats.insert(i, laterality)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._is_section_starts.insert(i, is_section_start)
+        self._sections = None
+
+    def _build_index(self):
+        if self._sections is None:
+            self._sections = array.array('q', (i for i, is_sect in enumerate(self._is_section_starts) if is_sect))
+            self._section_starts = array.array('q', (self._starts[i] for i in self._sections))
+
+    def iter_after(self, index):
+        """Iterate through lateralities which start after `index`"""
+        for i in range(bisect.bisect_right(self._starts, index), len(self._starts)):
+            yield self[i]
+
+    def iter_sections_before(self, index):
+        """Iterate (in reverse) through section start lateralities which start before `index`"""
+        self._build_index()
+        for i in reversed(range(bisect.bisect_left(self._section_starts, index))):
+            yield self[self._sections[i]]
 
     def get_previous_section(self, match_start, text, *, exclude_intervening_headers=True) -> Optional[LatLocation]:
-        prev_lat_section = None
-        for i, lat in enumerate(self.lateralities):
-            if lat.is_section_start:
-                if lat.start > match_start:  # laterality after match index
-                    if prev_lat_section:
-                        if exclude_intervening_headers:
-                            if text[lat.start: match_start].count(':') > 1:
-                                return None
-                        return prev_lat_section
-                    return None  # outside of any laterality header (and followed by one)
-                else:
-                    prev_lat_section = lat
+        self._build_index()
+        i = bisect.bisect_right(self._section_starts, match_start)  # first section after match index
+        prev_lat_section = self[self._sections[i - 1]] if i > 0 else None
+        if i < len(self._sections):  # laterality after match index
+            if prev_lat_section:
+                if exclude_intervening_headers:
+                    if text[self._section_starts[i]: match_start].count(':') > 1:
+                        return None
+                return prev_lat_section
+            return None  # outside of any laterality header (and followed by one)
         return prev_lat_section
 
     def get_previous_next_non_section(self, match_start, text) -> tuple[Optional[LatLocation], Optional[LatLocation]]:
         """Get tuple of previous and next matches; ignore previous if previous section header is closer"""
-        last_found_lat = None
-        for i, lat in enumerate(self.lateralities):
-            if lat.is_section_start:
-                if lat.start == match_start:
-                    return lat, None
-                elif lat.start < match_start:  # laterality before match index
-                    last_found_lat = lat  # reset this value
-                # Laterality after match and not section start
-                elif (lat.start > match_start) and ('-' in text[lat.start - 3: lat.start]):
-                    return last_found_lat, lat
-                else:  # laterality section first after match index, so no after
-                    return last_found_lat, None
-            else:
-                if lat.start == match_start:
-                    return lat, None
-                elif lat.start < match_start:  # before, so store it
-                    last_found_lat = lat
-                else:  # after, return this and the previous
-                    return last_found_lat, lat
-        return last_found_lat, None  # nothing found after
+        i = bisect.bisect_left(self._starts, match_start)  # first laterality not before match index
+        last_found_lat = self[i - 1] if i > 0 else None
+        if i == len(self._starts):
+            return last_found_lat, None  # nothing found after
+        lat = self[i]
+        if lat.start == match_start:
+            return lat, None
+        if lat.is_section_start:
+            # Laterality after match and not section start
+            if '-' in text[lat.start - 3: lat.start]:
+                return last_found_lat, lat
+            return last_found_lat, None  # laterality section first after match index, so no after
+        return last_found_lat, lat  # after, return this and the previous
 
     def count_before(self, match_start, text, lat: LatLocation, value) -> int:
         """Count from laterality to match: number of `value` from `lat.start` to `match_start`"""
-        return self.count_all(text[lat.start:match_start], value)
+        return self.count_between(lat.start, match_start, text, value)
 
     def count_after(self, match_start, text, lat: LatLocation, value) -> int:
         """Count from match to laterality: number of `value` between `match_start` and `lat.start`"""
-        return self.count_all(text[match_start:lat.start], value)
+        return self.count_between(match_start, lat.start, text, value)
+
+    def count_between(self, start, end, text, value) -> int:
+        """Equivalent to `self.count_all(text[start:end], value)` for non-negative `start` and `end`"""
+        cumulative_counts = self._get_cumulative_counts(text, value)
+        start = min(start, len(text))
+        end = min(end, len(text))
+        if end <= start:
+            return 0
+        return cumulative_counts[end] - cumulative_counts[start]
+
+    def _get_cumulative_counts(self, text, value):
+        """Running total of weights of letters in `value` for `text`, built once per text"""
+        cached_value, cached_text, cumulative_counts = self._cumulative_counts.get(id(value), (None, None, None))
+        if cached_value is not value or cached_text is not text:
+            weights = value if isinstance(value, dict) else dict.fromkeys(value, 1)
+            cumulative_counts = array.array('q', [0])
+            cumulative_counts.extend(itertools.accumulate(map(weights.get, text, itertools.repeat(0))))
+            self._cumulative_counts[id(value)] = (value, text, cumulative_counts)
+        return cumulative_counts
 
     def count_all(self, text, value):
         return sum([value.get(letter, 1) if isinstance(value, dict) else 1 for letter in text if letter in value])
@@ -436,14 +606,21 @@ class LateralityLocator:
                 )
         return self.default_laterality
 
+    def __getitem__(self, i) -> LatLocation:
+        return LatLocation(_LATERALITY_BY_VALUE[self._lats[i]], self._starts[i], self._ends[i],
+                           self._is_section_starts[i] == 1)
+
     def __iter__(self):
-        return iter(self.lateralities)
+        for i in range(len(self._starts)):
+            yield self[i]
 
     def __eq__(self, other):
-        return self.lateralities == other.lateralities and self.default_laterality == other.default_laterality
+        return (self._lats == other._lats and self._starts == other._starts and self._ends == other._ends
+                and self._is_section_starts == other._is_section_starts
+                and self.default_laterality == other.default_laterality)
 
     def __len__(self):
-        return len(self.lateralities)
+        return len(self._starts)
 
 
 def get_laterality_by_index(lateralities, match_start, text):
@@ -1,32 +1,82 @@
+import array
+import bisect
 import re
 
+from eye_extractor.nlp.text_index import get_text_index
+
 LINE_START_CHARS_RX = r'\n\r¶'
 LINE_START_CHARS = '\n\r¶'
 
 
 def get_previous_text_to_newline(index, text, line_start_chars=LINE_START_CHARS_RX):
-    pat = re.compile(f'[{line_start_chars}]')
-    line = pat.split(text[:index])[-1]
-    return line
+    return get_text_index(LineIndex, text, line_start_chars).get_previous_text_to_newline(index)
 
 
 def get_next_text_to_newline(index, text, line_end_chars=LINE_START_CHARS_RX):
-    pat = re.compile(f'[{line_end_chars}]')
-    line = pat.split(text[index:])[0]
-    return line
+    return get_text_index(LineIndex, text, line_end_chars).get_next_text_to_newline(index)
 
 
 def get_next_index_of_newline(index, text, line_end_chars=LINE_START_CHARS):
-    i = index
-    for i, letter in enumerate(text[index:], start=index):
-        if letter in line_end_chars:
-            return i
-    return i
+    return get_text_index(LineIndex, text, re.escape(line_end_chars)).get_next_index_of_newline(index)
 
 
 def get_previous_index_of_newline(index, text, line_end_chars=LINE_START_CHARS):
-    i = index
-    for i, letter in enumerate(text[:index][::-1]):
-        if letter in line_end_chars:
-            return index - i
-    return i
+    return get_text_index(LineIndex, text, re.escape(line_end_chars)).get_previous_index_of_newline(index)
+
+
+class LineIndex:
+    """
+    Offsets of all newline characters in a text, to find line boundaries by bisection.
+
+    The module-level functions re-use the index of a text while extracting from a document (see `nlp.text_index`).
+
+    Methods behave as the module-level functions of the same name (including for indices outside of the text).
+    """
+
+    def __init__(self, text, line_chars_rx=LINE_START_CHARS_RX):
+        """
+        :param text:
+        :param line_chars_rx: newline characters, formatted for a regex character class
+        """
+        self.text = text
+        self.newlines = array.array('q', (m.start() for m in re.finditer(f'[{line_chars_rx}]', text)))
+
+    def _slice_start(self, index):
+        """Start of `text[index:]`"""
+        return slice(index, None).indices(len(self.text))[0]
+
+    def _slice_stop(self, index):
+        """End of `text[:index]`"""
+        return slice(index).indices(len(self.text))[1]
+
+    def get_line_start(self, index):
+        """Start of line containing `text[:index]`'s final character"""
+        i = bisect.bisect_left(self.newlines, self._slice_stop(index))
+        return self.newlines[i - 1] + 1 if i > 0 else 0
+
+    def get_line_end(self, index):
+        """Index of first newline (or end of text) in `text[index:]`"""
+        i = bisect.bisect_left(self.newlines, self._slice_start(index))
+        return self.newlines[i] if i < len(self.newlines) else len(self.text)
+
+    def get_previous_text_to_newline(self, index):
+        return self.text[self.get_line_start(index): self._slice_stop(index)]
+
+    def get_next_text_to_newline(self, index):
+        start = self._slice_start(index)
+        return self.text[start: self.get_line_end(start)]
+
+    def get_next_index_of_newline(self, index):
+        start = self._slice_start(index)
+        if start == len(self.text):
+            return index
+        i = bisect.bisect_left(self.newlines, start)
+        end = self.newlines[i] if i < len(self.newlines) else len(self.text) - 1  # else, last character
+        return index + end - start
+
+    def get_previous_index_of_newline(self, index):
+        stop = self._slice_stop(index)
+        i = bisect.bisect_left(self.newlines, stop)
+        if i > 0:
+            return index - (stop - 1 - self.newlines[i - 1])
+        return stop - 1 if stop > 0 else index
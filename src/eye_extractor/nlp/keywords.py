@@ -0,0 +1,101 @@
+"""
+Skip extractors when none of their trigger terms appear in a document.
+
+* Extractors declare literal trigger terms, along with the patterns which produce their output, using
+    `requires_terms`: if none of the terms appear in a document, none of the patterns can match,
+    so the (empty) result is returned without running the extractor.
+* Each document is normalised once (ignoring case, as `re.IGNORECASE` would) and searched for
+    all registered terms (see `KeywordIndex`).
+* The patterns are registered in `EXTRACTOR_TERMS`, so that the tests can verify that every match of each pattern
+    contains one of the extractor's terms, i.e., that skipping extractors cannot change the output.
+* Terms should not contain whitespace, as views of a document (e.g., sections) may join lines.
+* Short terms (e.g., abbreviations) which are common within words can be required as whole words with `word`.
+"""
+import functools
+import re
+from typing import Iterable, Pattern
+
+_WORD = '\x00'  # marks word boundaries around word terms (and in literal strings of patterns)
+_CASED_WORD = '\x01'  # marks word boundaries around word terms which match case
+
+# non-ascii characters which `re.IGNORECASE` matches to ascii letters (besides upper case)
+_CASE_EQUIVALENTS = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's'})
+
+# extractor name -> (trigger terms, patterns)
+EXTRACTOR_TERMS: dict[str, tuple[frozenset[str], tuple[Pattern, ...]]] = {}
+TRIGGER_TERMS = frozenset()  # all registered terms
+
+
+def normalise_text(text: str) -> str:
+    """Lowercase `text` so that any `re.IGNORECASE` match of a (lowercase) literal is a substring"""
+    return text.translate(_CASE_EQUIVALENTS).lower()
+
+
+def word(term: str, *, cased=False) -> str:
+    """
+    Trigger term which must appear as a whole word (e.g., `word('ga')` for 'GA' but not 'again').
+
+    :param cased: match case (for patterns without `re.IGNORECASE`, e.g., 'HE' but not 'He')
+    """
+    if cased:
+        return f'{_CASED_WORD}{term}{_CASED_WORD}'
+    return f'{_WORD}{term.lower()}{_WORD}'
+
+
+class KeywordIndex:
+    """Registered trigger terms found in a text, searched on first use"""
+
+    def __init__(self, text: str):
+        self._text = text
+        self._normalised = None
+        self._words = None
+        self._searched = frozenset()
+        self._found = frozenset()
+
+    def has_any(self, terms: frozenset[str]) -> bool:
+        """Whether any of `terms` appear in the text"""
+        if not terms <= self._searched:
+            missing = (TRIGGER_TERMS | terms) - self._searched
+            self._found |= {term for term in missing if self._contains(term)}
+            self._searched |= missing
+        return not self._found.isdisjoint(terms)
+
+    def _contains(self, term: str) -> bool:
+        if term.startswith((_WORD, _CASED_WORD)):
+            if self._words is None:
+                words = re.findall(r'\w+', self._text)
+                self._words = {f'{_CASED_WORD}{w}{_CASED_WORD}' for w in words}
+                self._words |= {f'{_WORD}{normalise_text(w)}{_WORD}' for w in words}
+            return term in self._words
+        if self._normalised is None:
+            self._normalised = normalise_text(self._text)
+        return term in self._normalised
+
+
+def requires_terms(*terms: str, patterns: Iterable[Pattern] = (), empty=list):
+    """
+    Decorator for extractors `func(doc, ...)` which only produce output from matches of `patterns`:
+        if none of `terms` appear in the document (see `Document.has_any_term`), return `empty()`.
+
+    :param terms: literal terms (or whole words, see `word`), one of which every match of `patterns` contains
+    :param patterns: patterns whose matches produce output (checked against `terms` by the tests)
+    :param empty: build result when the extractor is skipped
+    """
+    global TRIGGER_TERMS
+    terms = frozenset(term if term.startswith(_CASED_WORD) else term.lower() for term in terms)
+    TRIGGER_TERMS |= terms
+
+    def decorator(func):
+        EXTRACTOR_TERMS[f'{func.__module__}.{func.__qualname__}'] = (terms, tuple(patterns))
+
+        @functools.wraps(func)
+        def wrapper(doc, *args, **kwargs):
+            if not doc.has_any_term(terms):
+                return empty()
+            return func(doc, *args, **kwargs)
+
+        wrapper.trigger_terms = terms
+        return wrapper
+
+    return decorator
+
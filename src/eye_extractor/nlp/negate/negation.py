@@ -1,8 +1,10 @@
 import enum
+import functools
 import re
 from typing import Match, Pattern
 
 from eye_extractor.common.string import replace_punctuation
+from eye_extractor.nlp.text_index import get_text_index
 
 
 class NegationStatus(enum.IntEnum):
@@ -131,6 +133,54 @@ def _handle_negation_with_punctuation(text):
     return text
 
 
+@functools.lru_cache(maxsize=128)
+def get_boundary_pattern(boundary_chars: str, boundary_regex: Pattern = None):
+    """Compiled pattern splitting negation context on any of `boundary_chars` or `boundary_regex`"""
+    if not boundary_chars:
+        return None
+    boundary_pattern = f'[{re.escape(boundary_chars)}]'
+    if boundary_regex:
+        boundary_pattern = f'(?:{boundary_regex.pattern}|{boundary_pattern})'
+    return re.compile(boundary_pattern)
+
+
+class NegationTokens:
+    """
+    Words of contexts in a text, normalised as in `has_before`/`has_after`.
+
+    Extractors inspect the same contexts repeatedly (e.g., `is_negated` and `is_historical` for each match),
+        so each context is only normalised once per text (see `nlp.text_index`).
+    """
+
+    def __init__(self, text, boundary_pattern: Pattern = None, *, lowercase_text=True, hack_punctuation=False):
+        self.text = text
+        self.boundary_pattern = boundary_pattern
+        self.lowercase_text = lowercase_text
+        self.hack_punctuation = hack_punctuation
+        self._words_before = {}
+        self._words_after = {}
+
+    def get_words_before(self, end_idx: int, char_window: int, skip_n_boundary_chars=0):
+        """Words in context as inspected by `has_before`"""
+        key = (end_idx, char_window, skip_n_boundary_chars)
+        if (words := self._words_before.get(key)) is None:
+            words = self._words_before[key] = tuple(_normalise_context(
+                _get_context_before(self.text, end_idx, char_window, self.boundary_pattern, skip_n_boundary_chars),
+                self.lowercase_text, self.hack_punctuation,
+            ))
+        return words
+
+    def get_words_after(self, start_idx: int, char_window: int, skip_n_boundary_chars=1):
+        """Words in context as inspected by `has_after`"""
+        key = (start_idx, char_window, skip_n_boundary_chars)
+        if (words := self._words_after.get(key)) is None:
+            words = self._words_after[key] = tuple(_normalise_context(
+                _get_context_after(self.text, start_idx, char_window, self.boundary_pattern, skip_n_boundary_chars),
+                self.lowercase_text, self.hack_punctuation,
+            ))
+        return words
+
+
 def is_any_negated(m: Match | int, text: str):
     return is_negated(m, text) or is_post_negated(m, text)
 
@@ -165,28 +215,23 @@ def is_negated(m: Match | int, text: str, terms: set[str] | frozenset[str] | dic
     )
 
 
-def has_before(end_idx: int, text: str, terms: set[str] | dict,
+def has_before(end_idx: int, text: str, terms: set[str] | frozenset[str] | dict,
                *, word_window: int = 2, char_window: int = 0,
                skip_regex: Pattern = None, boundary_regex: Pattern = None,
                boundary_chars=':¶', skip_n_boundary_chars=0, lowercase_text=True,
                hack_punctuation=False, return_unknown=False):
     if not char_window:
         char_window = word_window * 10
-    context = text[max(0, end_idx - char_window): end_idx]
-    if boundary_chars:
-        if skip_regex is not None:
-            context = skip_regex.sub(' ', context)
-        boundary_pattern = f'[{re.escape(boundary_chars)}]'
-        if boundary_regex:
-            boundary_pattern = f'(?:{boundary_regex.pattern}|{boundary_pattern})'
-        context_list = re.split(boundary_pattern, context)
-        context = ' '.join(context_list[-1 - skip_n_boundary_chars:])
-    if lowercase_text:
-        context = context.lower()
-    if hack_punctuation:
-        context = _handle_negation_with_punctuation(context)
-    no_punct = replace_punctuation(context)
-    words = no_punct.split()
+    boundary_pattern = get_boundary_pattern(boundary_chars, boundary_regex)
+    if skip_regex is None or boundary_pattern is None:
+        words = get_text_index(
+            NegationTokens, text, boundary_pattern, lowercase_text=lowercase_text, hack_punctuation=hack_punctuation
+        ).get_words_before(end_idx, char_window, skip_n_boundary_chars)
+    else:
+        words = _normalise_context(
+            _get_context_before(text, end_idx, char_window, boundary_pattern, skip_n_boundary_chars, skip_regex),
+            lowercase_text, hack_punctuation,
+        )
     return _prep_negation_tree(words[-word_window:], terms, return_unknown=return_unknown)
 
 
@@ -219,7 +264,7 @@ def is_post_negated(m: Match | int, text: str, terms: set[str] | frozenset[str]
     )
 
 
-def has_after(start_idx: int, text: str, terms: set[str] | dict,
+def has_after(start_idx: int, text: str, terms: set[str] | frozenset[str] | dict,
               *, word_window: int = 2, char_window: int = 0, boundary_regex: Pattern = None,
               skip_n_boundary_chars=1, skip_regex: Match = None,
               boundary_chars=':¶', lowercase_text=True,
@@ -243,22 +288,47 @@ def has_after(start_idx: int, text: str, terms: set[str] | dict,
     """
     if not char_window:
         char_window = word_window * 10
+    boundary_pattern = get_boundary_pattern(boundary_chars, boundary_regex)
+    if skip_regex is None or boundary_pattern is None:
+        words = get_text_index(
+            NegationTokens, text, boundary_pattern, lowercase_text=lowercase_text, hack_punctuation=hack_punctuation
+        ).get_words_after(start_idx, char_window, skip_n_boundary_chars)
+    else:
+        words = _normalise_context(
+            _get_context_after(text, start_idx, char_window, boundary_pattern, skip_n_boundary_chars, skip_regex),
+            lowercase_text, hack_punctuation,
+        )
+    return _prep_negation_tree(words[:word_window], terms, return_unknown=return_unknown)
+
+
+def _get_context_before(text, end_idx, char_window, boundary_pattern=None, skip_n_boundary_chars=0, skip_regex=None):
+    context = text[max(0, end_idx - char_window): end_idx]
+    if boundary_pattern is not None:
+        if skip_regex is not None:
+            context = skip_regex.sub(' ', context)
+        context_list = boundary_pattern.split(context)
+        context = ' '.join(context_list[-1 - skip_n_boundary_chars:])
+    return context
+
+
+def _get_context_after(text, start_idx, char_window, boundary_pattern=None, skip_n_boundary_chars=1, skip_regex=None):
     context = text[start_idx: start_idx + char_window]
-    if boundary_chars:
+    if boundary_pattern is not None:
         if skip_regex is not None:
             context = skip_regex.sub(' ', context)
-        boundary_pattern = f'[{re.escape(boundary_chars)}]'
-        if boundary_regex:
-            boundary_pattern = f'(?:{boundary_regex.pattern}|{boundary_pattern})'
-        context_list = re.split(boundary_pattern, context)
+        context_list = boundary_pattern.split(context)
         context = ' '.join(context_list[:1 + skip_n_boundary_chars])
+    return context
+
+
+def _normalise_context(context, lowercase_text=True, hack_punctuation=False):
+    """Words in `context` after lowercasing and removing punctuation"""
     if lowercase_text:
         context = context.lower()
     if hack_punctuation:
         context = _handle_negation_with_punctuation(context)
     no_punct = replace_punctuation(context)
-    words = no_punct.split()
-    return _prep_negation_tree(words[:word_window], terms, return_unknown=return_unknown)
+    return no_punct.split()
 
 
 def _find_negated_list_spans(text: str) -> list[tuple[int, int, str]]:
@@ -0,0 +1,63 @@
+"""
+Search a text for a battery of labelled patterns.
+
+* Equivalent to calling `finditer` with each pattern in turn: each pattern's matches are non-overlapping,
+    while matches of different patterns may overlap.
+* Each pattern is scanned separately: a single scanner combining the patterns (an alternation of
+    lookaheads, one for each pattern) was slower, as it cannot use each pattern's literal prefix
+    to skip ahead (see `benchmarks/bench_pattern_battery.py`).
+"""
+import re
+from typing import Any, Iterable, Iterator, Pattern
+
+
+class PatternBattery:
+    """Labelled patterns to search for together: see `iter_by_pattern` and `iter_by_start`"""
+
+    def __init__(self, patterns: Iterable[tuple[Any, Pattern]]):
+        self.patterns = list(patterns)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __iter__(self):
+        return iter(self.patterns)
+
+    def iter_by_pattern(self, text: str) -> Iterator[tuple[Any, re.Match]]:
+        """
+        Generate (label, match) for all matches, ordered by pattern, then by start index.
+
+        Same as calling `finditer` for each pattern in turn.
+        """
+        for label, pattern in self.patterns:
+            for m in pattern.finditer(text):
+                yield label, m
+
+    def iter_by_start(self, text: str) -> Iterator[tuple[Any, re.Match]]:
+        """
+        Generate (label, match) for all matches, ordered by start index, then by order of patterns.
+
+        Same as sorting (stably, by start index) matches from `finditer` for each pattern.
+        """
+        yield from sorted(self.iter_by_pattern(text), key=lambda x: x[1].start())
+
+    def sub(self, repl: str, text: str) -> tuple[list[tuple[Any, re.Match]], str]:
+        """
+        Find matches of each pattern in turn, replacing them with (literal) `repl` before searching for the next.
+
+        As calling `finditer` and then `sub` with each pattern, but scanning the text once per pattern.
+
+        :return: (label, match) for all matches, ordered by pattern; text with all matches replaced
+        """
+        matches = []
+        for label, pattern in self.patterns:
+            pieces = []
+            prev = 0
+            for m in pattern.finditer(text):
+                matches.append((label, m))
+                pieces.append(text[prev:m.start()])
+                prev = m.end()
+            if pieces:
+                pieces.append(text[prev:])
+                text = repl.join(pieces)
+        return matches, text
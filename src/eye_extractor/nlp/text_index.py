@@ -0,0 +1,35 @@
+"""
+Re-use indexes of a text (e.g., `LineIndex`, `LineDateIndex`, `NegationTokens`) while extracting from one document.
+
+* Helpers such as `parse_nearest_date_to_line_start` or `is_negated` are called with a text (a view of the
+    document, a section, etc.) from every extractor; they retrieve the index of that text with `get_text_index`.
+* A `Document` owns the indexes built for its texts, and passes them to the helpers for the duration of
+    `Document.text_indexes` (e.g., in `extract_all`), so they are built lazily, once per document,
+    and discarded with it.
+* Outside of this scope, an index is built for each call.
+"""
+import contextlib
+
+_text_indexes = None  # (index type, text, args) -> index for the current document; see `text_index_scope`
+
+
+@contextlib.contextmanager
+def text_index_scope(indexes: dict):
+    """Retrieve and store indexes in `indexes` (owned by a single document) until exit"""
+    global _text_indexes
+    previous = _text_indexes
+    _text_indexes = indexes
+    try:
+        yield
+    finally:
+        _text_indexes = previous
+
+
+def get_text_index(index_type, text: str, *args, **kwargs):
+    """`index_type(text, *args, **kwargs)`, built once per text in the current `text_index_scope`"""
+    if _text_indexes is None:
+        return index_type(text, *args, **kwargs)
+    key = (index_type, text, args, tuple(kwargs.items()))
+    if (index := _text_indexes.get(key)) is None:
+        index = _text_indexes[key] = index_type(text, *args, **kwargs)
+    return index
@@ -0,0 +1,166 @@
+"""
+Build plan for `build_table.process_data`: the builders for each group of variables, in order.
+
+`BUILD_STEPS` is the registry of builders run for each note (e.g., `build_dr_variables`), so that output
+    columns can be mapped back to the builders producing them. Each step (`BuildStep`) has:
+* builder: the builder for a group of variables (e.g., `output.dr.build_dr_variables`), which returns
+    output columns (and returns nothing if its group was not extracted)
+* source: what is passed to the builder (`note` for the whole note; `get` for a list of extracted variables)
+    and the top-level keys of `data` it reads
+* group: name of the group of columns, used to select columns (e.g., 'dr'); None for 'shared'
+* prefixes: prefixes of the output columns, for builders whose columns depend on what was extracted (e.g., VA)
+
+When the plan is created (`BuildPlan`), the output columns of each step are found (from `prefixes`, or by running
+    the builder on a note in which every group was extracted but is empty) and checked against `OUTPUT_COLUMNS`.
+
+A plan can be restricted to the steps building particular columns with `BuildPlan.select`;
+    `BuildPlan.keys` are then the top-level keys of `data` which are read.
+"""
+import collections
+from typing import Callable, NamedTuple
+
+from eye_extractor.builders.build_history import build_history
+from eye_extractor.output.amd import build_amd_variables
+from eye_extractor.output.cataract import build_cataract_variables
+from eye_extractor.output.cataract_surgery import build_cataract_surgery_variables
+from eye_extractor.output.columns import OUTPUT_COLUMNS
+from eye_extractor.output.dr import build_dr_variables
+from eye_extractor.output.exam import build_exam
+from eye_extractor.output.glaucoma import build_glaucoma
+from eye_extractor.output.iop import build_iop
+from eye_extractor.output.ro import build_ro_variables
+from eye_extractor.output.shared import build_shared_variables
+from eye_extractor.output.uveitis import build_uveitis_variables
+from eye_extractor.output.va import build_va, get_manifest
+
+
+def get(key, default=None):
+    """Source: data.get(key, default)"""
+    def _get(data):
+        return data.get(key, default)
+    _get.keys = (key,)
+    return _get
+
+
+def note(*keys):
+    """Source: the whole note, of which the builder reads top-level `keys`"""
+    def _note(data):
+        return data
+    _note.keys = keys
+    return _note
+
+
+class BuildStep(NamedTuple):
+    builder: Callable
+    source: Callable  # data -> data passed to builder
+    group: str = None
+    prefixes: tuple = None
+
+
+BUILD_STEPS = [
+    # NB: `safeget(data, *keys)` reads each key from `data`, so these are included in the keys read
+    BuildStep(build_shared_variables, note('common', 'amd', 'fluid', 'dry', 'wet', 'treatment')),
+    BuildStep(build_va, get('va', default=[]), 'va', ('vacc_', 'vaph_', 'varx_', 'vasc_', 'etdrs_')),
+    BuildStep(build_iop, get('iop', default=[]), 'iop', ('iop_',)),
+    BuildStep(get_manifest, get('manifestrx', default=[]), 'manifestrx', ('manifestrx_',)),
+    BuildStep(build_amd_variables, note('amd', 'common', 'macula_wnl', 'fluid', 'treatment'), 'amd'),
+    BuildStep(build_glaucoma, note('glaucoma', 'common'), 'glaucoma'),
+    BuildStep(build_uveitis_variables, note('uveitis'), 'uveitis'),
+    BuildStep(build_ro_variables, note('ro', 'common'), 'ro'),
+    BuildStep(build_cataract_variables, note('cataract'), 'cataract'),
+    BuildStep(build_cataract_surgery_variables, note('cataractsurg'), 'cataractsurg',
+              ('cataractsurg_', 'catsurg_comp_')),
+    BuildStep(build_history, note('history', 'family', 'personal'), 'history', ('famhx_', 'perhx_')),
+    BuildStep(build_exam, note('exam'), 'exam', ('cupdiscratio_', 'rnfloct_', 'macularoct_')),
+    BuildStep(build_dr_variables, note('dr', 'common'), 'dr'),
+]
+
+
+class _EmptyGroup(dict):
+    """Extracted group (e.g., `data['dr']`) in which every variable is an empty list"""
+
+    def __bool__(self):
+        return True
+
+    def __missing__(self, key):
+        return []
+
+
+class _EmptyNote(dict):
+    """Note in which every group was extracted but is empty, to find the output columns of builders"""
+
+    def __missing__(self, key):
+        return collections.defaultdict(lambda: None) if key == 'note' else _EmptyGroup()
+
+    def get(self, key, default=None):
+        return self[key]
+
+
+class BuildPlan:
+    """
+    Build steps for `process_data`: run with `run(data)`.
+
+    :param steps: build steps, in order (later steps overwrite columns of earlier steps)
+    :param columns: output columns (defaults to `OUTPUT_COLUMNS`)
+    """
+
+    def __init__(self, steps=None, columns=None):
+        self.steps = list(BUILD_STEPS if steps is None else steps)
+        self.output_columns = OUTPUT_COLUMNS if columns is None else columns
+        # output columns of each step
+        self.columns = [self._get_columns(s, self.output_columns) for s in self.steps]
+        for s, step_columns in zip(self.steps, self.columns):
+            if unknown := [column for column in step_columns if column not in self.output_columns]:
+                raise ValueError(f'Builder {s.builder.__name__} returns columns not in output columns: {unknown}')
+
+    @property
+    def groups(self) -> dict[str, list[str]]:
+        """Column groups: group -> output columns of its steps"""
+        groups = {}
+        for s, step_columns in zip(self.steps, self.columns):
+            group_columns = groups.setdefault(s.group or 'shared', [])
+            group_columns.extend(column for column in step_columns if column not in group_columns)
+        return groups
+
+    @property
+    def keys(self) -> set[str]:
+        """Top-level keys of `data` read when running the plan"""
+        keys = {'note'}
+        for s in self.steps:
+            keys.update(s.source.keys)
+        return keys
+
+    def get_columns(self, columns=None, groups=None) -> list[str]:
+        """
+        Output columns (in order) from names of `columns` and column `groups`
+
+        :raises ValueError: if a column or group is not known
+        """
+        selected = set(columns or ())
+        if unknown := [column for column in selected if column not in self.output_columns]:
+            raise ValueError(f'Unknown columns: {", ".join(unknown)}')
+        all_groups = self.groups
+        for group in groups or ():
+            if group not in all_groups:
+                raise ValueError(f'Unknown column group: {group}; expected one of: {", ".join(all_groups)}')
+            selected.update(all_groups[group])
+        return [column for column in self.output_columns if column in selected]
+
+    def select(self, columns) -> 'BuildPlan':
+        """Plan with only the steps building any of `columns`"""
+        columns = set(columns)
+        steps = [s for s, step_columns in zip(self.steps, self.columns) if columns.intersection(step_columns)]
+        return BuildPlan(steps, self.output_columns)
+
+    @staticmethod
+    def _get_columns(s: BuildStep, columns) -> list[str]:
+        if s.prefixes:
+            return [column for column in columns if column.startswith(s.prefixes)]
+        return list(s.builder(s.source(_EmptyNote())))
+
+    def run(self, data) -> dict:
+        """Run each step on `data` (as loaded from jsonl, with `note.date` set by `process_data`)"""
+        results = {}
+        for s in self.steps:
+            results.update(s.builder(s.source(data)))
+        return results
@@ -89,8 +89,10 @@ When checking to see if the default (IolLens.UNKNOWN) should be updated, we can
             rename_func=lambda x: x.name.lower(),
 
 """
+import contextlib
 import datetime
 import enum
+import functools
 from enum import Enum
 
 
@@ -141,6 +143,99 @@ def _get_updated_priority(row, target_varname):
     return row[target_varname].get('priority', 0)
 
 
+def _is_greater(new, current):
+    return new > current
+
+
+def _get_new(new, current):
+    return new
+
+
+def _get_value(value):
+    return value['value'] if isinstance(value, dict) else value
+
+
+def _identity(value):
+    return value
+
+
+def _enum_to_str(value):
+    return value.name.replace('_', ' ') if isinstance(value, Enum) else value
+
+
+def _enum_to_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+@functools.cache
+def _enum_transformer(enumclass):
+    """Deserialize `value` (or value['value']) to `enumclass`; cached so each enum has a single function"""
+    def _transform(value):
+        return enumclass(value['value'] if isinstance(value, dict) else value)
+    return _transform
+
+
+_row_indexes = None  # id(data) -> (data, row index) while building a note; see `row_index_scope`
+
+
+@contextlib.contextmanager
+def row_index_scope():
+    """
+    Index rows (see `index_rows`) once per list while building the columns of a single note: most builders
+        are called with the same list (e.g., `data['dr']`). Indexes are discarded on exit; the lists and
+        their rows must not be modified within the scope.
+    """
+    global _row_indexes
+    previous = _row_indexes
+    _row_indexes = {}
+    try:
+        yield
+    finally:
+        _row_indexes = previous
+
+
+def index_rows(data):
+    """
+    Group rows (i.e., elements of list read from json file) by variable name.
+
+    :param data: list of dicts
+    :return: dict of variable name -> positions of rows with that variable name;
+        None if `data` is not a list of dicts
+    """
+    if not isinstance(data, list):
+        return None
+    index = {}
+    for i, row in enumerate(data):
+        if not isinstance(row, dict):
+            return None
+        for varname in row:
+            if varname in index:
+                index[varname].append(i)
+            else:
+                index[varname] = [i]
+    return index
+
+
+def _iter_rows(data, target_varnames):
+    """
+    Rows in `data` (in order) with any of `target_varnames`, using the row index of the current
+        `row_index_scope`; all rows if not in a scope or they cannot be indexed
+    """
+    if not data:
+        return []
+    if _row_indexes is None:
+        return data
+    if (cached := _row_indexes.get(id(data))) is None:
+        cached = _row_indexes[id(data)] = (data, index_rows(data))  # retain data so its id is not reused
+    index = cached[1]
+    if index is None:
+        return data
+    positions = [index[varname] for varname in target_varnames if varname in index]
+    if len(positions) == 1:
+        return [data[i] for i in positions[0]]
+    return [data[i] for i in sorted(set().union(*positions))]
+
+
 def rename_variable_func(varname):
     return lambda x: f'{varname}_{x.split("_")[-1]}'
 
@@ -199,35 +294,34 @@ def column_from_variable(results, data, *, compare_func=None, transformer_func=N
     :return:
     """
     if compare_func is None:
-        compare_func = lambda n, c: n > c  # default to New > Current
+        compare_func = _is_greater  # default to New > Current
     if result_func is None:
-        result_func = lambda n, c: n  # default to return New value
+        result_func = _get_new  # default to return New value
     if transformer_func is None:
         # no deserialization required (or created with `create_variable` function)
-        transformer_func = lambda n: n['value'] if isinstance(n, dict) else n
+        transformer_func = _get_value
     elif isinstance(transformer_func, enum.EnumMeta):
-        enumclass = transformer_func
-        transformer_func = lambda n: enumclass(n['value'] if isinstance(n, dict) else n)
-    if filter_func is None:  # inclusion criteria
-        filter_func = lambda n: True
+        transformer_func = _enum_transformer(transformer_func)
     if convert_func is None:  # if using different names (want different output name)
-        convert_func = lambda n: n
-    if sideeffect_func is None:  # side effects when variable is updated
-        sideeffect_func = lambda r, v, n: None
+        convert_func = _identity
     if rename_func is None:  # final renaming of variable after processing
         if enum_to_str:  # convert result enum to string value, replace underscore
-            rename_func = lambda n: n.name.replace('_', ' ') if isinstance(n, Enum) else n
+            rename_func = _enum_to_str
         else:
-            rename_func = lambda n: n.value if isinstance(n, Enum) else n
+            rename_func = _enum_to_value
     if renamevar_func is None:  # final renaming of variable name after processing
-        renamevar_func = lambda n: n
-    priorities = {convert_func(varname): -1 for varname in results}  # target_varname -> value
-    for row in data or []:  # for each element in list read from json file
+        renamevar_func = _identity
+    targets = {varname: convert_func(varname) for varname in results}  # varname -> target_varname
+    priorities = {target_varname: -1 for target_varname in targets.values()}  # target_varname -> value
+    # for each element in list read from json file (with a target, unless side effects may add variables)
+    for row in _iter_rows(data, priorities) if sideeffect_func is None else data or []:
         for varname, curr_value in list(results.items()):  # for each outcome of interest
-            target_varname = convert_func(varname)  # change the column/variable name
+            # change the column/variable name
+            target_varname = targets[varname] if varname in targets else convert_func(varname)
             if target_varname not in row:
                 continue
-            if not filter_func(row[target_varname]):  # apply inclusion criteria in filter func
+            # apply inclusion criteria in filter func
+            if filter_func is not None and not filter_func(row[target_varname]):
                 continue
             if not has_valid_date(restrict_date, row[target_varname]):
                 continue
@@ -243,7 +337,8 @@ def column_from_variable(results, data, *, compare_func=None, transformer_func=N
             if _has_higher_priority(priorities, row, target_varname) or compare_func(new_value, curr_value):
                 priorities[target_varname] = _get_updated_priority(row, target_varname)  # default to 0 priority
                 results[varname] = result_func(new_value, curr_value)  # how to merge the prev/new value
-                sideeffect_func(results, varname, new_value)
+                if sideeffect_func is not None:  # side effects when variable is updated
+                    sideeffect_func(results, varname, new_value)
     return {renamevar_func(varname): rename_func(value) for varname, value in results.items()}
 
 
@@ -0,0 +1,65 @@
+"""
+Run a function over a (lazy) stream of notes using a pool of worker processes (`imap_ordered`)
+    or threads (`imap_threaded`, e.g., to read notes ahead of extraction).
+
+* Results are yielded in the same order as the input.
+* Only a bounded number of items are submitted ahead of the results being consumed,
+    so the reader (and its progress logging) never runs far ahead of the extraction.
+"""
+import collections
+import concurrent.futures
+import multiprocessing
+
+
+def imap_ordered(func, iterable, *, workers=1, max_pending=None):
+    """
+    Apply `func` to each item in `iterable`, yielding results in input order.
+
+    :param func: picklable (i.e., module-level) function accepting a single item
+    :param iterable: items to process; consumed lazily
+    :param workers: number of processes; if <= 1, run in the current process
+    :param max_pending: max number of submitted items awaiting collection (defaults to 4 per worker)
+    :return:
+    """
+    if workers <= 1:
+        yield from map(func, iterable)
+        return
+    if max_pending is None:
+        max_pending = workers * 4
+    with multiprocessing.Pool(workers) as pool:
+        pending = collections.deque()
+        for item in iterable:
+            pending.append(pool.apply_async(func, (item,)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def imap_threaded(func, iterable, *, workers=4, max_pending=None):
+    """
+    Apply `func` to each item in `iterable` in a pool of threads, yielding results in input order.
+
+    Suited to I/O-bound functions (e.g., reading files): up to `max_pending` items are processed
+        while the consumer is busy with earlier results.
+
+    :param func: function accepting a single item
+    :param iterable: items to process; consumed lazily (in the calling thread)
+    :param workers: number of threads
+    :param max_pending: max number of submitted items awaiting collection (defaults to 4 per worker)
+    :return:
+    """
+    if max_pending is None:
+        max_pending = workers * 4
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        try:
+            for item in iterable:
+                pending.append(executor.submit(func, item))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:  # e.g., if consumer stopped early
+                future.cancel()
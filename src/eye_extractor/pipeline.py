@@ -0,0 +1,144 @@
+"""
+Extract variables from a corpus of notes and build the csv table in a single pass (rather than running
+    `extract` to write jsonl and then `build_table` to read it).
+
+* The output of `extract_all` is passed to `build_table.process_data` in memory: it is converted to the types it
+    would have after being written to and read from jsonl (see `common.json.json_round_trip`), so the csv is the
+    same as from `extract` followed by `build_table`.
+* Optionally, also write the jsonl (e.g., for `eyex-lookup-jsonl`); each note's data is then serialised once
+    and the jsonl line is loaded to build its row.
+* As with `extract`, notes can be processed in worker processes (`--workers`) and notes which time out or fail
+    are quarantined (`--timeout`).
+"""
+import contextlib
+import csv
+import datetime
+import functools
+import pathlib
+import sys
+
+import click
+from loguru import logger
+
+from eye_extractor.build_table import build_row_from_data
+from eye_extractor.clickargs import table_output_opts
+from eye_extractor.common.json import dumps_json, json_round_trip, loads_json
+from eye_extractor.corpusio import read_from_params
+from eye_extractor.extract import extract_variable_from_text
+from eye_extractor.output.columns import OUTPUT_COLUMNS
+from eye_extractor.parallel import imap_ordered
+from eye_extractor.profiling import ExtractionProfile
+from eye_extractor.quarantine import NoteTimeout, QuarantineWriter, note_budget, quarantine_record
+
+
+@click.command()
+@click.argument('directories', nargs=-1, type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path))
+@table_output_opts(False)
+@click.option('--filelist', type=click.Path(dir_okay=False, path_type=pathlib.Path), default=None)
+@click.option('--packed', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), default=None,
+              help='Read notes from a packed corpus (see `eyex-pack-corpus`) rather than directories/filelist.')
+@click.option('--search-missing-headers', is_flag=True, default=False,
+              help='If a requested header is not found, attempt to find it in the text.')
+@click.option('--workers', type=int, default=1,
+              help='Number of processes to use for extraction; output order is preserved.')
+@click.option('--prefetch', type=int, default=0,
+              help='Read up to N notes ahead of extraction in background threads (e.g., for slow storage).')
+@click.option('--timeout', type=float, default=None,
+              help='Quarantine notes taking longer than this many seconds to extract, and continue with the rest.')
+@click.option('--write-jsonl', is_flag=True, default=False,
+              help='Also write the extracted variables to jsonl (as `extract`).')
+def _extract_and_build_table(directories: tuple[pathlib.Path], outdir: pathlib.Path = None,
+                             date_column='note_date', add_columns=None, filelist: pathlib.Path = None, *,
+                             packed=None, search_missing_headers=False, workers=1, prefetch=0, timeout=None,
+                             write_jsonl=False):
+    extract_and_build_table(directories, outdir, filelist, packed=packed,
+                            search_missing_headers=search_missing_headers, workers=workers, prefetch=prefetch,
+                            timeout=timeout, write_jsonl=write_jsonl, date_column=date_column,
+                            add_columns=add_columns)
+
+
+def extract_and_build_table(directories: tuple[pathlib.Path] = None, outdir: pathlib.Path = None,
+                            filelist: pathlib.Path = None,
+                            *,
+                            packed=None,
+                            search_missing_headers=False,
+                            workers=1,
+                            prefetch=0,
+                            timeout=None,
+                            write_jsonl=False,
+                            date_column='note_date',
+                            add_columns=None):
+    """
+    Extract variables from notes (see `extract.extract_variables`) and write them directly to a csv table
+        (see `build_table.build_table`).
+    :param timeout: wall-clock budget (in seconds) for each note; notes which exceed it (or raise an exception)
+        are written to `eye_extractor_{timestamp}_quarantine.jsonl` in `outdir` rather than the table
+    :param write_jsonl: also write extracted variables to `eye_extractor_{timestamp}.jsonl` in `outdir`
+    :return: path to output csv file
+    """
+    if outdir is None:
+        outdir = pathlib.Path('out')
+    outdir.mkdir(parents=True, exist_ok=True)
+    start_time = datetime.datetime.now()
+    logger.remove()
+    # enqueue: sinks must be multiprocess-safe when workers also log
+    logger.add(outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}.log', level='DEBUG', enqueue=workers > 1)
+    logger.add(sys.stderr, level='INFO', enqueue=workers > 1)
+    for col in add_columns or []:
+        OUTPUT_COLUMNS[col] = []
+    records = read_from_params(*directories or tuple(), filelist=filelist, packed=packed,
+                               search_missing_headers=search_missing_headers, prefetch=prefetch)
+    rows = imap_ordered(functools.partial(_extract_row, date_column=date_column, add_columns=add_columns,
+                                          write_jsonl=write_jsonl, timeout=timeout),
+                        records, workers=workers)
+    outpath = outdir / f'variables_eye_extractor_{start_time:%Y%m%d_%H%M%S}.csv'
+    jsonl_path = outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}.jsonl'
+    quarantine = QuarantineWriter(outdir / f'eye_extractor_{start_time:%Y%m%d_%H%M%S}_quarantine.jsonl')
+    jsonl_out = open(jsonl_path, 'w', encoding='utf8') if write_jsonl else contextlib.nullcontext()
+    with open(outpath, 'w', encoding='utf8', newline='') as out, jsonl_out, quarantine:
+        writer = csv.DictWriter(out, fieldnames=OUTPUT_COLUMNS.keys())
+        writer.writeheader()
+        for file, line, row, quarantined in rows:
+            if quarantined is not None:
+                quarantine.write(quarantined)
+                continue
+            if write_jsonl:
+                jsonl_out.write(line)
+            writer.writerow(row)
+    if quarantine.count:
+        logger.warning(f'Quarantined {quarantine.count:,} notes: see {quarantine.path}.')
+    duration = datetime.datetime.now() - start_time
+    logger.info(f'Total run time: {duration}')
+    return outpath
+
+
+def _extract_row(record, *, date_column='note_date', add_columns=None, write_jsonl=False, timeout=None):
+    """
+    Extract a (file, text, data, sections) record into (file, jsonl line, csv row, quarantine record);
+        module-level for use by worker processes
+
+    The jsonl line is None unless `write_jsonl`; if the note exceeds `timeout` seconds or raises an exception,
+        the line and row are None and the quarantine record describes the failure.
+    """
+    file, text, data, sections = record
+    for col in add_columns or []:  # if worker process did not inherit these
+        OUTPUT_COLUMNS[col] = []
+    profile = ExtractionProfile()  # report slowest algorithms of quarantined notes
+    line = None
+    try:
+        with note_budget(timeout):
+            data = extract_variable_from_text(text, data, sections, None, profile=profile)
+            if write_jsonl:
+                line = dumps_json(data) + '\n'
+                data = loads_json(line)
+            else:
+                data = json_round_trip(data)
+            row = build_row_from_data(data, date_column=date_column, add_columns=add_columns)
+    except (Exception, NoteTimeout) as e:
+        logger.opt(exception=not isinstance(e, NoteTimeout)).debug(f'Failed to extract {file}.')
+        return file, None, None, quarantine_record(file, data, e, profile, timeout=timeout)
+    return file, line, row, None
+
+
+if __name__ == '__main__':
+    _extract_and_build_table()
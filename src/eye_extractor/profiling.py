@@ -0,0 +1,316 @@
+"""
+Opt-in profiling of extraction: wall time, number of calls, regex matches and emitted variables
+    for each algorithm (see `extract.ALGORITHMS`) and each of the extractors it runs.
+
+* `install` wraps the extractors imported into the algorithm modules (i.e., those taking `doc` or `text`)
+    and module-level compiled patterns; this adds overhead, so is only done when profiling is requested.
+* Measurements are inclusive: an algorithm's time and regex matches include those of its extractors.
+* Regex matches are only counted for compiled patterns defined at module level (including those in
+    module-level lists, tuples, dicts and pattern batteries), not for patterns compiled within functions
+    or bound as default arguments.
+"""
+import contextlib
+import csv
+import functools
+import importlib
+import inspect
+import re
+import sys
+import time
+
+from eye_extractor.nlp.pattern_battery import PatternBattery
+
+# modules which run the extractors for each of `ALGORITHMS`
+ALGORITHM_MODULES = [
+    'eye_extractor.extract',
+    'eye_extractor.common.algo.extract',
+    'eye_extractor.amd.algorithm',
+    'eye_extractor.cataract.algorithm',
+    'eye_extractor.glaucoma.algorithm',
+    'eye_extractor.ro.algorithm',
+    'eye_extractor.uveitis.algorithm',
+    'eye_extractor.exam.algorithm',
+    'eye_extractor.dr.diabetic_retinopathy',
+]
+EXTRACTOR_PARAMETERS = {'doc', 'text'}  # first parameter of functions which are profiled as extractors
+
+REPORT_COLUMNS = ['extractor', 'calls', 'seconds', 'ms_per_call', 'matches', 'variables']
+
+_ACTIVE = []  # stats of extractors currently running (outermost first)
+_PROFILE = None  # profile currently being recorded
+_INSTALLED = []  # (namespace, key, original value) to restore on `uninstall`
+
+
+class ExtractorStats:
+    __slots__ = ('calls', 'seconds', 'matches', 'variables')
+
+    def __init__(self, calls=0, seconds=0.0, matches=0, variables=0):
+        self.calls = calls
+        self.seconds = seconds
+        self.matches = matches
+        self.variables = variables
+
+    def update(self, other: 'ExtractorStats'):
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.matches += other.matches
+        self.variables += other.variables
+
+    def __eq__(self, other):
+        return (self.calls, self.seconds, self.matches, self.variables) == (
+            other.calls, other.seconds, other.matches, other.variables
+        )
+
+    def __repr__(self):
+        return (f'ExtractorStats(calls={self.calls}, seconds={self.seconds:.6f},'
+                f' matches={self.matches}, variables={self.variables})')
+
+
+class ExtractionProfile:
+    """Statistics by extractor name, for one note or (after `update`) for a corpus"""
+
+    def __init__(self):
+        self.stats: dict[str, ExtractorStats] = {}
+        self.interrupted = None  # innermost extractor running when an exception was raised
+
+    def __getitem__(self, name) -> ExtractorStats:
+        return self.stats[name]
+
+    def __contains__(self, name):
+        return name in self.stats
+
+    @contextlib.contextmanager
+    def measure(self, name, data: dict = None):
+        """
+        Record a call to `name` running the enclosed block.
+
+        :param data: if specified, count variables added to (or replaced in) `data` within the block
+        """
+        global _PROFILE
+        stats = self.stats.setdefault(name, ExtractorStats())
+        before = dict(data) if data is not None else None
+        prev_profile, _PROFILE = _PROFILE, self
+        _ACTIVE.append(stats)
+        start = time.perf_counter()
+        try:
+            yield stats
+        except GeneratorExit:
+            raise
+        except BaseException:
+            if self.interrupted is None:
+                self.interrupted = name
+            raise
+        finally:
+            stats.seconds += time.perf_counter() - start
+            stats.calls += 1
+            _ACTIVE.pop()
+            _PROFILE = prev_profile
+        if data is not None:
+            stats.variables += sum(count_variables(value) for key, value in data.items()
+                                   if value is not before.get(key))
+
+    def update(self, other: 'ExtractionProfile'):
+        for name, stats in other.stats.items():
+            self.stats.setdefault(name, ExtractorStats()).update(stats)
+
+    def iter_rows(self):
+        """Report rows, slowest first"""
+        for name, stats in sorted(self.stats.items(), key=lambda x: -x[1].seconds):
+            yield {
+                'extractor': name,
+                'calls': stats.calls,
+                'seconds': round(stats.seconds, 6),
+                'ms_per_call': round(stats.seconds * 1000 / stats.calls, 3) if stats.calls else 0,
+                'matches': stats.matches,
+                'variables': stats.variables,
+            }
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf8') as out:
+            writer = csv.DictWriter(out, fieldnames=REPORT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.iter_rows())
+
+
+def measure(profile: ExtractionProfile | None, name, data: dict = None):
+    """Measure enclosed block if profiling, see `ExtractionProfile.measure`"""
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.measure(name, data)
+
+
+def count_variables(value):
+    """Number of variables in extractor output: items in lists, summed over dict values"""
+    if value is None:
+        return 0
+    elif isinstance(value, dict):
+        return sum(count_variables(v) for v in value.values())
+    elif isinstance(value, (list, tuple)):
+        return len(value)
+    return 1
+
+
+def _count_matches(n):
+    for stats in _ACTIVE:
+        stats.matches += n
+
+
+class _CountingPattern:
+    """Compiled pattern which counts its matches for the running extractors"""
+    __slots__ = ('_pattern',)
+
+    def __init__(self, pattern: re.Pattern):
+        self._pattern = pattern
+
+    @property
+    def __class__(self):
+        # appear to be a compiled pattern, so it is accepted by, e.g., `re.sub`
+        return re.Pattern
+
+    def __getattr__(self, item):
+        return getattr(self._pattern, item)
+
+    def __eq__(self, other):
+        return self._pattern == (other._pattern if type(other) is _CountingPattern else other)
+
+    def __hash__(self):
+        return hash(self._pattern)
+
+    def __repr__(self):
+        return repr(self._pattern)
+
+    def search(self, *args, **kwargs):
+        m = self._pattern.search(*args, **kwargs)
+        if m is not None:
+            _count_matches(1)
+        return m
+
+    def match(self, *args, **kwargs):
+        m = self._pattern.match(*args, **kwargs)
+        if m is not None:
+            _count_matches(1)
+        return m
+
+    def fullmatch(self, *args, **kwargs):
+        m = self._pattern.fullmatch(*args, **kwargs)
+        if m is not None:
+            _count_matches(1)
+        return m
+
+    def finditer(self, *args, **kwargs):
+        for m in self._pattern.finditer(*args, **kwargs):
+            _count_matches(1)
+            yield m
+
+    def findall(self, *args, **kwargs):
+        result = self._pattern.findall(*args, **kwargs)
+        _count_matches(len(result))
+        return result
+
+    def sub(self, *args, **kwargs):
+        result, n = self._pattern.subn(*args, **kwargs)
+        _count_matches(n)
+        return result
+
+    def subn(self, *args, **kwargs):
+        result, n = self._pattern.subn(*args, **kwargs)
+        _count_matches(n)
+        return result, n
+
+    def split(self, *args, **kwargs):
+        result = self._pattern.split(*args, **kwargs)
+        _count_matches((len(result) - 1) // (self._pattern.groups + 1))
+        return result
+
+
+def _profile_extractor(func):
+    name = f'{func.__module__.removeprefix("eye_extractor.")}.{func.__qualname__}'
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _PROFILE is None:
+                return (yield from func(*args, **kwargs))
+            with _PROFILE.measure(name) as stats:
+                for item in func(*args, **kwargs):
+                    stats.variables += 1
+                    yield item
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _PROFILE is None:
+                return func(*args, **kwargs)
+            with _PROFILE.measure(name) as stats:
+                result = func(*args, **kwargs)
+            stats.variables += count_variables(result)
+            return result
+
+    wrapper.profiled = True
+    return wrapper
+
+
+def _is_extractor(obj, module_name):
+    if not inspect.isfunction(obj) or getattr(obj, 'profiled', False):
+        return False
+    if obj.__module__ == module_name or not obj.__module__.startswith('eye_extractor.'):
+        return False
+    params = list(inspect.signature(obj).parameters)
+    return bool(params) and params[0] in EXTRACTOR_PARAMETERS
+
+
+def _replace(namespace, key, value):
+    _INSTALLED.append((namespace, key, namespace[key]))
+    namespace[key] = value
+
+
+def _walk(obj, convert, depth=3):
+    """Return `obj` with (nested) items converted; lists and dicts are updated in place"""
+    new = convert(obj)
+    if new is not obj or depth == 0:
+        return new
+    if isinstance(obj, list):
+        for i, item in enumerate(obj):
+            new = _walk(item, convert, depth - 1)
+            if new is not item:
+                _replace(obj, i, new)
+    elif isinstance(obj, dict):
+        for key, item in list(obj.items()):
+            new = _walk(item, convert, depth - 1)
+            if new is not item:
+                _replace(obj, key, new)
+    elif isinstance(obj, PatternBattery):
+        _walk(obj.patterns, convert, depth)
+    elif isinstance(obj, tuple):
+        items = [_walk(item, convert, depth - 1) for item in obj]
+        if any(new is not item for new, item in zip(items, obj)):
+            return obj._make(items) if hasattr(obj, '_make') else tuple(items)
+    return obj
+
+
+def _install_in_module(module, convert):
+    namespace = vars(module)
+    for name, value in list(namespace.items()):
+        if name.startswith('__'):
+            continue
+        new = _walk(value, convert)
+        if new is not value:
+            _replace(namespace, name, new)
+
+
+def install():
+    """Wrap extractors and module-level compiled patterns for profiling; does nothing if already installed"""
+    if _INSTALLED:
+        return
+    for module_name in ALGORITHM_MODULES:
+        module = importlib.import_module(module_name)
+        _install_in_module(module, lambda obj: _profile_extractor(obj) if _is_extractor(obj, module_name) else obj)
+    for module_name, module in list(sys.modules.items()):
+        if module_name.startswith('eye_extractor.') and module_name != __name__:
+            _install_in_module(module, lambda obj: _CountingPattern(obj) if type(obj) is re.Pattern else obj)
+
+
+def uninstall():
+    """Restore extractors and patterns replaced by `install`"""
+    while _INSTALLED:
+        namespace, key, value = _INSTALLED.pop()
+        namespace[key] = value
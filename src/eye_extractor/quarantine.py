@@ -0,0 +1,99 @@
+"""
+Per-note wall-clock budgets and quarantine of notes which fail (or exceed their budget) during extraction.
+
+* Budgets use a real-time interval timer (`SIGALRM`), which interrupts even a runaway regex
+    (the regex engine checks for signals while matching). The timer is set in the process running the
+    extraction, so budgets are enforced within worker processes.
+* Where interval timers are unavailable (e.g., Windows) or extraction is not running in the main thread,
+    notes are extracted without a budget.
+* Quarantined notes are not written to the jsonl output; instead, a record with the note's docid, the error
+    (or 'timeout'), the extractor running when it was interrupted and the slowest extractors is written to
+    `eye_extractor_{timestamp}_quarantine.jsonl`.
+"""
+import contextlib
+import json
+import signal
+import threading
+
+from loguru import logger
+
+from eye_extractor.profiling import ExtractionProfile
+
+TIMEOUT = 'timeout'
+SLOWEST_COUNT = 3  # number of slowest extractors to record
+
+
+class NoteTimeout(BaseException):
+    """
+    Note exceeded its budget.
+
+    Derived from `BaseException` (as `KeyboardInterrupt`) so that it is not swallowed by
+        `except Exception` handlers within extractors.
+    """
+
+
+def _raise_timeout(signum, frame):
+    raise NoteTimeout
+
+
+def can_budget():
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+@contextlib.contextmanager
+def note_budget(seconds: float | None):
+    """Raise `NoteTimeout` if the enclosed block runs for more than `seconds` (if specified and supported)"""
+    if not seconds or not can_budget():
+        yield
+        return
+    prev_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, prev_handler)
+
+
+def quarantine_record(file, data: dict, exc: BaseException, profile: ExtractionProfile, timeout=None):
+    """Describe note which failed during extraction (for writing to the quarantine file)"""
+    return {
+        'docid': data.get('note_id') if data else None,
+        'file': str(file),
+        'error': TIMEOUT if isinstance(exc, NoteTimeout) else type(exc).__name__,
+        'message': f'exceeded {timeout}s' if isinstance(exc, NoteTimeout) else str(exc),
+        'extractor': profile.interrupted,
+        'slowest': [
+            {'extractor': row['extractor'], 'seconds': row['seconds']}
+            for row, _ in zip(profile.iter_rows(), range(SLOWEST_COUNT))
+        ],
+    }
+
+
+class QuarantineWriter:
+    """Write quarantine records to jsonl `path`; the file is only created if a note is quarantined"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, record: dict):
+        if self._fh is None:
+            self._fh = open(self.path, 'w', encoding='utf8')
+        self._fh.write(json.dumps(record, default=str) + '\n')
+        self._fh.flush()  # keep record of pathological notes if the run is later interrupted
+        self.count += 1
+        logger.warning(f'Quarantined {record["file"]} (docid: {record["docid"]}):'
+                       f' {record["error"]} in {record["extractor"]}.')
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
@@ -2,15 +2,25 @@
 Model a document text and sections.
 
 * Get different views of text (e.g., full text vs text without history)
+* Cache extractor results so extractors shared between algorithms only run once per document
+* Index trigger terms so extractors can be skipped when none of their terms appear (see `nlp.keywords`)
+* Build indexes of texts (e.g., line dates) once per document (see `nlp.text_index`)
 """
+import collections
+import contextlib
+import copy
 import enum
+import functools
 import re
 
 from eye_extractor.laterality import build_laterality_table, OtherLateralityFunc, get_other_laterality_function, \
-    OtherLateralityName
-from eye_extractor.sections.oct_macula import find_oct_macula_sections, remove_macula_oct
+    OtherLateralityName, LateralityIndex
+from eye_extractor.nlp.keywords import KeywordIndex
+from eye_extractor.nlp.text_index import text_index_scope
+from eye_extractor.sections.oct_macula import find_oct_macula_sections, remove_macula_oct_with_spans
 from eye_extractor.sections.patterns import PATTERNS
 from eye_extractor.sections.section_builder import SectionsBuilder, get_sections_from_dict
+from eye_extractor.sections.utils import compose_spans
 
 
 class TextView(enum.IntEnum):
@@ -31,21 +41,36 @@ class Document:
         """
         self.orig_text = text  # has original char offsets
         self.text = self._clean_text(text, newline_chars=newline_chars)
-        self.lateralities = self._build_laterality_table(self.text)
-        self.sections = self._get_sections(self.text, PATTERNS)
-        if sections:
-            self.sections.add_all(sections)
-        self.oct_macula_sections = find_oct_macula_sections(self.text)
+        self._text_indexes = {}  # see `text_indexes`
+        with self.text_indexes():
+            self.laterality_index = LateralityIndex(self.text)
+            self.lateralities = self.laterality_index()
+            self.sections = self._get_sections(self.text, PATTERNS)
+            if sections:
+                self.sections.add_all(sections)
+            self.oct_macula_sections = find_oct_macula_sections(self.text)
 
         self._text_no_hx = None
+        self._spans_no_hx = None
         self._lat_table_no_hx = None
         self._text_no_oct_macula = None
+        self._spans_no_oct_macula = None
         self._lat_no_oct_macula = None
 
         self._other_lateralities = {}
 
         self._is_cataract_surgery = None
 
+        self._extractor_results = {}
+        self.extractor_cache_hits = collections.Counter()  # extractor name -> number of cached results reused
+        self._keyword_index = None
+
+    @contextlib.contextmanager
+    def text_indexes(self):
+        """Re-use indexes of texts (e.g., `LineDateIndex`) built for this document until exit"""
+        with text_index_scope(self._text_indexes):
+            yield
+
     @property
     def is_cataract_surgery(self):
         if self._is_cataract_surgery is None:
@@ -60,13 +85,20 @@ class Document:
     @property
     def text_no_oct_macula(self):
         if self._text_no_oct_macula is None:
-            self._text_no_oct_macula = remove_macula_oct(self.text_no_hx)
+            self._text_no_oct_macula, spans = remove_macula_oct_with_spans(self.text_no_hx)
+            self._spans_no_oct_macula = compose_spans(self.spans_no_hx, spans)
         return self._text_no_oct_macula
 
+    @property
+    def spans_no_oct_macula(self):
+        if self._spans_no_oct_macula is None:
+            _ = self.text_no_oct_macula
+        return self._spans_no_oct_macula
+
     @property
     def lateralities_no_oct_macula(self):
         if self._lat_no_oct_macula is None:
-            self._lat_no_oct_macula = self._build_laterality_table(self.text_no_oct_macula)
+            self._lat_no_oct_macula = self.laterality_index(self.text_no_oct_macula, spans=self.spans_no_oct_macula)
         return self._lat_no_oct_macula
 
     def get_text(self, *, view: TextView = TextView.NO_HX):
@@ -80,6 +112,18 @@ class Document:
             case _:
                 raise ValueError(f'Unrecognized TextView: {view}.')
 
+    def get_text_spans(self, *, view: TextView = TextView.NO_HX):
+        """Spans (view_start, text_start, length) of the text view which are unchanged from `self.text`"""
+        match view:
+            case TextView.NO_HX:
+                return self.spans_no_hx
+            case TextView.NO_OCT_MACULA:
+                return self.spans_no_oct_macula
+            case TextView.ALL:
+                return [(0, 0, len(self.text))]
+            case _:
+                raise ValueError(f'Unrecognized TextView: {view}.')
+
     def get_lateralities(self, *, view: TextView = TextView.NO_HX):
         match view:
             case TextView.NO_HX:
@@ -100,18 +144,21 @@ class Document:
     @property
     def text_no_hx(self):
         if self._text_no_hx is None:
-            self._text_no_hx = self.sections.replace_history(self.text)
+            self._text_no_hx, self._spans_no_hx = self.sections.replace_history_with_spans(self.text)
         return self._text_no_hx
 
+    @property
+    def spans_no_hx(self):
+        if self._spans_no_hx is None:
+            _ = self.text_no_hx
+        return self._spans_no_hx
+
     @property
     def lateralities_no_hx(self):
         if self._lat_table_no_hx is None:
-            self._lat_table_no_hx = self._build_laterality_table(self.text_no_hx)
+            self._lat_table_no_hx = self.laterality_index(self.text_no_hx, spans=self.spans_no_hx)
         return self._lat_table_no_hx
 
-    def _build_laterality_table(self, text):
-        return build_laterality_table(text)
-
     def _clean_text(self, text, newline_chars=None):
         if newline_chars:
             for newline_char in newline_chars:
@@ -119,7 +166,7 @@ class Document:
         return text
 
     def _get_sections(self, text, patterns):
-        builder = SectionsBuilder(self._build_laterality_table)
+        builder = SectionsBuilder(self.laterality_index)
         for cat, level, pat in patterns:
             for m in pat.finditer(text):
                 if builder.is_major_section(m, text):
@@ -133,6 +180,52 @@ class Document:
     def iter_sections(self, *names):
         yield from self.sections.iter_names(*names)
 
+    @property
+    def keyword_index(self) -> KeywordIndex:
+        """Trigger terms in the text and in any sections not taken from the text (e.g., in testing)"""
+        if self._keyword_index is None:
+            texts = [self.text]
+            for section in self.sections:
+                if section.line_starts is None or any(
+                        self.text[start: start + len(line)] != line
+                        for start, line in zip(section.line_starts, section.lines)
+                ):
+                    texts.append(section.text)
+            self._keyword_index = KeywordIndex('\n'.join(texts))
+        return self._keyword_index
+
+    def has_any_term(self, terms: frozenset[str]) -> bool:
+        """Whether any of the (lowercase) `terms` appear in the document, ignoring case"""
+        return self.keyword_index.has_any(terms)
+
+    def get_cached(self, func, *args, **kwargs):
+        """
+        Run extractor `func(self, *args, **kwargs)` at most once for this document and these arguments.
+
+        Each caller receives its own copy of the cached result, so may modify it
+            (e.g., `extract_fluid` is added to both the common and the AMD variables).
+        """
+        key = (func, args, tuple(kwargs.items()))
+        try:
+            result = self._extractor_results[key]
+        except KeyError:
+            result = self._extractor_results[key] = func(self, *args, **kwargs)
+        except TypeError:  # unhashable arguments: cannot cache
+            return func(self, *args, **kwargs)
+        else:
+            self.extractor_cache_hits[func.__qualname__] += 1
+        return copy.deepcopy(result)
+
+
+def cache_on_document(func):
+    """Decorator for extractors `func(doc, ...)` shared by multiple algorithms; see `Document.get_cached`"""
+
+    @functools.wraps(func)
+    def wrapper(doc: Document, *args, **kwargs):
+        return doc.get_cached(func, *args, **kwargs)
+
+    return wrapper
+
 
 def create_doc_and_sections(text, section_dict: dict | None = None, default_section=None) -> Document:
     doc = Document(text, sections=get_sections_from_dict(section_dict), newline_chars='¶')
@@ -5,7 +5,7 @@ from eye_extractor.nlp.negate.negation import is_post_negated
 from eye_extractor.laterality import LATERALITY_PLUS_COLON_PATTERN, lat_lookup, Laterality, build_laterality_table
 from eye_extractor.nlp.character_groups import get_next_text_to_newline, LINE_START_CHARS_RX
 from eye_extractor.output.variable import has_valid_date
-from eye_extractor.sections.utils import get_index_of_next_section_start
+from eye_extractor.sections.utils import get_index_of_next_section_start, join_pieces
 
 optional_macula = r'(?:\s*macula)?:?'
 
@@ -67,14 +67,19 @@ def find_oct_macula_sections(text, *, restrict_date=None) -> list[dict]:
 
 
 def remove_macula_oct(text):
+    return remove_macula_oct_with_spans(text)[0]
+
+
+def remove_macula_oct_with_spans(text):
+    """Remove OCT macula sections, also returning spans (view_start, text_start, length) of the retained text"""
     result = []
     prev_end = 0
     for m in OCT_MACULA_PAT.finditer(text):
         if is_post_negated(m, text, terms=oct_macula_not_section_keywords):
             continue
         end_index = get_index_of_next_section_start(text, m.end(), max_length=200)
-        result.append(text[prev_end: m.start()])
+        result.append((prev_end, text[prev_end: m.start()]))
         prev_end = end_index
     if prev_end is not None:
-        result.append(text[prev_end:])
-    return ''.join(result)
+        result.append((prev_end, text[prev_end:]))
+    return join_pieces(result)
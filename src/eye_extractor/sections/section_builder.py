@@ -5,7 +5,8 @@ from sortedcontainers import SortedList
 from collections import UserList
 
 from eye_extractor.laterality import Laterality, build_laterality_table, OtherLateralityFunc, \
-    get_other_laterality_function, OtherLateralityName
+    get_other_laterality_function, OtherLateralityName, LateralityIndex
+from eye_extractor.sections.utils import join_pieces
 
 
 class Section:
@@ -16,6 +17,8 @@ class Section:
         self.name_start_idx = name_start_idx
         self.name_end_idx = name_end_idx
         self.lines = [text] if isinstance(text, str) else text
+        # start index of each line in the document text
+        self.line_starts = [text_start_idx] if isinstance(text, str) else None
         self.text_start_idx = text_start_idx
         self.text_end_idx = text_end_idx
         self.known_laterality = None
@@ -45,6 +48,18 @@ class Section:
     def text(self):
         return '\n'.join(self.lines)
 
+    @property
+    def spans(self):
+        """Spans (view_start, doc_start, length) of each line of `text` in the document text"""
+        if self.line_starts is None:
+            return None
+        spans = []
+        view_start = 0
+        for doc_start, line in zip(self.line_starts, self.lines):
+            spans.append((view_start, doc_start, len(line)))
+            view_start += len(line) + 1
+        return spans
+
     @property
     def oneline(self):
         return ' '.join(self.lines)
@@ -70,8 +85,10 @@ class Section:
     def iter_subsections(self):
         if isinstance(self.name, tuple):  # has multiple
             for name in self.name:
-                yield Section(name, self.level, self.lines, self.name_start_idx, self.name_end_idx,
-                              self.text_start_idx, self.text_end_idx)
+                section = Section(name, self.level, self.lines, self.name_start_idx, self.name_end_idx,
+                                  self.text_start_idx, self.text_end_idx)
+                section.line_starts = self.line_starts
+                yield section
         else:
             yield self
 
@@ -99,9 +116,13 @@ class Section:
 
     def add_line(self, line, *, extra_chars=0):
         self.lines.append(line)
+        if self.line_starts is not None:
+            self.line_starts.append(self.text_end_idx + extra_chars)
         self.text_end_idx += len(line) + extra_chars
 
     def build_laterality_table(self, laterality_func, **kwargs):
+        if isinstance(laterality_func, LateralityIndex):
+            kwargs['spans'] = self.spans
         self.lateralities = laterality_func(self.text, **kwargs)
         if 'os' in self.names and 'od' in self.names:
             self.set_default_laterality(Laterality.OU)
@@ -195,15 +216,22 @@ class Sections(UserList):
 
     def replace_type(self, section_type, text, replacement=' '):
         """Replace specified type with empty spaces thereby deleting but keep char offsets"""
+        return self.replace_type_with_spans(section_type, text, replacement=replacement)[0]
+
+    def replace_history_with_spans(self, text):
+        return self.replace_type_with_spans(SectionFunction.history, text)
+
+    def replace_type_with_spans(self, section_type, text, replacement=' '):
+        """As `replace_type`, but also return spans (view_start, text_start, length) of the retained text"""
         result = []
         prev = 0
         for section in self:
             if section_type(section):
-                result.append(text[prev:section.start])
-                result.append(replacement * len(section))
+                result.append((prev, text[prev:section.start]))
+                result.append((None, replacement * len(section)))
                 prev = section.end
-        result.append(text[prev:])
-        return ''.join(result)
+        result.append((prev, text[prev:]))
+        return join_pieces(result)
 
     def __str__(self):
         return '\n'.join(f'* {section}' for section in self.data)
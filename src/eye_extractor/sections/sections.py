@@ -5,6 +5,7 @@ import re
 from collections import namedtuple
 
 from eye_extractor.laterality import LATERALITY_PATTERN, LATERALITY, Laterality, add_laterality_to_variable
+from eye_extractor.nlp.pattern_battery import PatternBattery
 from eye_extractor.patterns import PATTERN_BATTERY, PATTERN_RESPONSE
 
 SECTION_PATTERN = re.compile(
@@ -19,6 +20,13 @@ SECTION_PATTERN = re.compile(
 
 Item = namedtuple('Item', 'label term start end is_label')
 
+# (label, is_label) -> pattern; laterality labels are found from the match
+ITEM_BATTERY = PatternBattery(
+    [((label, True), pattern) for label, pattern in PATTERN_BATTERY]
+    + [((label, False), pattern) for label, pattern in PATTERN_RESPONSE]
+    + [((None, False), LATERALITY_PATTERN)]
+)
+
 
 def get_value_from_item(item: Item, term: str, section: str):
     if item.label in ('yes', 'no'):
@@ -77,15 +85,10 @@ def parse_sections(text):
                 continue
             for section in re.split(r'[\W]\d+[).-]', section_text):
                 terms = []
-                for label, pattern in PATTERN_BATTERY:
-                    for m2 in pattern.finditer(section):
-                        terms.append(Item(label, m2.group(), m2.start(), m2.end(), True))
-                for label, pattern in PATTERN_RESPONSE:
-                    for m2 in pattern.finditer(section):
-                        terms.append(Item(label, m2.group(), m2.start(), m2.end(), False))
-                for m2 in LATERALITY_PATTERN.finditer(section):
-                    terms.append(Item(LATERALITY[m2.group().upper()], m2.group(), m2.start(), m2.end(), False))
-                terms = sorted(terms, key=lambda x: x[2])  # sort by start index
+                for (label, is_label), m2 in ITEM_BATTERY.iter_by_start(section):
+                    if label is None:
+                        label = LATERALITY[m2.group().upper()]
+                    terms.append(Item(label, m2.group(), m2.start(), m2.end(), is_label))
                 if len(terms) == 1:  # handle where only one element
                     term = terms[0]
                     if term.is_label:
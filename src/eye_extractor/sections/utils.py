@@ -34,3 +34,40 @@ def get_index_of_next_section_start(text, start_index, *, max_length=None,
         else:
             return m.start()  # return start of entire pattern; already includes start_index
     return len(text)
+
+
+def join_pieces(pieces) -> tuple[str, list[tuple[int, int, int]]]:
+    """
+    Join pieces of text into a view of a document, tracking where each piece came from.
+
+    :param pieces: iterable of (doc_start, text); doc_start is None if `text` is not from the document
+    :return: (view text, spans as list of (view_start, doc_start, length))
+    """
+    result = []
+    spans = []
+    view_start = 0
+    for doc_start, piece in pieces:
+        if doc_start is not None and piece:
+            spans.append((view_start, doc_start, len(piece)))
+        result.append(piece)
+        view_start += len(piece)
+    return ''.join(result), spans
+
+
+def compose_spans(outer_spans, inner_spans):
+    """
+    Map spans of a view of a view back onto the original document.
+
+    :param outer_spans: spans (view_start, doc_start, length) of the intermediate view in the document
+    :param inner_spans: spans (view_start, doc_start, length) of the final view in the intermediate view
+    :return: spans of the final view in the document
+    """
+    result = []
+    for view_start, mid_start, length in inner_spans:
+        mid_end = mid_start + length
+        for outer_view_start, doc_start, outer_length in outer_spans:
+            start = max(mid_start, outer_view_start)
+            end = min(mid_end, outer_view_start + outer_length)
+            if start < end:
+                result.append((view_start + start - mid_start, doc_start + start - outer_view_start, end - start))
+    return result
@@ -0,0 +1,116 @@
+"""
+Write extraction output to rotating jsonl shards with a checkpoint manifest so long runs can be resumed.
+
+* A shard is only recorded in the manifest once it has been closed, so a shard left partially written
+    by a crash is overwritten when the run is resumed.
+* The manifest records, for each input source (directory or filelist), the number of completed notes
+    and the last completed file. Resuming skips that many notes (files in a directory are read in sorted
+    order), so it assumes the input sources have not changed.
+"""
+import json
+import pathlib
+
+from loguru import logger
+
+CHECKPOINT_FILENAME = 'eye_extractor_checkpoint.json'
+
+
+def load_checkpoint(outdir: pathlib.Path):
+    """Read checkpoint manifest from `outdir`; returns None if no manifest exists."""
+    path = outdir / CHECKPOINT_FILENAME
+    if not path.exists():
+        return None
+    with open(path, encoding='utf8') as fh:
+        return json.load(fh)
+
+
+def get_skip_counts(checkpoint):
+    """Number of completed notes per input source, for use as `skip` in `corpusio.read_from_params`"""
+    if not checkpoint:
+        return {}
+    return {source: info['count'] for source, info in checkpoint['sources'].items()}
+
+
+class ShardedJsonlWriter:
+    """
+    Write jsonl lines to `{name}_{shard:05d}.jsonl` in `outdir`, starting a new shard every `shard_size` lines.
+
+    Use as a context manager: the final shard is closed and checkpointed on exit.
+    """
+
+    def __init__(self, outdir: pathlib.Path, name: str, shard_size: int, checkpoint: dict = None):
+        if shard_size < 1:
+            raise ValueError(f'Shard size must be positive: {shard_size}')
+        self.outdir = outdir
+        self.shard_size = shard_size
+        if checkpoint:
+            self.name = checkpoint['name']
+            self.shards = list(checkpoint['shards'])
+            self.sources = {source: dict(info) for source, info in checkpoint['sources'].items()}
+            logger.info(f'Resuming {self.name} after {len(self.shards)} shards.')
+        else:
+            self.name = name
+            self.shards = []
+            self.sources = {}
+        self._fh = None
+        self._count = 0
+        self._skipped = False  # skipped files not yet checkpointed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def checkpoint_path(self):
+        return self.outdir / CHECKPOINT_FILENAME
+
+    @property
+    def current_shard(self):
+        return f'{self.name}_{len(self.shards):05d}.jsonl'
+
+    def write(self, line: str, source: str, file):
+        """Write single jsonl `line` extracted from `file` in input `source`"""
+        if self._fh is None:
+            self._fh = open(self.outdir / self.current_shard, 'w', encoding='utf8')
+        self._fh.write(line)
+        self._count += 1
+        self._complete(source, file)
+        if self._count >= self.shard_size:
+            self.close()
+
+    def skip(self, source: str, file):
+        """Record `file` in input `source` as completed without writing a line (e.g., it was quarantined)"""
+        self._complete(source, file)
+        self._skipped = True
+
+    def _complete(self, source: str, file):
+        info = self.sources.setdefault(source, {'count': 0, 'last_file': None})
+        info['count'] += 1
+        info['last_file'] = str(file)
+
+    def close(self):
+        """Close current shard (if any) and record it in the checkpoint manifest"""
+        if self._fh is None:
+            if self._skipped:
+                self.write_checkpoint()
+            return
+        self._fh.close()
+        self._fh = None
+        self.shards.append(self.current_shard)
+        logger.info(f'Completed shard {self.shards[-1]} ({self._count:,} records).')
+        self._count = 0
+        self.write_checkpoint()
+
+    def write_checkpoint(self):
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf8') as out:
+            json.dump({
+                'name': self.name,
+                'shard_size': self.shard_size,
+                'shards': self.shards,
+                'sources': self.sources,
+            }, out, indent=2)
+        tmp_path.replace(self.checkpoint_path)
+        self._skipped = False
@@ -1,5 +1,7 @@
 """
 Script to extract and build only those files specified on the command line.
+
+To extract and build a corpus (writing a csv table), see `eye_extractor.pipeline`.
 """
 import datetime
 import json
@@ -23,7 +25,7 @@ def extract_and_build(files: tuple[Path], outdir=None, date_column='note_date',
         outdir = Path('.')
     for file in files:
         _, text, data, sections = read_file(file, file.parent)
-        result = extract_variable_from_text(text, data, sections)
+        result = extract_variable_from_text(text, data, sections, None)
         with open(outdir / f'{file.stem}_{get_dt()}.extract.json', 'w') as fh:
             json.dump(result, fh, indent=2)
         result = process_data(result, add_columns=add_columns, date_column=date_column)
@@ -0,0 +1,41 @@
+"""
+Convert notes in directories (or listed in a filelist) to a packed corpus (see `eye_extractor.corpuspack`).
+
+Usage:
+    eyex-pack-corpus /path/to/corpus.eyepack /path/to/notes/ [/path/to/more/notes/]
+    eyex-pack-corpus /path/to/corpus.eyepack --filelist /path/to/filelist.txt
+
+Then extract with:
+    python src/eye_extractor/extract.py --packed /path/to/corpus.eyepack
+"""
+import itertools
+import pathlib
+
+import click
+from loguru import logger
+
+from eye_extractor.corpuspack import iter_note_files, write_packed_corpus
+
+
+def iter_files(*directories: pathlib.Path, filelist: pathlib.Path = None):
+    """`*.txt` files in the same order as `corpusio.read_from_params`"""
+    if filelist is not None:
+        with open(filelist) as fh:
+            for line in fh:
+                yield pathlib.Path(line.strip())
+    else:
+        yield from itertools.chain.from_iterable(sorted(directory.glob('*.txt')) for directory in directories)
+
+
+@click.command()
+@click.argument('outfile', type=click.Path(dir_okay=False, path_type=pathlib.Path))
+@click.argument('directories', nargs=-1, type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path))
+@click.option('--filelist', type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), default=None)
+def pack_corpus(outfile: pathlib.Path, directories: tuple[pathlib.Path], filelist: pathlib.Path = None):
+    """Write text, metadata and section data of notes in `directories` (or `filelist`) to `outfile`"""
+    count = write_packed_corpus(outfile, iter_note_files(iter_files(*directories, filelist=filelist)))
+    logger.info(f'Packed {count:,} notes to {outfile}.')
+
+
+if __name__ == '__main__':
+    pack_corpus()
@@ -1,7 +1,17 @@
 """
 Search jsonl files to retrieve intermediate representations for an document/note id.
 
-On the first run, `search_jsonl.py` will build the appropriate indexes which will take some time.
+On the first run, `search_jsonl.py` will build the appropriate indexes which will take some time;
+    subsequent runs only index jsonl files which are new or have changed.
+
+* The index (sqlite, in `.index` within the jsonl directory) stores the byte offset of each note's line,
+    so a lookup is a single seek and read.
+* When building the index, `note_id` is read from each line without decoding the whole line if it is the
+    first key (as written by `extract`, with metadata first); otherwise, the line is decoded.
+* Indexes built by earlier versions (which stored line numbers) are rebuilt.
+* Each time the index is opened, new jsonl files (e.g., from a continuing extraction) are indexed, and
+    changed files (identified by size and modification time) are re-indexed.
+* Only complete lines are indexed: a last line still being written is indexed once it is complete.
 
 Usage:
     python src/tools/search_jsonl.py /path/to/dir/with/jsonl/files/ docid
@@ -10,10 +20,16 @@ Usage:
 import datetime
 import json
 import pathlib
+import re
 import sqlite3
 
 import click
 
+INDEX_VERSION = 3  # increment when the schema (or how note_id is read) changes to rebuild existing indexes
+BATCH_SIZE = 10_000  # rows per insert
+READ_SIZE = 1 << 16  # bytes read at a time when looking for the last complete line
+NOTE_ID_PAT = re.compile(rb'\{\s*"note_id": ("(?:[^"\\]|\\.)*"|[^,}\s]+)')  # first (top-level) key
+
 
 def load_date_hook(d):
     if 'date' in d:
@@ -24,6 +40,51 @@ def load_date_hook(d):
     return d
 
 
+def get_note_id(line: bytes):
+    """Read `note_id` from jsonl line (as written by `extract`) without decoding the whole line"""
+    if m := NOTE_ID_PAT.match(line):
+        note_id = json.loads(m.group(1))
+    else:  # e.g., not the first key or different separators
+        note_id = json.loads(line)['note_id']
+    return str(note_id)
+
+
+def get_fingerprint(file: pathlib.Path):
+    """
+    (length, modification time) of `file`, to identify jsonl files changed since they were indexed;
+        length is up to the end of the last complete line, so a line still being written is indexed
+        (and the file re-indexed) once it is complete
+    """
+    stat = file.stat()
+    with open(file, 'rb') as fh:
+        end = stat.st_size
+        while end > 0:
+            start = max(0, end - READ_SIZE)
+            fh.seek(start)
+            if (i := fh.read(end - start).rfind(b'\n')) >= 0:
+                return start + i + 1, stat.st_mtime_ns
+            end = start
+    return 0, stat.st_mtime_ns
+
+
+def iter_lines(file, length):
+    """Generate (line, byte offset) for each non-empty line in the first `length` bytes of jsonl `file`"""
+    offset = 0
+    with open(file, 'rb') as fh:
+        for line in fh:
+            if offset + len(line) > length:  # incomplete (or written since `length` was read)
+                break
+            if line.strip():
+                yield line, offset
+            offset += len(line)
+
+
+def iter_offsets(file, length):
+    """Generate (note_id, byte offset) for each line in the first `length` bytes of jsonl `file`"""
+    for line, offset in iter_lines(file, length):
+        yield get_note_id(line), offset
+
+
 class JsonlSearcher:
     def __init__(self, path, build_new_index_files=False):
         self.conn = None
@@ -31,12 +92,9 @@ class JsonlSearcher:
         self.dest_path = self.path / '.index'
         self.idx_path = self.dest_path / 'jsonl.idx'
         self.kind = 1 if build_new_index_files else 0
-        if self.dest_path.exists():
-            self.reconnect()
-        else:
-            self.dest_path.mkdir()
-            self.reconnect()
-            self.populate()
+        self.dest_path.mkdir(exist_ok=True)
+        self.reconnect()
+        self.populate()
 
     def __del__(self):
         self.close()
@@ -50,73 +108,133 @@ class JsonlSearcher:
     def close(self):
         if self.conn is not None:
             self.conn.close()
+            self.conn = None
 
     def reconnect(self):
+        """Connect to index, dropping any index built by an earlier version"""
         self.conn = sqlite3.connect(self.idx_path)
-        self.cur.execute('create table if not exists LOOKUP (docid TEXT, jsonl_file TEXT, line_number INT, kind INT);')
+        if self.conn.execute('pragma user_version').fetchone()[0] != INDEX_VERSION:
+            self.cur.execute('drop table if exists LOOKUP;')
+            self.cur.execute('drop table if exists FILES;')
+            self.conn.execute(f'pragma user_version = {INDEX_VERSION}')
+        self.cur.execute('create table if not exists LOOKUP (docid TEXT, jsonl_file TEXT, offset INT, kind INT);')
+        self.cur.execute('create index if not exists LOOKUP_DOCID on LOOKUP (docid);')
+        self.cur.execute('create index if not exists LOOKUP_FILE on LOOKUP (jsonl_file);')
+        # indexed jsonl files (in `path`) with fingerprint when indexed
+        self.cur.execute('create table if not exists FILES'
+                         ' (jsonl_file TEXT PRIMARY KEY, size INT, mtime_ns INT, kind INT);')
 
     @property
     def cur(self):
         return self.conn.cursor()
 
     def populate(self):
+        """
+        Index new or changed (by size or modification time) jsonl files, and remove those no longer present.
+
+        With `build_new_index_files`, new jsonl files are copied into new index files; if an indexed file was
+            changed or removed, all index files are rebuilt.
+        """
+        files = {file.name: file for file in self.path.glob('*.jsonl')}
+        fingerprints = {name: get_fingerprint(file) for name, file in files.items()}
+        indexed = {name: ((size, mtime_ns), kind) for name, size, mtime_ns, kind in
+                   self.cur.execute('select jsonl_file, size, mtime_ns, kind from FILES')}
+        if any(kind != self.kind for _, kind in indexed.values()):
+            self._clear()
+            indexed = {}
+        changed = [name for name in files if name not in indexed or indexed[name][0] != fingerprints[name]]
+        removed = [name for name in indexed if name not in files]
+        if not changed and not removed:
+            return
+        cur = self.cur
         if self.kind == 1:
-            self._populate_new_index_files()
+            if removed or any(name in indexed for name in changed):
+                self._clear()
+                changed = list(files)
+            self._populate_new_index_files([(files[name], fingerprints[name][0]) for name in changed])
         else:
-            self._populate()
+            for name in changed + removed:
+                cur.execute('delete from LOOKUP where jsonl_file = ?', (name,))
+                cur.execute('delete from FILES where jsonl_file = ?', (name,))
+            self._populate([(files[name], fingerprints[name][0]) for name in changed])
+        cur.executemany('insert into FILES (jsonl_file, size, mtime_ns, kind) values (?, ?, ?, ?)',
+                        [(name, *fingerprints[name], self.kind) for name in changed])
         self.conn.commit()
+        print(f'Indexed {len(changed):,} new or changed jsonl files; removed {len(removed):,} jsonl files.')
 
-    def _insert(self, cur, docid, filestem, line, kind):
-        cur.execute(
-            f'insert into LOOKUP (docid, jsonl_file, line_number, kind)'
-            f' values ("{docid}", "{filestem}.jsonl", {line}, {kind})'
-        )
-
-    def _populate(self):
+    def _clear(self):
+        """Remove all indexed files (committed before index files are removed, so a rebuild is not left half-done)"""
         cur = self.cur
+        cur.execute('delete from LOOKUP')
+        cur.execute('delete from FILES')
+        self.conn.commit()
+        for file in self.dest_path.glob('*.jsonl'):
+            file.unlink()
+
+    def _insert(self, cur, rows):
+        """Insert (docid, jsonl_file, offset, kind) rows in batches of `BATCH_SIZE`"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                cur.executemany('insert into LOOKUP (docid, jsonl_file, offset, kind) values (?, ?, ?, ?)', batch)
+                batch = []
+        if batch:
+            cur.executemany('insert into LOOKUP (docid, jsonl_file, offset, kind) values (?, ?, ?, ?)', batch)
+
+    def _populate(self, files):
+        """Index (jsonl file, length) pairs in `files`"""
         kind = 0
-        for file in self.path.glob('*.jsonl'):
-            with open(file, encoding='utf8') as fh:
-                for i, line in enumerate(fh):
-                    data = json.loads(line, object_hook=load_date_hook)
-                    docid = data['note_id']
-                    self._insert(cur, docid, file.stem, i, kind)
-
-    def _populate_new_index_files(self):
-        cur = self.cur
+        self._insert(self.cur, (
+            (docid, file.name, offset, kind)
+            for file, length in files
+            for docid, offset in iter_offsets(file, length)
+        ))
+
+    def _populate_new_index_files(self, files):
+        self._insert(self.cur, self._iter_new_index_files(files))
+
+    def _iter_new_index_files(self, files):
+        """
+        Copy lines of (jsonl file, length) pairs in `files` into new jsonl files of 10,000 lines in `dest_path`
+            (following any existing index files), generating rows to insert
+        """
         kind = 1
         count = 0
-        curr_json_file = 0
-        out = open(self.dest_path / f'{curr_json_file}.jsonl', 'w', encoding='utf8')
-        for file in self.path.glob('*.jsonl'):
-            with open(file, encoding='utf8') as fh:
-                for i, line in enumerate(fh):
-                    data = json.loads(line, object_hook=load_date_hook)
-                    docid = data['note_id']
-                    self._insert(cur, docid, curr_json_file, count, kind)
-                    count += 1
-                    out.write(line)
-                    if count % 10000 == 0:
-                        curr_json_file += 1
-                        out = open(self.dest_path / f'{curr_json_file}.jsonl', 'w', encoding='utf8')
+        last_json_file = self.cur.execute(
+            "select max(cast(replace(jsonl_file, '.jsonl', '') as INT)) from LOOKUP where kind = 1"
+        ).fetchone()[0]
+        curr_json_file = 0 if last_json_file is None else last_json_file + 1
+        out = open(self.dest_path / f'{curr_json_file}.jsonl', 'wb')
+        offset = 0
+        for file, length in files:
+            for line, _ in iter_lines(file, length):
+                yield get_note_id(line), f'{curr_json_file}.jsonl', offset, kind
+                count += 1
+                out.write(line)
+                offset += len(line)
+                if count % 10000 == 0:
+                    out.close()
+                    curr_json_file += 1
+                    out = open(self.dest_path / f'{curr_json_file}.jsonl', 'wb')
+                    offset = 0
+        out.close()
 
     # retrieve
     def lookup(self, docid, write=False):
-        i = -1
-        for i, (jsonl_file, line_num, kind) in enumerate(self.cur.execute(
-                f'select jsonl_file, line_number, kind from LOOKUP where docid = "{docid}"'
-        )):
+        for jsonl_file, offset, kind in self.cur.execute(
+                'select jsonl_file, offset, kind from LOOKUP where docid = ?', (str(docid),)
+        ):
             path = self.path if kind == 0 else self.dest_path
-            with open(path / jsonl_file, encoding='utf8') as fh:
-                for i, line in enumerate(fh):
-                    if i != line_num:
-                        continue
-                    data = json.dumps(json.loads(line, object_hook=load_date_hook), default=str, indent=2)
-                    if write:
-                        with open(f'{docid}.json', 'w', encoding='utf8') as out:
-                            out.write(data)
-                    return data
-        print(f'Processed {i + 1:,} records with note id: {docid}.')
+            with open(path / jsonl_file, 'rb') as fh:
+                fh.seek(offset)
+                line = fh.readline()
+            data = json.dumps(json.loads(line, object_hook=load_date_hook), default=str, indent=2)
+            if write:
+                with open(f'{docid}.json', 'w', encoding='utf8') as out:
+                    out.write(data)
+            return data
+        print(f'No records found with note id: {docid}.')
 
 
 @click.command()
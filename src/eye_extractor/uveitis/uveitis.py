@@ -1,5 +1,6 @@
 import re
 
+from eye_extractor.nlp.keywords import requires_terms
 from eye_extractor.nlp.negate.negation import is_negated, is_post_negated
 from eye_extractor.nlp.negate.historical import HISTORY_WORDS
 from eye_extractor.laterality import create_new_variable
@@ -34,6 +35,7 @@ UVEITIS_PAT = re.compile(
 )
 
 
+@requires_terms('uveitis', 'scleritis', 'iridocyclitis', 'iritis', patterns=[UVEITIS_PAT, ALL_UVEITIS_PAT])
 def get_uveitis(doc: Document):
     data = []
     text = doc.get_text()
@@ -11,6 +11,7 @@ from typing import Generator
 from loguru import logger
 
 from eye_extractor.laterality import Laterality, LATERALITY_PATTERN, lat_lookup
+from eye_extractor.nlp.pattern_battery import PatternBattery
 from eye_extractor.va.pattern import VA_LINE_CC, VA_LINE_SC, VA_LINE_GROUPED, VA_LINE_SC_CC, VA_LINE_SC_OD, \
     VA_LINE_SC_OS
 
@@ -213,19 +214,24 @@ def get_number_correct(sign, diopter):
     return ''
 
 
+# metadata -> pattern; each pattern is searched for after removing matches of the previous patterns
+VA_LINE_BATTERY = PatternBattery([
+    (va_pat.metadata, va_pat.pattern) for va_pat in (
+        VA_LINE_GROUPED,
+        VA_LINE_SC_CC,
+        VA_LINE_CC,
+        VA_LINE_SC,
+        VA_LINE_SC_OD,
+        VA_LINE_SC_OS,
+    )
+])
+
+
 def extract_va_precise(text: str) -> tuple[list, str]:
     rows = []
-    for va_pat in (
-            VA_LINE_GROUPED,
-            VA_LINE_SC_CC,
-            VA_LINE_CC,
-            VA_LINE_SC,
-            VA_LINE_SC_OD,
-            VA_LINE_SC_OS,
-    ):
-        for m in va_pat.pattern.finditer(text):
-            rows += get_elements_from_line(m, va_pat.metadata)
-        text = va_pat.pattern.sub(' ', text)
+    matches, text = VA_LINE_BATTERY.sub(' ', text)
+    for metadata, m in matches:
+        rows += get_elements_from_line(m, metadata)
     return rows, text
 
 
@@ -0,0 +1,61 @@
+import datetime
+import enum
+import json
+
+import pytest
+
+from eye_extractor.common.json import dumps_and_loads_json, json_round_trip, loads_json, loads_json_keys
+from eye_extractor.extract import extract_all
+from eye_extractor.laterality import Laterality
+
+
+class Label(enum.StrEnum):
+    A = 'a'
+
+
+def _assert_identical(a, b):
+    assert type(a) is type(b)
+    if isinstance(a, dict):
+        assert list(a) == list(b)
+        for key in a:
+            _assert_identical(a[key], b[key])
+    elif isinstance(a, list):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_identical(x, y)
+    else:
+        assert a == b
+
+
+@pytest.mark.parametrize('data', [
+    {'value': Laterality.OD, 'label': Label.A, 'flag': True, 'score': 1.5, 'none': None},
+    {'items': ({'date': datetime.datetime(2022, 2, 22, 10, 30)}, {'date': '2021-01-01 00:00:00'})},
+    {'date': 'not a date', 'other_date': datetime.date(2022, 2, 22)},
+    {1: 'int', Laterality.OS: 'enum', True: 'bool', None: 'none', 2.5: 'float', '1': 'duplicate'},
+    {'set': {1}, 'nested': [[1, (2, 3)], {}]},
+])
+def test_json_round_trip(data):
+    _assert_identical(json_round_trip(data), dumps_and_loads_json(data))
+
+
+def test_json_round_trip_extracted():
+    data = extract_all('ASSESSMENT: Dry AMD OU. Intermediate drusen od. s/p aflibercept OS 2/22/2022. IOP: 15/17',
+                       data={'note_id': 1, 'note_date': '2022-02-22 00:00:00'})
+    _assert_identical(json_round_trip(data), dumps_and_loads_json(data))
+
+
+@pytest.mark.parametrize('line', [
+    '{"note": {"date": "2022-02-22 00:00:00"}, "dr": [{"a": "[}\\"]"}], "date": "2021-01-01 00:00:00"}',
+    ' { "amd" : [1, {"x": null}] , "note" : "x\\u00e9" , "iop": true } ',
+    '{}',
+])
+@pytest.mark.parametrize('keys', [{'note', 'date'}, {'amd', 'iop'}, set()])
+def test_loads_json_keys(line, keys):
+    expected = {key: value for key, value in loads_json(line).items() if key in keys}
+    _assert_identical(loads_json_keys(line, keys), expected)
+
+
+@pytest.mark.parametrize('line', ['{"note": 1', '{"note": 1,}', '[1]', '{"note": 1} x'])
+def test_loads_json_keys_invalid(line):
+    with pytest.raises(json.JSONDecodeError):
+        loads_json_keys(line, {'note'})
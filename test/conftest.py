@@ -0,0 +1,67 @@
+"""
+Corpus of notes written to a directory (as read by `extract`), shared by tests of reading, extracting and
+    building tables.
+
+* By default, the corpus contains `NOTES` with metadata from `note_metadata`.
+* To write other notes or metadata, override the `corpus_notes` or `corpus_metadata` fixture in the test module;
+    to add files (e.g., section data), override `corpus` (requesting `corpus`).
+"""
+import json
+
+import pytest
+
+NOTES = [
+    'ASSESSMENT: Dry AMD OU. Intermediate drusen od, heavy drusen os.',
+    'MACULA: OD: no fluid OS: subretinal fluid\nIOP: 15/17',
+    'Glaucoma suspect OD. Cup disc ratio 0.4 OS. No diabetic retinopathy.',
+    'Nuclear sclerosis cataract 2+ OU. VA sc: 20/40 OD 20/30 OS',
+    'Patient is being treated for glaucoma and AMD. s/p aflibercept OS.',
+    'Moderate NPDR OU with CSME OD. Dot blot hemorrhages and hard exudates OD.',
+]
+
+
+def note_metadata(i):
+    return {'note_id': i, 'note_date': '2022-02-22 00:00:00', 'studyid': i * 10, 'enc_id': i, 'train': 0}
+
+
+@pytest.fixture(scope='module')
+def corpus_notes():
+    return NOTES
+
+
+@pytest.fixture(scope='module')
+def corpus_metadata():
+    """Function of note index returning metadata (or None to write no `.meta` file)"""
+    return note_metadata
+
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory, corpus_notes, corpus_metadata):
+    """Directory with each note in `{i}.txt` and its metadata in `{i}.meta`"""
+    corpus = tmp_path_factory.mktemp('corpus')
+    for i, text in enumerate(corpus_notes):
+        (corpus / f'{i}.txt').write_text(text, encoding='utf8')
+        if (metadata := corpus_metadata(i)) is not None:
+            (corpus / f'{i}.meta').write_text(json.dumps(metadata), encoding='utf8')
+    return corpus
+
+
+def _read_lines(path):
+    with open(path, encoding='utf8', newline='') as fh:
+        return fh.readlines()
+
+
+def _as_comparable(records):
+    return [(file, text, data, sections.data) for file, text, data, sections in records]
+
+
+@pytest.fixture(scope='session')
+def read_lines():
+    """Read lines of a file, keeping line endings"""
+    return _read_lines
+
+
+@pytest.fixture(scope='session')
+def as_comparable():
+    """Convert records read from a corpus (see `corpusio`) to comparable tuples"""
+    return _as_comparable
@@ -1,6 +1,7 @@
 import pytest
 
-from eye_extractor.nlp.character_groups import get_previous_text_to_newline
+from eye_extractor.nlp.character_groups import get_previous_text_to_newline, get_next_text_to_newline, \
+    get_next_index_of_newline, get_previous_index_of_newline
 
 
 @pytest.mark.parametrize('index, text, exp_line', [
@@ -10,3 +11,26 @@ from eye_extractor.nlp.character_groups import get_previous_text_to_newline
 def test_previous_text_to_newline(index, text, exp_line):
     line = get_previous_text_to_newline(index, text)
     assert line == exp_line
+
+
+@pytest.mark.parametrize('index, text, exp', [
+    # (previous text, next text, next newline index, previous newline index)
+    (0, '', ('', '', 0, 0)),
+    (0, 'ab', ('', 'ab', 1, 0)),
+    (1, 'ab', ('a', 'b', 1, 0)),
+    (10, 'ab', ('ab', '', 10, 1)),
+    (-1, 'ab\ncd', ('c', 'd', -1, -2)),
+    (1, 'ab\ncd', ('a', 'b', 2, 0)),
+    (3, 'ab\ncd', ('', 'cd', 4, 3)),
+    (10, 'ab\ncd', ('cd', '', 10, 8)),
+    (1, '\n\n', ('', '', 1, 1)),
+    (-1, 'ab¶', ('ab', '', -1, 1)),
+    (3, 'ab¶', ('', '', 3, 3)),
+])
+def test_line_boundaries(index, text, exp):
+    assert (
+        get_previous_text_to_newline(index, text),
+        get_next_text_to_newline(index, text),
+        get_next_index_of_newline(index, text),
+        get_previous_index_of_newline(index, text),
+    ) == exp
@@ -0,0 +1,253 @@
+import re
+from typing import Iterable, Pattern
+
+import pytest
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # python 3.10
+    import sre_constants
+    import sre_parse
+
+from eye_extractor.extract import extract_all
+from eye_extractor.nlp import keywords
+from eye_extractor.nlp.keywords import _CASED_WORD, _WORD, EXTRACTOR_TERMS, KeywordIndex, normalise_text, \
+    requires_terms, word
+from eye_extractor.sections.document import create_doc_and_sections, Document
+
+# `requires_any` walks parsed patterns (private `re` modules, so only used by the tests)
+_MAX_LITERALS = 64
+_SUBPATTERN_OPS = {sre_constants.SUBPATTERN}
+_REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, 'ATOMIC_GROUP'):  # python 3.11+
+    _SUBPATTERN_OPS.add(sre_constants.ATOMIC_GROUP)
+    _REPEAT_OPS.add(sre_constants.POSSESSIVE_REPEAT)
+_ZERO_WIDTH_OPS = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+
+
+def _get_items(op, av):
+    """Items of a subpattern"""
+    return av if op == getattr(sre_constants, 'ATOMIC_GROUP', None) else av[-1]
+
+
+def _literals(op, av) -> set[str] | None:
+    """
+    Set of strings matched by a parsed item, or None if not a small set of literals;
+        word boundaries (`\\b`) are marked by `_WORD`
+    """
+    if op is sre_constants.LITERAL:
+        return {chr(av)}
+    elif op is sre_constants.IN and all(item_op is sre_constants.LITERAL for item_op, _ in av):
+        return {chr(item_av) for _, item_av in av}
+    elif op is sre_constants.AT and av is sre_constants.AT_BOUNDARY:
+        return {_WORD}
+    elif op in _ZERO_WIDTH_OPS:
+        return {''}
+    elif op in _SUBPATTERN_OPS:
+        return _literals_of_sequence(_get_items(op, av))
+    elif op is sre_constants.BRANCH:
+        result = set()
+        for branch in av[1]:
+            if (literals := _literals_of_sequence(branch)) is None:
+                return None
+            result |= literals
+        return result
+    elif op in _REPEAT_OPS and av[1] == 1:
+        if (literals := _literals_of_sequence(av[2])) is None:
+            return None
+        return literals | {''} if av[0] == 0 else literals
+    return None
+
+
+def _literals_of_sequence(items) -> set[str] | None:
+    result = {''}
+    for op, av in items:
+        if (literals := _literals(op, av)) is None:
+            return None
+        result = {prefix + suffix for prefix in result for suffix in literals}
+        if len(result) > _MAX_LITERALS:
+            return None
+    return result
+
+
+def _leading_literals(items, suffixes) -> set[str]:
+    """Literal strings with which any match of the parsed sequence `items` (followed by `suffixes`) starts"""
+    result = {''}
+    for op, av in items:
+        if (literals := _literals(op, av)) is None:
+            return result
+        extended = {prefix + suffix for prefix in result for suffix in literals}
+        if len(extended) > _MAX_LITERALS:
+            return result
+        result = extended
+    extended = {prefix + suffix for prefix in result for suffix in suffixes}
+    return extended if len(extended) <= _MAX_LITERALS else result
+
+
+def _requires_any(items, is_covered, prefixes=frozenset({''}), suffixes=frozenset({''})) -> bool:
+    """
+    Whether every match of the parsed sequence `items` contains one of the terms (see `is_covered`)
+
+    :param prefixes: literal strings which may immediately precede the sequence (e.g., a common prefix
+        which the parser has removed from each branch of an alternation)
+    :param suffixes: literal strings which may immediately follow the sequence (e.g., a word boundary)
+    """
+    run = set(prefixes)  # literal strings matched by the current run of items
+    for i, (op, av) in enumerate(items):
+        if (literals := _literals(op, av)) is not None:
+            extended = {prefix + suffix for prefix in run for suffix in literals}
+            if len(extended) <= _MAX_LITERALS:
+                run = extended
+                continue
+        if is_covered(run):
+            return True
+        following = _leading_literals(items[i + 1:], suffixes)
+        if op in _SUBPATTERN_OPS and _requires_any(_get_items(op, av), is_covered, run, following):
+            return True
+        elif op is sre_constants.BRANCH and all(_requires_any(branch, is_covered, run, following)
+                                                for branch in av[1]):
+            return True
+        elif op in _REPEAT_OPS and av[0] >= 1 and _requires_any(
+                av[2], is_covered, run, following if av[1] == 1 else {''}):  # suffix only follows the last repeat
+            return True
+        run = {''}
+    return is_covered({prefix + suffix for prefix in run for suffix in suffixes})
+
+
+def _mark_boundaries(literal: str) -> str:
+    """Mark word boundaries between word and non-word characters of `literal`"""
+    return re.sub(rf'(?<=\w)(?=[^\w{_WORD}])|(?<=[^\w{_WORD}])(?=\w)', _WORD, literal)
+
+
+def requires_any(pattern: Pattern, terms: Iterable[str]) -> bool:
+    """Whether every match of `pattern` must contain (ignoring case, unless a cased word) one of `terms`"""
+    ignore_case = bool(pattern.flags & re.IGNORECASE)
+    substrings, words, cased_words = [], [], []
+    for term in terms:
+        if term.startswith(_CASED_WORD):
+            if not ignore_case:  # otherwise, a match need not have the same case
+                cased_words.append(term.replace(_CASED_WORD, _WORD))
+        elif term.startswith(_WORD):
+            words.append(term)
+        else:
+            substrings.append(term.lower())
+
+    def is_covered(literals):
+        for literal in literals:
+            marked = _mark_boundaries(literal)
+            lower = marked.lower()
+            if not (any(term in lower.replace(_WORD, '') for term in substrings)
+                    or any(term in lower for term in words)
+                    or any(term in marked for term in cased_words)):
+                return False
+        return True
+
+    return _requires_any(sre_parse.parse(pattern.pattern, pattern.flags), is_covered)
+
+
+@pytest.mark.parametrize('pattern, terms, exp', [
+    (r'\bdrusen\b', ['druse'], True),
+    (r'drusen?', ['drusen'], False),
+    (r'\b(?:ga|geo\w*\s*atroph\w*)\b', ['ga', 'geo'], True),  # parser removes the common prefix 'g'
+    (r'\b(?:ga|geo\w*\s*atroph\w*)\b', ['ga'], False),
+    (r'(?:foo)?bar', ['foo'], False),
+    (r'(?:foo)?bar', ['foo', 'bar'], True),
+    (r'x+(?:fo+|foo)', ['fo'], True),
+    (r'p[de]x', ['pdx', 'pex'], True),
+    (r'p[a-z]x', ['pdx', 'pex'], False),
+    (r'(?<!hard\s)exud', ['exud'], True),
+    (r'(?<!hard\s)exud', ['hard'], False),
+    (r'HE', ['he'], True),
+    (r'\bice\b', [word('ice')], True),
+    (r'ice', [word('ice')], False),
+    (r'\b(?:pxg|p[de]x)\b', [word('pxg'), word('pdx'), word('pex')], True),
+    (r'\b(?:pxg|p[de]x)\b', [word('pxg'), word('pdx')], False),
+    (r'\bretinal mas?\b', [word('ma'), word('mas')], True),  # boundary after the space
+    (r'\bretinal\s*mas?\b', [word('ma'), word('mas')], False),
+    (r'\b(?:ab)+\b', [word('ab')], False),  # e.g., 'abab'
+    (r'\bHE\b', [word('HE', cased=True)], False),  # e.g., 'He' with re.IGNORECASE
+])
+def test_requires_any(pattern, terms, exp):
+    assert requires_any(re.compile(pattern, re.I), terms) is exp
+
+
+def test_requires_any_cased_word():
+    assert requires_any(re.compile(r'\bHE\b'), [word('HE', cased=True)])
+    assert not requires_any(re.compile(r'\bHE\b'), [word('He', cased=True)])
+
+
+@pytest.mark.parametrize('name', sorted(EXTRACTOR_TERMS))
+def test_extractor_terms_cover_patterns(name):
+    """Skipping extractors must not change output: every match must contain a trigger term"""
+    terms, patterns = EXTRACTOR_TERMS[name]
+    assert patterns
+    assert not any(re.search(r'\s', term) for term in terms)
+    for pattern in patterns:
+        assert requires_any(pattern, terms), pattern.pattern
+
+
+def test_keyword_index():
+    index = KeywordIndex('MACULA: Drusen OU; ſcleritis')
+    assert index.has_any(frozenset({'druse', 'cnv'}))
+    assert not index.has_any(frozenset({'cnv'}))
+    assert index.has_any(frozenset({'scleritis'}))
+    assert normalise_text('İritis') == 'iritis'
+    index = KeywordIndex('Notice: He has HE OD; the Ice')
+    assert index.has_any(frozenset({word('he')}))
+    assert index.has_any(frozenset({word('HE', cased=True)}))
+    assert index.has_any(frozenset({word('ice')}))
+    assert not KeywordIndex('Notice: He advice').has_any(frozenset({word('ice'), word('HE', cased=True)}))
+
+
+def test_requires_terms(monkeypatch):
+    monkeypatch.setattr(keywords, 'EXTRACTOR_TERMS', {})
+    monkeypatch.setattr(keywords, 'TRIGGER_TERMS', keywords.TRIGGER_TERMS)
+    calls = []
+
+    @requires_terms('Drusen')
+    def extract_drusen(doc):
+        calls.append(doc)
+        return ['drusen']
+
+    assert extract_drusen.trigger_terms == {'drusen'}
+    assert extract_drusen(Document('No drusen OU')) == ['drusen']
+    assert extract_drusen(Document('Cataract OU')) == []
+    assert len(calls) == 1
+    assert list(keywords.EXTRACTOR_TERMS) == [f'{__name__}.test_requires_terms.<locals>.extract_drusen']
+
+
+def test_document_has_any_term_in_sections():
+    doc = create_doc_and_sections('', {'MACULA': 'hard drusen OU'})
+    assert doc.has_any_term(frozenset({'druse'}))
+
+
+CATARACT_NOTE = (
+    'CHIEF COMPLAINT: Blurred vision and glare when driving at night, worse OD. He has noticed halos.\n'
+    'HPI: Here for cataract evaluation. He reports the office lights are bothersome.\n'
+    'VA cc: 20/50 OD 20/30 OS. Pupils: normal, no APD. IOP: 15/16 by tonopen.\n'
+    'SLE: Lids/lashes normal OU. Conj: white and quiet OU. Cornea: clear OU. AC: deep and quiet OU.\n'
+    'Lens: 3+ NS with 2+ cortical changes OD, 2+ NS OS.\n'
+    'DFE: Vitreous clear OU. C/D 0.3 OU. Macula flat OU. Periphery: flat, no holes or tears OU.\n'
+    'ASSESSMENT: 1. Visually significant nuclear sclerosis cataract OD. 2. Low vision aids discussed, open to trying.\n'
+    'PLAN: Discussed risks, benefits and alternatives of cataract surgery with IOL OD. Notice given.'
+)
+
+
+@pytest.mark.parametrize('name', sorted(EXTRACTOR_TERMS))
+def test_extractor_skipped_on_unrelated_note(name):
+    terms, _ = EXTRACTOR_TERMS[name]
+    assert not Document(CATARACT_NOTE).has_any_term(terms)
+
+
+@pytest.mark.parametrize('text', [
+    CATARACT_NOTE,
+    'ASSESSMENT: 1. Nuclear sclerosis cataract OD > OS, not visually significant',
+    'MACULA: OD: intermediate drusen, no fluid OS: subretinal fluid, heavy drusen',
+    'VESSELS: mild attenuation OU, no venous beading, no IRMA¶4. No diabetic retinopathy OU;'
+    ' no dot blot hemorrhages, cotton wool spots or exudates',
+    'ASSESSMENT: POAG OU, s/p PRP OD; anterior uveitis OS, no NVI or NVE',
+])
+def test_skipped_extractors_match_unskipped(text, monkeypatch):
+    expected = extract_all(text)
+    monkeypatch.setattr(Document, 'has_any_term', lambda self, terms: True)
+    assert extract_all(text) == expected
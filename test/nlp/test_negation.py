@@ -1,18 +1,25 @@
 import pytest
 
 from eye_extractor.nlp.negate.negation import (
+    DEFAULT_BOUNDARY_REGEX,
     find_unspecified_negated_list_items,
+    get_boundary_pattern,
     has_after,
     has_before,
     is_negated,
     NegationStatus,
+    NegationTokens,
+    NEGWORDS,
     NEGATED_LIST_PATTERN_COMMA,
     NEGATED_LIST_PATTERN_OR,
     NEGATED_LIST_PATTERN_SLASH,
     _find_negated_list_spans,
     _handle_negation_with_punctuation,
+    _prep_negation_tree,
 )
 from eye_extractor.laterality import LATERALITY_PATTERN, LATERALITY_PLUS_COLON_PATTERN
+from eye_extractor.nlp.text_index import get_text_index
+from eye_extractor.sections.document import Document
 
 
 @pytest.mark.parametrize(
@@ -82,6 +89,44 @@ def test_handle_negation_with_punctuation(text, exp):
     assert res == exp
 
 
+def test_get_boundary_pattern():
+    pattern = get_boundary_pattern(':¶', DEFAULT_BOUNDARY_REGEX)
+    assert pattern is get_boundary_pattern(':¶', DEFAULT_BOUNDARY_REGEX)
+    assert pattern.split('glaucoma od: no¶ yes') == ['glaucoma ', '', ' no', ' yes']
+    assert get_boundary_pattern('') is None
+
+
+def test_negation_tokens_per_document():
+    doc = Document('Macula: no drusen OD, (-)heme OS')
+    start = doc.text.index('drusen')
+    pattern = get_boundary_pattern(':¶', DEFAULT_BOUNDARY_REGEX)
+    with doc.text_indexes():
+        assert is_negated(start, doc.text)
+        tokens = get_text_index(NegationTokens, doc.text, pattern, lowercase_text=True, hack_punctuation=True)
+        assert tokens._words_before == {(start, 20, 0): ('no',)}  # context normalised once for the document
+        assert is_negated(start, doc.text)
+        assert get_text_index(NegationTokens, doc.text, pattern, lowercase_text=True, hack_punctuation=True) is tokens
+
+
+@pytest.mark.parametrize('words, terms, return_unknown, exp', [
+    (['no', 'drusen'], NEGWORDS, False, 'no'),
+    (['no', 'new'], NEGWORDS, False, None),
+    (['no', 'new'], NEGWORDS, True, 'no new'),
+    (['no', 'significant', 'new'], NEGWORDS, True, 'no new'),
+    (['risk', 'of', 'worsening'], NEGWORDS, False, None),
+    (['risk', 'of', 'worsening'], NEGWORDS, True, 'risk of worsening'),
+    (['risk', 'of'], NEGWORDS, False, 'risk of'),
+    (['not', 'only'], NEGWORDS, False, None),
+    (['no', 'increased', 'not'], NEGWORDS, False, 'not'),
+    (['drusen'], NEGWORDS, False, None),
+    ([], NEGWORDS, False, None),
+    (['a', 'no'], {'no'}, False, 'no'),
+    (['a', 'b'], frozenset({'no'}), False, None),
+])
+def test_prep_negation_tree(words, terms, return_unknown, exp):
+    assert _prep_negation_tree(words, terms, return_unknown=return_unknown) == exp
+
+
 @pytest.mark.parametrize('text, term, exp_negated', [
     ('(-)  holes, tears, or detachments OU', 'holes', True),
     ('(-)  holes, tears, or detachments OU', 'detachments', True),  # or is negated
@@ -0,0 +1,44 @@
+import re
+
+import pytest
+
+from eye_extractor.nlp.pattern_battery import PatternBattery
+
+BATTERY = PatternBattery([
+    ('drusen', re.compile(r'drusen', re.I)),
+    ('hard', re.compile(r'hard drusen', re.I)),
+    ('abbr', re.compile(r'\bHD\b')),
+])
+
+
+@pytest.mark.parametrize('text, exp', [
+    ('hard drusen OU', [('drusen', 5), ('hard', 0)]),
+    ('HD OD, drusen OS, HARD DRUSEN', [('drusen', 7), ('drusen', 23), ('hard', 18), ('abbr', 0)]),
+    ('hd OU', []),
+])
+def test_iter_by_pattern(text, exp):
+    assert [(label, m.start()) for label, m in BATTERY.iter_by_pattern(text)] == exp
+
+
+def test_iter_by_start():
+    text = 'HD OD, hard drusen OS, drusen'
+    assert [(label, m.start()) for label, m in BATTERY.iter_by_start(text)] == [
+        ('abbr', 0), ('hard', 7), ('drusen', 12), ('drusen', 23),
+    ]
+
+
+@pytest.mark.parametrize('text', [
+    'hard drusen OU',
+    'HD OD, drusen OS, HARD DRUSEN',
+    'hard drusen, hard drusen HD',
+    '',
+])
+def test_sub(text):
+    matches, result = BATTERY.sub(' ', text)
+    exp_matches = []
+    exp_text = text
+    for label, pattern in BATTERY:
+        exp_matches += [(label, m.span()) for m in pattern.finditer(exp_text)]
+        exp_text = pattern.sub(' ', exp_text)
+    assert [(label, m.span()) for label, m in matches] == exp_matches
+    assert result == exp_text
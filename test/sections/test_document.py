@@ -0,0 +1,21 @@
+from eye_extractor.sections.document import cache_on_document, Document
+
+
+def test_document_get_cached():
+    calls = []
+
+    @cache_on_document
+    def long_words(doc, min_length=0, *, exclude=None):
+        calls.append(min_length)
+        return [word for word in doc.text.split() if len(word) > min_length]
+
+    doc = Document('Macula: drusen OU')
+    assert long_words(doc) == long_words(doc)
+    long_words(doc).append('OS')  # each caller has its own copy
+    assert long_words(doc) == ['Macula:', 'drusen', 'OU']
+    assert long_words(doc, 6) == ['Macula:']
+    assert long_words(doc, exclude=['OU']) == long_words(doc, exclude=['OU'])  # unhashable: not cached
+    assert calls == [0, 6, 0, 0]
+    assert doc.extractor_cache_hits == {'test_document_get_cached.<locals>.long_words': 3}
+    assert long_words(Document('Macula: drusen OU')) == long_words(doc)
+    assert len(calls) == 5
@@ -0,0 +1,21 @@
+import csv
+import importlib
+import pathlib
+
+from click.testing import CliRunner
+
+
+def test_main_csv_many_sizes(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(pathlib.Path(__file__).parent.parent / 'benchmarks'))
+    bench = importlib.import_module('bench_regex_backtracking')
+    csv_path = tmp_path / 'audit.csv'
+    result = CliRunner().invoke(bench.main, [
+        '--pattern', r'^eye_extractor\.amd\.amd\.AMD_RX$', '--min-size', '10', '--max-size', '5000',
+        '--repeat', '1', '--csv', str(csv_path),
+    ])
+    assert result.exit_code == 0, result.output
+    with open(csv_path, encoding='utf8', newline='') as fh:
+        reader = csv.DictReader(fh)
+        rows = list(reader)
+    assert reader.fieldnames[-1] == 'seconds_8'  # 10, 20, ..., 2560
+    assert rows
@@ -0,0 +1,85 @@
+import csv
+
+import pytest
+
+from eye_extractor.build_table import BUILD_PLAN, METADATA_COLUMNS, build_table, iter_chunks, process_data
+from eye_extractor.common.json import loads_json
+from eye_extractor.extract import extract_variables
+from eye_extractor.output.plan import BuildPlan, BuildStep, note
+
+@pytest.fixture(scope='module')
+def jsonl_dir(tmp_path_factory, corpus):
+    outdir = tmp_path_factory.mktemp('extract')
+    extract_variables((corpus,), outdir, shard_size=4)
+    return outdir
+
+
+def test_iter_chunks(tmp_path):
+    path = tmp_path / 'lines.jsonl'
+    path.write_bytes(b'a\nbbbb\n\ncc\nd')
+    chunks = list(iter_chunks(path, chunk_size=3))
+    assert [path.read_bytes()[start:end] for _, start, end in chunks] == [b'a\nbbbb\n', b'\ncc\n', b'd']
+    with pytest.raises(ValueError):
+        next(iter_chunks(path, chunk_size=0))
+
+
+@pytest.mark.parametrize('chunk_size', [100, 1_000_000])
+def test_build_table_workers_matches_serial(jsonl_dir, tmp_path, chunk_size, read_lines, corpus_notes):
+    serial = build_table(jsonl_dir, tmp_path / 'serial')
+    parallel = build_table(jsonl_dir, tmp_path / 'parallel', workers=2, chunk_size=chunk_size)
+    serial_lines = read_lines(serial)
+    assert len(serial_lines) == len(corpus_notes) + 1
+    assert read_lines(parallel) == serial_lines
+
+
+def test_build_plan_columns(jsonl_dir, read_lines, corpus_notes):
+    """Each builder only returns the columns found for its step, so that selecting columns runs the right steps"""
+    lines = [line for file in jsonl_dir.glob('*.jsonl') for line in read_lines(file)]
+    assert len(lines) == len(corpus_notes)
+    for line in lines:
+        data = loads_json(line)
+        process_data(data)
+        for s, step_columns in zip(BUILD_PLAN.steps, BUILD_PLAN.columns):
+            assert set(s.builder(s.source(data))) <= set(step_columns), s.builder.__name__
+
+
+def test_build_plan_unknown_column():
+    with pytest.raises(ValueError):
+        BuildPlan([BuildStep(lambda data: {'not_a_column_re': -1}, note('dr'))])
+
+
+def _read_csv(path):
+    with open(path, encoding='utf8', newline='') as fh:
+        return list(csv.DictReader(fh))
+
+
+@pytest.mark.parametrize('columns, column_groups', [
+    (['iop_measurement_re', 'dryamd_severity_re', 'wetamd_severity_le'], None),
+    (None, ['dr']),
+    (['glaucoma_dx_re'], ['va', 'iop']),
+])
+def test_build_table_columns(jsonl_dir, tmp_path, columns, column_groups, read_lines):
+    full = _read_csv(build_table(jsonl_dir, tmp_path / 'full'))
+    selected = BUILD_PLAN.get_columns(columns, column_groups)
+    expected = [{column: row[column] for column in METADATA_COLUMNS + tuple(selected)} for row in full]
+    result = build_table(jsonl_dir, tmp_path / 'serial', columns=columns, column_groups=column_groups)
+    assert _read_csv(result) == expected
+    parallel = build_table(jsonl_dir, tmp_path / 'parallel', columns=columns, column_groups=column_groups,
+                           workers=2, chunk_size=100)
+    assert read_lines(parallel) == read_lines(result)
+
+
+def test_build_plan_select():
+    plan = BUILD_PLAN.select(['wetamd_severity_re', 'iop_measurement_re'])
+    assert [s.group for s in plan.steps] == ['iop', 'amd']
+    assert 'wetamd_severity_re' in set().union(*plan.columns)
+    assert plan.keys == {'note', 'iop', 'amd', 'common', 'macula_wnl', 'fluid', 'treatment'}
+
+
+@pytest.mark.parametrize('columns, column_groups', [
+    (['not_a_column_re'], None),
+    (None, ['not_a_group']),
+])
+def test_build_plan_get_columns_unknown(columns, column_groups):
+    with pytest.raises(ValueError):
+        BUILD_PLAN.get_columns(columns, column_groups)
@@ -0,0 +1,67 @@
+import random
+import time
+
+import pytest
+
+from eye_extractor.corpusio import read_from_params
+from eye_extractor.corpuspack import iter_note_files, write_packed_corpus
+from eye_extractor.parallel import imap_threaded
+
+
+@pytest.fixture(scope='module')
+def corpus_notes():
+    return [f'ASSESSMENT: note {i}\nPLAN: RTC {i} weeks' for i in range(30)]
+
+
+@pytest.fixture(scope='module')
+def corpus_metadata():
+    return lambda i: {'note_id': i}
+
+
+def _slow_square(x):
+    time.sleep(random.random() / 100)
+    return x * x
+
+
+@pytest.mark.parametrize('workers, max_pending', [(1, None), (4, None), (4, 2), (2, 100)])
+def test_imap_threaded_preserves_order(workers, max_pending):
+    assert list(imap_threaded(_slow_square, range(50), workers=workers, max_pending=max_pending)) == [
+        x * x for x in range(50)
+    ]
+
+
+def test_imap_threaded_stops_early():
+    results = imap_threaded(_slow_square, range(1000), workers=2)
+    assert next(results) == 0
+    results.close()
+
+
+def test_read_directory_sorted(corpus):
+    files = sorted(corpus.glob('*.txt'))
+    assert [file for file, *_ in read_from_params(corpus)] == files
+    assert [file for file, *_ in read_from_params(corpus, skip={str(corpus): 10})] == files[10:]
+
+
+@pytest.mark.parametrize('prefetch', [1, 8])
+def test_prefetch_directory(corpus, prefetch, as_comparable):
+    expected = as_comparable(read_from_params(corpus))
+    assert as_comparable(read_from_params(corpus, prefetch=prefetch)) == expected
+    skip = {str(corpus): 10}
+    assert as_comparable(read_from_params(corpus, skip=skip, prefetch=prefetch)) == expected[10:]
+
+
+@pytest.mark.parametrize('prefetch', [1, 8])
+def test_prefetch_filelist(corpus, tmp_path, prefetch, as_comparable):
+    filelist = tmp_path / 'filelist.txt'
+    filelist.write_text('\n'.join(str(corpus / f'{i}.txt') for i in range(0, 30, 3)), encoding='utf8')
+    expected = as_comparable(read_from_params(filelist=filelist))
+    assert len(expected) == 10
+    assert as_comparable(read_from_params(filelist=filelist, prefetch=prefetch)) == expected
+
+
+@pytest.mark.parametrize('prefetch', [1, 8])
+def test_prefetch_packed(corpus, tmp_path, prefetch, as_comparable):
+    packed = tmp_path / 'corpus.eyepack'
+    write_packed_corpus(packed, iter_note_files(corpus.glob('*.txt')))
+    expected = as_comparable(read_from_params(packed=packed))
+    assert as_comparable(read_from_params(packed=packed, prefetch=prefetch)) == expected
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from eye_extractor.corpusio import read_from_params
+from eye_extractor.corpuspack import PackedCorpus, iter_note_files, write_packed_corpus
+from eye_extractor.tools.pack_corpus import iter_files
+
+NOTES = [
+    'ASSESSMENT: Dry AMD OU.',
+    'MACULA: OD: no fluid OS: subretinal fluid\r\nIOP: 15/17',
+    'Glaucoma suspect OD. Œdème',
+    '',
+]
+
+
+@pytest.fixture(scope='module')
+def corpus_notes():
+    return NOTES
+
+
+@pytest.fixture(scope='module')
+def corpus_metadata():
+    return lambda i: None if i == 2 else {'note_id': f'n{i}', 'note_date': '2022-02-22'}  # 2: no metadata
+
+
+@pytest.fixture(scope='module')
+def corpus(corpus):
+    (corpus / '1.sect').write_text(json.dumps({'PLAN': 'Return in 1 year'}), encoding='utf8')
+    return corpus
+
+
+@pytest.fixture
+def packed(corpus, tmp_path):
+    path = tmp_path / 'corpus.eyepack'
+    assert write_packed_corpus(path, iter_note_files(iter_files(corpus))) == len(NOTES)
+    return path
+
+
+def test_read_packed_matches_directory(corpus, packed, as_comparable):
+    expected = as_comparable(read_from_params(corpus))
+    assert as_comparable(read_from_params(packed=packed)) == expected
+    assert as_comparable(read_from_params(packed=packed, skip={str(packed): 2})) == expected[2:]
+
+
+def test_read_packed_by_docid(corpus, packed, as_comparable):
+    expected = {data.get('note_id', file.stem): (file, text, data, sections.data)
+                for file, text, data, sections in read_from_params(corpus)}
+    docids = ['2', 'n3', 'n0']
+    assert as_comparable(read_from_params(packed=packed, docids=docids)) == [expected[d] for d in docids]
+
+
+def test_packed_corpus_lookup_during_iteration(packed):
+    with PackedCorpus(packed) as corpus:
+        assert len(corpus) == len(NOTES)
+        assert 'n1' in corpus and 'n2' not in corpus
+        notes = []
+        for note in corpus:
+            assert corpus['n1'].sect == json.dumps({'PLAN': 'Return in 1 year'})
+            notes.append(note.text)
+        assert sorted(notes) == sorted(text.replace('\r\n', '\n') for text in NOTES)
+
+
+def test_packed_corpus_invalid(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('not a packed corpus', encoding='utf8')
+    with pytest.raises(ValueError):
+        PackedCorpus(path)
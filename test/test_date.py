@@ -5,7 +5,10 @@ from dateutil.parser import parse
 import pytest
 
 from eye_extractor.common.date import parse_date, parse_date_after, parse_date_before, parse_all_dates, \
-    parse_nearest_date_to_line_start
+    parse_nearest_date_to_line_start, LineDateIndex
+from eye_extractor.nlp.character_groups import get_previous_text_to_newline, LINE_START_CHARS_RX
+from eye_extractor.nlp.text_index import get_text_index
+from eye_extractor.sections.document import Document
 
 
 @pytest.mark.parametrize('text, exp', [
@@ -63,3 +66,25 @@ def test_parse_all_dates(text, exp):
 def test_previous_date_in_line(start, text, exp_date):
     date = parse_nearest_date_to_line_start(start, text)
     assert date == exp_date
+
+
+@pytest.mark.parametrize('text', [
+    '04/16/2012 this 04/17/2012 that\nOCT 2020: od: 2021 fluid ¶ seen in March 3, 2019 and 2018',
+    'H35.3 dry amd (dx 2015)\n2012 no fluid',
+    '4 February 2021, x 03/2018 y 12',
+])
+def test_line_date_index(text):
+    index = LineDateIndex(text)
+    for start in range(len(text) + 1):
+        dates = parse_all_dates(get_previous_text_to_newline(start, text))
+        assert index.get_date(start) == (dates[-1][1] if dates else None)
+
+
+def test_line_date_index_per_document():
+    doc = Document('04/16/2012 this 04/17/2012 that\nno date')
+    with doc.text_indexes():
+        assert parse_nearest_date_to_line_start(31, doc.text) == datetime.date(2012, 4, 17)
+        index = get_text_index(LineDateIndex, doc.text, LINE_START_CHARS_RX)
+        assert get_text_index(LineDateIndex, doc.text, LINE_START_CHARS_RX) is index
+    # indexes are discarded outside of the document's scope
+    assert get_text_index(LineDateIndex, doc.text, LINE_START_CHARS_RX) is not index
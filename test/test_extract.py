@@ -0,0 +1,126 @@
+import collections
+import json
+import time
+
+import pytest
+
+from eye_extractor import profiling
+from eye_extractor.corpuspack import iter_note_files, write_packed_corpus
+from eye_extractor.extract import extract_all, extract_variables
+from eye_extractor.quarantine import can_budget
+
+def test_extract_all_reuses_shared_extractors(corpus_notes):
+    cache_hits = collections.Counter()
+    data = extract_all(corpus_notes[1], cache_hits=cache_hits)
+    assert cache_hits['extract_fluid'] == 1
+    assert data['amd']['fluid'] == data['common']['fluid']
+    assert data['common']['fluid']
+    assert data['amd']['fluid'] is not data['common']['fluid']  # not shared between variables
+
+
+def test_extract_variables_workers_matches_serial(corpus, tmp_path, read_lines, corpus_notes):
+    serial = extract_variables((corpus,), tmp_path / 'serial')
+    parallel = extract_variables((corpus,), tmp_path / 'parallel', workers=2)
+    prefetched = extract_variables((corpus,), tmp_path / 'prefetched', workers=2, prefetch=2)
+    serial_lines = read_lines(serial)
+    assert len(serial_lines) == len(corpus_notes)
+    assert read_lines(parallel) == serial_lines
+    assert read_lines(prefetched) == serial_lines
+
+
+def test_extract_variables_shards(corpus, tmp_path, read_lines, corpus_notes):
+    serial = extract_variables((corpus,), tmp_path / 'serial')
+    manifest = extract_variables((corpus,), tmp_path / 'sharded', shard_size=2)
+    with open(manifest, encoding='utf8') as fh:
+        checkpoint = json.load(fh)
+    assert len(checkpoint['shards']) == 3
+    assert checkpoint['sources'][str(corpus)]['count'] == len(corpus_notes)
+    lines = []
+    for shard in checkpoint['shards']:
+        lines += read_lines(tmp_path / 'sharded' / shard)
+    assert lines == read_lines(serial)
+
+
+def test_extract_variables_packed(corpus, tmp_path, read_lines, corpus_notes):
+    packed = tmp_path / 'corpus.eyepack'
+    write_packed_corpus(packed, iter_note_files(sorted(corpus.glob('*.txt'))))
+    serial = extract_variables((corpus,), tmp_path / 'serial')
+    manifest = extract_variables(outdir=tmp_path / 'packed', packed=packed, shard_size=2)
+    with open(manifest, encoding='utf8') as fh:
+        checkpoint = json.load(fh)
+    assert checkpoint['sources'] == {str(packed): {'count': len(corpus_notes),
+                                                   'last_file': str(corpus / f'{len(corpus_notes) - 1}.txt')}}
+    lines = []
+    for shard in checkpoint['shards']:
+        lines += read_lines(tmp_path / 'packed' / shard)
+    assert lines == read_lines(serial)
+
+
+def test_extract_variables_resume(corpus, tmp_path, read_lines):
+    outdir = tmp_path / 'sharded'
+    serial = extract_variables((corpus,), tmp_path / 'serial')
+    # simulate a crash after the first shard was completed
+    manifest = extract_variables((corpus,), outdir, shard_size=2)
+    with open(manifest, encoding='utf8') as fh:
+        checkpoint = json.load(fh)
+    checkpoint['shards'] = checkpoint['shards'][:1]
+    checkpoint['sources'][str(corpus)]['count'] = 2
+    for i in (1, 2):
+        (outdir / f'{checkpoint["name"]}_{i:05d}.jsonl').unlink()
+    with open(manifest, 'w', encoding='utf8') as out:
+        json.dump(checkpoint, out)
+    extract_variables((corpus,), outdir, shard_size=2, resume=True)
+    with open(manifest, encoding='utf8') as fh:
+        checkpoint = json.load(fh)
+    lines = []
+    for shard in checkpoint['shards']:
+        lines += read_lines(outdir / shard)
+    assert lines == read_lines(serial)
+
+
+def test_extract_variables_profile(corpus, tmp_path, read_lines, corpus_notes):
+    serial = extract_variables((corpus,), tmp_path / 'serial')
+    try:
+        profiled = extract_variables((corpus,), tmp_path / 'profiled', profile=True)
+    finally:
+        profiling.uninstall()
+    assert read_lines(profiled) == read_lines(serial)
+    report = read_lines(profiled.with_name(f'{profiled.stem}_profile.csv'))
+    assert report[0].strip() == ','.join(profiling.REPORT_COLUMNS)
+    rows = {line.split(',')[0]: line.split(',') for line in report[1:]}
+    assert rows['amd'][1] == str(len(corpus_notes))
+
+
+def _slow_or_failing_amd(doc):
+    if 'aflibercept' in doc.text:
+        time.sleep(10)
+    if 'Dry AMD' in doc.text:
+        raise ValueError('failed')
+    return {}
+
+
+@pytest.mark.skipif(not can_budget(), reason='interval timers not supported')
+@pytest.mark.parametrize('shard_size, workers', [(None, 1), (2, 1), (None, 2)])
+def test_extract_variables_quarantine(corpus, tmp_path, monkeypatch, shard_size, workers, read_lines, corpus_notes):
+    monkeypatch.setattr('eye_extractor.extract.extract_amd_variables', _slow_or_failing_amd)
+    start = time.perf_counter()
+    outfile = extract_variables((corpus,), tmp_path / 'out', timeout=1, shard_size=shard_size, workers=workers)
+    assert time.perf_counter() - start < 10
+    if shard_size:
+        with open(outfile, encoding='utf8') as fh:
+            checkpoint = json.load(fh)
+        assert checkpoint['sources'][str(corpus)]['count'] == len(corpus_notes)
+        lines = []
+        for shard in checkpoint['shards']:
+            lines += read_lines(outfile.parent / shard)
+    else:
+        lines = read_lines(outfile)
+    assert sorted(json.loads(line)['note_id'] for line in lines) == [1, 2, 3, 5]
+    quarantine_path, = (tmp_path / 'out').glob('*_quarantine.jsonl')
+    records = sorted((json.loads(line) for line in read_lines(quarantine_path)), key=lambda r: r['docid'])
+    assert [(r['docid'], r['error'], r['extractor']) for r in records] == [
+        (0, 'ValueError', 'amd'),
+        (4, 'timeout', 'amd'),
+    ]
+    assert records[1]['slowest'][0]['extractor'] == 'amd'
+    assert records[1]['slowest'][0]['seconds'] > 0.5
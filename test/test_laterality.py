@@ -1,6 +1,8 @@
 import pytest
 
-from eye_extractor.laterality import Laterality, build_laterality_table, LATERALITY_PATTERN
+from eye_extractor.laterality import Laterality, build_laterality_table, LATERALITY_PATTERN, LateralityIndex, \
+    get_immediate_next_or_prev_laterality_from_table, LateralityLocator, LatLocation
+from eye_extractor.sections.document import Document, TextView
 
 
 @pytest.mark.parametrize('text, match_span, exp', [
@@ -35,3 +37,85 @@ def test_laterality_by_index(text, match_span, exp):
 ])
 def test_laterality_patterns(pat, text, exp_count):
     assert len(pat.findall(text)) == exp_count
+
+
+@pytest.mark.parametrize('text, view_start, view_end', [
+    ('IOL OD: 1+ PCO IOL OS: tr pco', 0, 29),
+    ('IOL OD: 1+ PCO IOL OS: tr pco', 5, 29),  # start within laterality
+    ('IOL OD: 1+ PCO IOL OS: tr pco', 0, 20),  # end within laterality
+    ('AMD od > os', 6, 11),  # part of a compound laterality
+    ('AMD od > os', 0, 6),
+    ('Right eye: no NVA Left   eye: no NVA', 4, 22),
+    ('xOD: drusen OS: none', 1, 20),  # word boundary only within view
+])
+def test_laterality_index_substring(text, view_start, view_end):
+    view = text[view_start: view_end]
+    index = LateralityIndex(text)
+    assert index(view, spans=[(0, view_start, len(view))]) == build_laterality_table(view)
+
+
+@pytest.mark.parametrize('text, blank_start, blank_end', [
+    ('OD: drusen OS: none', 3, 11),
+    ('drusen OD  OS: none', 10, 11),
+    ('drusen od, os   : none', 14, 16),
+    ('HISTORY OF AMD OD; MACULA: OU drusen', 0, 18),
+])
+def test_laterality_index_blanked(text, blank_start, blank_end):
+    view = text[:blank_start] + ' ' * (blank_end - blank_start) + text[blank_end:]
+    index = LateralityIndex(text)
+    spans = [(0, 0, blank_start), (blank_end, blank_end, len(text) - blank_end)]
+    assert index(view, spans=spans) == build_laterality_table(view)
+    # spans which do not match the original text are ignored
+    assert index(view, spans=[(0, 0, len(text))]) == build_laterality_table(view)
+
+
+@pytest.mark.parametrize('text', [
+    'PAST OCULAR HISTORY: cataract surgery OD, AMD OS.\n'
+    'MACULA: OD: intermediate drusen, no fluid OS: subretinal fluid\n'
+    'OCT MACULA: 2022-02-22 OD: no fluid, CMT 250 OS: SRF, CMT 310\n'
+    'ASSESSMENT: 1. Dry AMD OD, wet AMD OS s/p aflibercept\n2. Glaucoma suspect OU\n',
+])
+def test_document_laterality_views(text):
+    doc = Document(text)
+    for view in TextView:
+        assert doc.get_lateralities(view=view) == build_laterality_table(doc.get_text(view=view))
+    for section in doc.sections:
+        assert section.lateralities == build_laterality_table(section.text)
+
+
+@pytest.mark.parametrize('text, index, exp', [
+    ('OD: PCIOL OS: 1+ NS', 5, Laterality.OS),  # next section
+    ('OD: PCIOL and OS: 1+ NS', 5, Laterality.OS),  # one skip allowed
+    ('OD: PCIOL and OD, OU and OS: 1+ NS', 5, Laterality.OD),  # too many skips: previous section
+    ('OD: PCIOL', 5, Laterality.OD),
+    ('PCIOL', 1, Laterality.UNKNOWN),
+])
+def test_immediate_next_or_prev_laterality(text, index, exp):
+    table = build_laterality_table(text)
+    assert get_immediate_next_or_prev_laterality_from_table(table, index)[0] == exp
+
+
+def test_laterality_locator_add_sorted():
+    latloc = LateralityLocator([(Laterality.OS, 10, 12, True)])
+    latloc.add(Laterality.OU, 10, 20, False)  # same start: after existing
+    latloc.add(Laterality.OD, 0, 2, False)
+    assert list(latloc) == [
+        LatLocation(Laterality.OD, 0, 2, False),
+        LatLocation(Laterality.OS, 10, 12, True),
+        LatLocation(Laterality.OU, 10, 20, False),
+    ]
+    assert latloc == LateralityLocator(list(latloc))
+    assert latloc != LateralityLocator(list(latloc)[:2])
+
+
+@pytest.mark.parametrize('text, start, end', [
+    ('drusen, od. Fluid\nos', 0, 21),
+    ('drusen, od. Fluid\nos', 5, 12),
+    ('drusen, od. Fluid\nos', 12, 5),
+    ('drusen, od. Fluid\nos', 10, 100),
+    ('', 0, 1),
+])
+def test_laterality_locator_count_between(text, start, end):
+    latloc = LateralityLocator()
+    for value in (LateralityLocator.DEFAULT_COUNT_LETTERS, ',.'):
+        assert latloc.count_between(start, end, text, value) == latloc.count_all(text[start:end], value)
@@ -0,0 +1,13 @@
+from eye_extractor.build_table import build_table
+from eye_extractor.extract import extract_variables
+from eye_extractor.pipeline import extract_and_build_table
+
+
+def test_extract_and_build_table_matches_two_steps(corpus, tmp_path, read_lines):
+    jsonl_path = extract_variables((corpus,), tmp_path / 'extract')
+    expected = read_lines(build_table(jsonl_path, tmp_path / 'build'))
+    assert read_lines(extract_and_build_table((corpus,), tmp_path / 'pipeline')) == expected
+    outpath = extract_and_build_table((corpus,), tmp_path / 'jsonl', write_jsonl=True)
+    assert read_lines(outpath) == expected
+    jsonl_out, = (tmp_path / 'jsonl').glob('*.jsonl')
+    assert read_lines(jsonl_out) == read_lines(jsonl_path)
@@ -0,0 +1,54 @@
+import re
+
+import pytest
+
+from eye_extractor import profiling
+from eye_extractor.amd import algorithm, drusen
+from eye_extractor.extract import extract_all
+from eye_extractor.profiling import count_variables, ExtractionProfile
+
+TEXT = 'ASSESSMENT: Dry AMD OU. Intermediate drusen od, heavy drusen os.\nMACULA: OD: no fluid OS: subretinal fluid'
+
+
+@pytest.fixture
+def installed():
+    profiling.install()
+    yield
+    profiling.uninstall()
+
+
+def test_profile_extract_all(installed):
+    profile = ExtractionProfile()
+    data = extract_all(TEXT, profile=profile)
+    assert data == extract_all(TEXT)
+    for name in ['document', 'note', 'common', 'amd', 'dr', 'amd.drusen.extract_drusen', 'dr.binary_vars.get_dr_binary']:
+        assert profile[name].calls == 1
+    assert profile['amd'].variables == count_variables(data['amd'])
+    assert profile['amd.drusen.extract_drusen'].variables == len(data['amd']['drusen'])
+    assert 0 < profile['amd.drusen.extract_drusen'].matches <= profile['amd'].matches
+    assert profile['amd.drusen.extract_drusen'].seconds <= profile['amd'].seconds
+    assert profile['common.algo.fluid.extract_fluid'].calls == 2
+
+
+def test_counting_pattern(installed):
+    pat = profiling._CountingPattern(re.compile(r'\d'))
+    profile = ExtractionProfile()
+    with profile.measure('outer'):
+        assert re.sub(pat, '-', 'a1b22') == 'a-b--'
+        with profile.measure('inner'):
+            assert len(list(pat.finditer('1 2'))) == 2
+            assert pat.search('abc') is None
+    assert isinstance(pat, re.Pattern)
+    assert profile['outer'].matches == 5
+    assert profile['inner'].matches == 2
+
+
+def test_uninstall():
+    extract_drusen = algorithm.extract_drusen
+    small_drusen_pat = drusen.SMALL_DRUSEN_PAT
+    profiling.install()
+    assert algorithm.extract_drusen is not extract_drusen
+    assert drusen.SMALL_DRUSEN_PAT is not small_drusen_pat
+    profiling.uninstall()
+    assert algorithm.extract_drusen is extract_drusen
+    assert drusen.SMALL_DRUSEN_PAT is small_drusen_pat
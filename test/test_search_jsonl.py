@@ -0,0 +1,105 @@
+import json
+import sqlite3
+
+import pytest
+
+from eye_extractor.tools.search_jsonl import JsonlSearcher, get_note_id
+
+RECORDS = [
+    {'note_id': 1, 'note_date': '2022-02-22 00:00:00', 'text': 'Œdème'},
+    {'note_id': 'a"2', 'iop': [{'value': 15}]},
+    {'other': {'note_id': 'nested'}, 'note_id': 3},
+]
+
+
+@pytest.fixture
+def jsonl_dir(tmp_path):
+    path = tmp_path / 'out'
+    path.mkdir()
+    with open(path / 'eye_extractor_0.jsonl', 'w', encoding='utf8') as out:
+        for record in RECORDS[:2]:
+            out.write(json.dumps(record, default=str) + '\n')
+    with open(path / 'eye_extractor_1.jsonl', 'w', encoding='utf8') as out:
+        out.write(json.dumps(RECORDS[2], separators=(',', ':')) + '\n')
+    return path
+
+
+@pytest.mark.parametrize('record, exp', [
+    ({'note_id': 1, 'x': 2}, '1'),
+    ({'x': {'y': 'note_id": 3'}, 'note_id': 'abc'}, 'abc'),
+    ({'note_id': 'a\\"b', 'x': 2}, 'a\\"b'),
+    ({'note_id': 1.5}, '1.5'),
+    ({'other': {'note_id': 'nested'}, 'note_id': 3}, '3'),
+    ({'other': [{'note_id': 'nested'}], 'note_id': 'abc', 'x': {'note_id': 2}}, 'abc'),
+])
+def test_get_note_id(record, exp):
+    assert get_note_id(json.dumps(record).encode('utf8')) == exp
+
+
+@pytest.mark.parametrize('build_new_index_files', [False, True])
+def test_lookup(jsonl_dir, build_new_index_files):
+    with JsonlSearcher(jsonl_dir, build_new_index_files=build_new_index_files) as searcher:
+        assert json.loads(searcher.lookup(1))['text'] == 'Œdème'
+        assert json.loads(searcher.lookup('a"2'))['iop'] == [{'value': 15}]
+        assert json.loads(searcher.lookup('3'))['other'] == {'note_id': 'nested'}
+        assert searcher.lookup('nested') is None
+
+
+def test_rebuild_outdated_index(jsonl_dir):
+    (jsonl_dir / '.index').mkdir()
+    conn = sqlite3.connect(jsonl_dir / '.index' / 'jsonl.idx')  # schema storing line numbers
+    conn.execute('create table LOOKUP (docid TEXT, jsonl_file TEXT, line_number INT, kind INT);')
+    conn.execute("insert into LOOKUP values ('1', 'eye_extractor_0.jsonl', 1, 0)")
+    conn.commit()
+    conn.close()
+    with JsonlSearcher(jsonl_dir) as searcher:
+        assert json.loads(searcher.lookup(1))['note_id'] == 1
+    with JsonlSearcher(jsonl_dir) as searcher:  # reopen without rebuilding
+        assert searcher.cur.execute('select count(*) from LOOKUP').fetchone()[0] == len(RECORDS)
+
+
+@pytest.mark.parametrize('build_new_index_files', [False, True])
+def test_index_new_and_changed_files(jsonl_dir, build_new_index_files):
+    with JsonlSearcher(jsonl_dir, build_new_index_files=build_new_index_files) as searcher:
+        assert searcher.lookup(4) is None
+    # new shard
+    with open(jsonl_dir / 'eye_extractor_2.jsonl', 'w', encoding='utf8') as out:
+        out.write(json.dumps({'note_id': 4}) + '\n')
+    with JsonlSearcher(jsonl_dir, build_new_index_files=build_new_index_files) as searcher:
+        assert json.loads(searcher.lookup(4)) == {'note_id': 4}
+        assert json.loads(searcher.lookup(1))['text'] == 'Œdème'
+    # changed and removed shards
+    with open(jsonl_dir / 'eye_extractor_2.jsonl', 'w', encoding='utf8') as out:
+        out.write(json.dumps({'note_id': 5, 'iop': []}) + '\n')
+        out.write(json.dumps({'note_id': 4, 'iop': [15]}) + '\n')
+    (jsonl_dir / 'eye_extractor_1.jsonl').unlink()
+    with JsonlSearcher(jsonl_dir, build_new_index_files=build_new_index_files) as searcher:
+        assert json.loads(searcher.lookup(4)) == {'note_id': 4, 'iop': [15]}
+        assert json.loads(searcher.lookup(5)) == {'note_id': 5, 'iop': []}
+        assert searcher.lookup(3) is None
+        assert json.loads(searcher.lookup(1))['text'] == 'Œdème'
+        assert searcher.cur.execute('select count(*) from LOOKUP').fetchone()[0] == 4
+
+
+def test_unchanged_files_not_reindexed(jsonl_dir, monkeypatch):
+    JsonlSearcher(jsonl_dir).close()
+    monkeypatch.setattr('eye_extractor.tools.search_jsonl.iter_offsets', None)  # fail if called
+    with JsonlSearcher(jsonl_dir) as searcher:
+        assert json.loads(searcher.lookup(3))['note_id'] == 3
+
+
+@pytest.mark.parametrize('build_new_index_files', [False, True])
+@pytest.mark.parametrize('cut', [5, 14, 25])  # within the key, after the note_id, before the newline
+def test_partial_last_line(jsonl_dir, build_new_index_files, cut):
+    """A last line still being written is not indexed until it is complete"""
+    line = json.dumps({'note_id': 6, 'iop': [16]}) + '\n'
+    with open(jsonl_dir / 'eye_extractor_1.jsonl', 'a', encoding='utf8') as out:
+        out.write(line[:cut])
+    with JsonlSearcher(jsonl_dir, build_new_index_files=build_new_index_files) as searcher:
+        assert searcher.lookup(6) is None
+        assert json.loads(searcher.lookup(3))['note_id'] == 3
+    with open(jsonl_dir / 'eye_extractor_1.jsonl', 'a', encoding='utf8') as out:
+        out.write(line[cut:])
+    with JsonlSearcher(jsonl_dir, build_new_index_files=build_new_index_files) as searcher:
+        assert json.loads(searcher.lookup(6)) == {'note_id': 6, 'iop': [16]}
+        assert json.loads(searcher.lookup(3))['note_id'] == 3
@@ -0,0 +1,56 @@
+import contextlib
+
+import pytest
+
+from eye_extractor.output.variable import column_from_variable, column_from_variable_abbr, index_rows, row_index_scope
+
+ROWS = [
+    {'drusen_re': {'value': 1}, 'fluid_le': {'value': 2}},
+    {'fluid_unk': {'value': 3}},
+    'not a row',
+    {'drusen_re': {'value': 3, 'priority': 1}, 'drusen_unk': {'value': 2}},
+    {'drusen_le': 2, 'drusen_re': {'value': 2}},
+]
+
+
+def test_index_rows():
+    data = [ROWS[0], ROWS[1], ROWS[3]]
+    assert index_rows(data) == {
+        'drusen_re': [0, 2], 'fluid_le': [0], 'fluid_unk': [1], 'drusen_unk': [2],
+    }
+    assert index_rows(ROWS) is None  # not all rows are dicts
+
+
+@pytest.mark.parametrize('data, exp', [
+    (None, {'drusen_re': -1, 'drusen_le': -1, 'drusen_unk': -1}),
+    ([ROWS[0], ROWS[1], ROWS[3], ROWS[4]], {'drusen_re': 3, 'drusen_le': 2, 'drusen_unk': -1}),
+    ([ROWS[1], ROWS[4]], {'drusen_re': 2, 'drusen_le': 2, 'drusen_unk': -1}),
+    ([ROWS[3]], {'drusen_re': 3, 'drusen_le': -1, 'drusen_unk': -1}),
+])
+def test_column_from_variable_abbr(data, exp):
+    assert column_from_variable_abbr('drusen', -1, data) == exp
+    with row_index_scope():
+        assert column_from_variable_abbr('drusen', -1, data) == exp
+        assert column_from_variable_abbr('drusen', -1, data) == exp  # index reused
+
+
+def test_column_from_variable_convert_func():
+    data = [ROWS[1], ROWS[0], ROWS[4]]
+    result = column_from_variable(
+        {'macula_re': -1, 'macula_le': -1, 'macula_unk': -1}, data,
+        convert_func=lambda n: n.replace('macula', 'fluid'),
+        renamevar_func=lambda n: n.replace('macula', 'mac'),
+    )
+    assert result == {'mac_re': -1, 'mac_le': 2, 'mac_unk': 3}
+
+
+def _add_fluid_sideeffect(results, varname, value):
+    results.setdefault('fluid_le', -1)
+
+
+@pytest.mark.parametrize('in_scope', [False, True])
+def test_column_from_variable_sideeffect_adds_variable(in_scope):
+    data = [ROWS[4], {'fluid_le': 3}]
+    with row_index_scope() if in_scope else contextlib.nullcontext():
+        result = column_from_variable({'drusen_le': -1}, data, sideeffect_func=_add_fluid_sideeffect)
+    assert result == {'drusen_le': 2, 'fluid_le': 3}  # row only with the added variable is read
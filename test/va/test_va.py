@@ -2,7 +2,7 @@ import re
 
 import pytest
 
-from eye_extractor.build_table import build_va
+from eye_extractor.output.va import build_va
 from eye_extractor.common.json import dumps_and_loads_json
 from eye_extractor.va.extractor2 import vacc_numbercorrect_le, extract_va, VA_PATTERN, clean_punc
 from eye_extractor.va.pattern import VA, VA_LINE_CC, VA_LINE_SC, VA_LINE_SC_CC, VA_LINE_SC_OD, VA_LINE_SC_OS